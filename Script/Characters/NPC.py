@@ -4,14 +4,28 @@ import os
 SPRITE_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "..", "graphics", "characters"))
 DEFAULT_SPRITE = os.path.join(SPRITE_DIR, "Professor_Oak.png")
 
+# Decoded sprite sheets by path; NPCs never draw into their sheet, so they can share it
+_SHEET_CACHE = {}
+
 def _load_sheet(path):
+    sheet = _SHEET_CACHE.get(path)
+    if sheet is not None:
+        return sheet
     try:
-        return pygame.image.load(path).convert_alpha()
+        sheet = pygame.image.load(path).convert_alpha()
     except Exception:
         try:
-            return pygame.image.load(path)
+            sheet = pygame.image.load(path)
         except Exception:
             return None
+    _SHEET_CACHE[path] = sheet
+    return sheet
+
+def preload_sheets(paths):
+    # Warms the sheet cache, e.g. from a background loader before the NPCs are spawned
+    for path in paths:
+        if os.path.exists(path):
+            _load_sheet(path)
 
 def _slice_sheet(sheet, w, h):
     frames = []
@@ -1,6 +1,6 @@
 import pygame
 import os
-from .movement import handle_keydown, handle_keyup
+from .movement import handle_keydown, handle_keyup, sweep_x, sweep_y
 
 RED = (200, 50, 50)
 player_x = 0
@@ -46,6 +46,14 @@ def _slice_sheet(sheet, w, h):
         frames.append(row)
     return frames
 
+def _convert_frames(frames):
+    # The sheet is loaded at import, possibly before any display mode exists (e.g. headless
+    # runs), so frames are converted to the display format on first draw instead
+    converted = []
+    for row in frames:
+        converted.append([frame.convert_alpha() for frame in row])
+    return converted
+
 _SHEET = _load_sheet(_SPRITE_PATH)
 if _SHEET is not None:
     sw, sh = _SHEET.get_size()
@@ -71,6 +79,7 @@ class Character:
     anim_index = 0
     anim_timer = 0
     anim_speed = 8
+    frames_converted = False
 
     def __init__(self):
         self.hitbox_rect = pygame.Rect(0, 0, player_w // 2, player_h // 2)
@@ -147,7 +156,27 @@ class Character:
             self.rect.midbottom = (self.hitbox_rect.centerx, self.hitbox_rect.bottom)
             return
 
-        solid_rects = game_map.get_solid_rects()
+        if hasattr(game_map, "get_collision_grid"):
+            grid = game_map.get_collision_grid()
+            tw = game_map.tilewidth
+            th = game_map.tileheight
+            if dx != 0:
+                self.hitbox_rect.x = sweep_x(self.hitbox_rect, int(self._fx + dx), grid, tw, th)
+                self._fx = float(self.hitbox_rect.x)
+            if dy != 0:
+                self.hitbox_rect.y = sweep_y(self.hitbox_rect, int(self._fy + dy), grid, tw, th)
+                self._fy = float(self.hitbox_rect.y)
+            self.rect.midbottom = (self.hitbox_rect.centerx, self.hitbox_rect.bottom)
+            return
+
+        # Maps without a collision grid: only rects around the swept hitbox can stop it,
+        # and a hitbox-sized margin covers pushback
+        sweep = self.hitbox_rect.union(self.hitbox_rect.move(int(dx), int(dy)))
+        sweep.inflate_ip(self.hitbox_rect.width * 2, self.hitbox_rect.height * 2)
+        if hasattr(game_map, "get_solid_rects_near"):
+            solid_rects = game_map.get_solid_rects_near(sweep)
+        else:
+            solid_rects = game_map.get_solid_rects()
 
         if dx != 0:
             new_rect = self.hitbox_rect.copy()
@@ -183,6 +212,12 @@ class Character:
         return 0
 
     def draw(self, surface, offset_x=0, offset_y=0):
+        if not self.frames_converted and self.sprite_frames and pygame.display.get_surface() is not None:
+            try:
+                type(self).sprite_frames = _convert_frames(self.sprite_frames)
+            except pygame.error:
+                pass
+            type(self).frames_converted = True
         draw_pos = (self.rect.x + offset_x, self.rect.y + offset_y)
         if self.sprite_frames:
             row_idx = self._row_for_direction()
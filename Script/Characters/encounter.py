@@ -6,6 +6,8 @@ import requests
 import threading
 import pygame
 
+from Characters import ingest, move_db, pokedata
+
 _bush_cooldowns = {}
 _pokemon_cache = []
 _CACHE_FILE = "pokemon_cache.json"
@@ -63,6 +65,88 @@ def is_player_in_bush(player_rect, bush_shapes):
                     return bush
     return None
 
+# Trigger kinds and the TileMap shape lists they come from, in the order main.py checks them
+TRIGGER_SOURCES = (
+    ("bush", "bush_shapes"),
+    ("hospital", "hospital_shapes"),
+    ("house", "house_shapes"),
+    ("GrassGym", "GrassGym_shapes"),
+    ("IceGym", "IceGym_shapes"),
+    ("FireGym", "FireGym_shapes"),
+    ("exit", "exit_shapes"),
+)
+TRIGGER_CELL_SIZE = 256
+
+def _shape_bbox(shape):
+    if isinstance(shape, pygame.Rect):
+        return shape.copy()
+    xs = [p[0] for p in shape]
+    ys = [p[1] for p in shape]
+    # One pixel of slack so edge-touching polygon hits still pass the bbox test
+    left = int(min(xs)) - 1
+    top = int(min(ys)) - 1
+    return pygame.Rect(left, top, int(max(xs)) + 2 - left, int(max(ys)) + 2 - top)
+
+class TriggerIndex:
+    def __init__(self, game_map, cell_size=TRIGGER_CELL_SIZE):
+        self.cell_size = cell_size
+        self.sources = {}
+        self.zones = []
+        self.cells = {}
+
+        for kind, attr in TRIGGER_SOURCES:
+            shapes = getattr(game_map, attr, None) or []
+            self.sources[attr] = shapes
+            for zone in shapes:
+                shape = zone
+                if kind == "bush":
+                    # is_player_in_bush only ever matches dict bushes
+                    if not isinstance(zone, dict):
+                        continue
+                    shape = zone.get("rect")
+                if not isinstance(shape, (pygame.Rect, list)) or (isinstance(shape, list) and not shape):
+                    continue
+                self._add(kind, zone, shape)
+
+    def _add(self, kind, zone, shape):
+        bbox = _shape_bbox(shape)
+        index = len(self.zones)
+        self.zones.append((kind, zone, shape, bbox))
+        cs = self.cell_size
+        for cy in range(bbox.top // cs, (bbox.bottom - 1) // cs + 1):
+            for cx in range(bbox.left // cs, (bbox.right - 1) // cs + 1):
+                self.cells.setdefault((cx, cy), []).append(index)
+
+    def is_current(self, game_map):
+        return all(getattr(game_map, attr, None) is shapes for attr, shapes in self.sources.items())
+
+    def query(self, rect):
+        # Returns {kind: zone} with the first zone of each kind the rect touches,
+        # the same zone the matching is_player_in_* function would return
+        cs = self.cell_size
+        candidates = set()
+        for cy in range(rect.top // cs, (rect.bottom - 1) // cs + 1):
+            for cx in range(rect.left // cs, (rect.right - 1) // cs + 1):
+                hits = self.cells.get((cx, cy))
+                if hits:
+                    candidates.update(hits)
+
+        found = {}
+        for index in sorted(candidates):
+            kind, zone, shape, bbox = self.zones[index]
+            if kind in found or not rect.colliderect(bbox):
+                continue
+            if isinstance(shape, pygame.Rect) or _rect_collides_polygon(rect, shape):
+                found[kind] = zone
+        return found
+
+def get_trigger_index(game_map):
+    index = getattr(game_map, "_trigger_index", None)
+    if index is None or not index.is_current(game_map):
+        index = TriggerIndex(game_map)
+        game_map._trigger_index = index
+    return index
+
 def can_trigger_bush(bush, cooldown_seconds=30):
     if isinstance(bush, dict):
         bush_rect = bush.get('rect')
@@ -120,45 +204,19 @@ def fetch_and_store_all_moves():
     except Exception as e:
         print(f"An error occurred while reading {moves_file}: {e}")
 
+    # Pokemon and their moves are fetched concurrently; moves shared by many species only once
     try:
-        response = requests.get("https://pokeapi.co/api/v2/pokemon?limit=1025", timeout=20)
-        response.raise_for_status()
-        pokemon_list = response.json()["results"]
+        state = ingest.ingest(species=False)
     except Exception as e:
         print(f"Failed to fetch Pokémon list from PokéAPI: {e}")
         return
-
-    for pokemon in pokemon_list:
-        pokemon_name = pokemon["name"]
-        try:
-            pokemon_response = requests.get(f"https://pokeapi.co/api/v2/pokemon/{pokemon_name}", timeout=5)
-            pokemon_response.raise_for_status()
-            pokemon_data = pokemon_response.json()
-            moves = []
-            for move in pokemon_data["moves"][:4]:  # Limit to 4 moves
-                move_name = move["move"]["name"].replace("-", " ").title()
-                move_url = move["move"]["url"]
-                try:
-                    move_response = requests.get(move_url, timeout=5)
-                    move_response.raise_for_status()
-                    move_data = move_response.json()
-                    move_power = move_data.get("power", 0)
-                    move_type = move_data["type"]["name"]
-                except Exception as e:
-                    print(f"Failed to fetch move details for {move_name}: {e}")
-                    move_power = 0
-                    move_type = "normal"
-                moves.append({"name": move_name, "power": move_power, "type": move_type})
-            moves_data[pokemon_name] = moves
-            print(f"Fetched moves for {pokemon_name}")
-        except Exception as e:
-            print(f"Failed to fetch moves for {pokemon_name}: {e}")
-            moves_data[pokemon_name] = [{"name": "Tackle", "power": 40, "type": "normal"}]
+    moves_data = ingest.moves_table(state)
 
     try:
         with open(moves_file, "w") as f:
             json.dump(moves_data, f, indent=2)
         print(f"Moves data saved to {moves_file}")
+        move_db.clear()
     except Exception as e:
         print(f"Failed to save moves data to {moves_file}: {e}")
 
@@ -193,34 +251,23 @@ def _fetch_pokemon_data_async():
     print("Fetching full Pokémon list from PokéAPI")
 
     try:
-        response = requests.get("https://pokeapi.co/api/v2/pokemon?limit=1025", timeout=20)
-        response.raise_for_status()
-        results = response.json()["results"]
+        state = ingest.ingest(pokemon=False, moves=False)
     except Exception as e:
         print(f"Failed to fetch list from PokéAPI: {e}")
         return
 
     pokemon_list = []
-    for i, p in enumerate(results, start=1):
-        name = p["name"]
+    for name in state["order"]:
         if any(term in name for term in ["mega", "gmax", "-totem", "-hisui", "-alola", "-galar"]):
             continue
-
-        try:
-            species_data = requests.get(f"https://pokeapi.co/api/v2/pokemon-species/{name}", timeout=5)
-            if not species_data.ok:
-                continue
-            species = species_data.json()
-            capture_rate = species.get("capture_rate", 45)
-        except Exception:
-            capture_rate = 45
-
+        # Forms without a species entry of their own were never part of the pool
+        species = state["species"].get(name)
+        if species is None:
+            continue
+        capture_rate = species.get("capture_rate") or 45
         weight = max(1, capture_rate / 255 * 10)
         pokemon_list.append({"name": name, "weight": weight})
 
-        if i % 50 == 0:
-            print(f"Fetched {i}/{len(results)} Pokémon...")
-
     with _CACHE_LOCK:
         _pokemon_cache = [(p["name"], p["weight"]) for p in pokemon_list]
         _save_cache(pokemon_list)
@@ -237,23 +284,24 @@ def _ensure_pokemon_loaded():
             _FETCH_THREAD.start()
             print("Pokémon data loading in background...")
 
-def fetch_random_pokemon():
-    _ensure_pokemon_loaded()
-
-    if not _pokemon_cache:
-        fallback = random.choice(["pikachu", "charmander", "bulbasaur", "squirtle"])
-        hp = random.randint(30, 80)
-        return {
-            "name": fallback.capitalize(),
-            "sprite": None,
-            "hp": hp,
-            "max_hp": hp,
-            "attack": random.randint(20, 70),
-        }
-
-    names, weights = zip(*_pokemon_cache)
-    chosen_name = random.choices(names, weights=weights, k=1)[0]
-
+def _pokemon_from_pack(name):
+    # Wild Pokémon straight from the offline data pack, no network involved. A seed-only pack
+    # has no base stats, so those get the same rolls as the offline fallback in _fetch_pokemon;
+    # asking PokéAPI here would block the game loop for up to the request timeout.
+    species = pokedata.get_species(name)
+    if species is None:
+        return None
+    stats = species.get("stats") or {}
+    hp = stats.get("hp") or random.randint(30, 80)
+    return {
+        "name": species["name"].capitalize(),
+        "sprite": species.get("sprite"),
+        "hp": hp,
+        "max_hp": hp,
+        "attack": stats.get("attack") or random.randint(20, 70),
+    }
+
+def _fetch_pokemon(chosen_name):
     try:
         response = requests.get(f"https://pokeapi.co/api/v2/pokemon/{chosen_name}", timeout=5)
         response.raise_for_status()
@@ -276,19 +324,34 @@ def fetch_random_pokemon():
             "attack": random.randint(20, 70),
         }
 
-def get_moves_for_pokemon(pokemon_name):
-    moves_file = "moves.json"
-    if os.path.exists(moves_file):
-        try:
-            with open(moves_file, "r") as f:
-                moves_data = json.load(f)
-            if pokemon_name.lower() in moves_data:
-                return moves_data[pokemon_name.lower()]
-        except Exception as e:
-            print(f"Error reading moves data: {e}")
+def fetch_random_pokemon():
+    pool = pokedata.encounter_pool()
+    if pool:
+        names, weights = pool
+        chosen_name = random.choices(names, weights=weights, k=1)[0]
+        return _pokemon_from_pack(chosen_name) or _fetch_pokemon(chosen_name)
+
+    # No data pack: the old PokéAPI path
+    _ensure_pokemon_loaded()
+
+    if not _pokemon_cache:
+        fallback = random.choice(["pikachu", "charmander", "bulbasaur", "squirtle"])
+        hp = random.randint(30, 80)
+        return {
+            "name": fallback.capitalize(),
+            "sprite": None,
+            "hp": hp,
+            "max_hp": hp,
+            "attack": random.randint(20, 70),
+        }
 
-    # Fallback if moves are not found in the file
-    return [{"name": "Tackle", "power": 40, "type": "normal"}]
+    names, weights = zip(*_pokemon_cache)
+    chosen_name = random.choices(names, weights=weights, k=1)[0]
+    return _fetch_pokemon(chosen_name)
+
+def get_moves_for_pokemon(pokemon_name):
+    # Indexed once from moves.json; unknown species get Tackle
+    return move_db.get_moves(pokemon_name)
 
 def is_player_in_hospital(player_rect, hospital_shapes):
     for hospital in hospital_shapes:
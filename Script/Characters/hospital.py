@@ -1,11 +1,10 @@
 import pygame
 import os
 import sys
-import requests
-from io import BytesIO
 from Characters.NPC import NPC
 from UI.dialogue_box import show_dialogue
 from pathlib import Path
+from sprite_store import SPRITE_LOADED, request as request_sprite
 
 base_dir = Path(__file__).parent.parent
 
@@ -176,16 +175,12 @@ def heal_pokemon_menu(
     def load_pokemon_icon(pokemon, size=40):
         try:
             if hasattr(pokemon, 'sprite') and pokemon.sprite:
-                response = requests.get(pokemon.sprite, timeout=2)
-                if response.ok:
-                    img = pygame.image.load(BytesIO(response.content)).convert_alpha()
-                    img = pygame.transform.scale(img, (size, size))
-                    return img
+                return request_sprite(pokemon.sprite, (size, size))
         except Exception as e:
             print(f"Failed to load icon for {pokemon.name}: {e}")
         return None
 
-    # Preload icons for all Pokémon in the team
+    # Icons load in the background; placeholders show until SPRITE_LOADED arrives
     pokemon_icons = {p: load_pokemon_icon(p) for p in team}
 
     while running:
@@ -193,6 +188,8 @@ def heal_pokemon_menu(
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
+            if event.type == SPRITE_LOADED:
+                pokemon_icons = {p: load_pokemon_icon(p) for p in team}
             if event.type == pygame.KEYDOWN:
                 if event.key in (pygame.K_UP, pygame.K_w):
                     selected = (selected - 1) % len(team)
@@ -0,0 +1,244 @@
+import json
+import os
+import queue
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Concurrent, resumable PokéAPI ingestion for moves.json, pokemon_cache.json and the data pack.
+# Usage (from the Script directory): python -m Characters.ingest [--base-url URL] [--limit N]
+API_BASE = "https://pokeapi.co/api/v2"
+SPECIES_LIMIT = 1025
+MAX_WORKERS = 16
+MOVES_PER_POKEMON = 4
+RETRIES = 4
+BACKOFF_SECONDS = 0.5
+TIMEOUT_SECONDS = 10
+# Checkpoint is rewritten after this many finished requests
+CHECKPOINT_EVERY = 100
+DEFAULT_CHECKPOINT = Path(__file__).resolve().parent.parent.parent / "data" / "ingest_checkpoint.json"
+# Responses worth another try; anything else (404 and friends) fails straight away
+RETRY_STATUS = (429, 500, 502, 503, 504)
+DEFAULT_MOVE = {"name": "Tackle", "power": 40, "type": "normal"}
+
+
+class IngestError(Exception):
+    pass
+
+
+class Ingestor:
+    def __init__(self, base_url=API_BASE, max_workers=MAX_WORKERS, retries=RETRIES,
+                 backoff=BACKOFF_SECONDS, timeout=TIMEOUT_SECONDS, checkpoint_path=DEFAULT_CHECKPOINT):
+        self.base_url = base_url.rstrip("/")
+        self.max_workers = max(1, int(max_workers))
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+        # One pooled session for every worker, so connections are reused instead of reopened
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.requests = 0
+        self.retried = 0
+        self.state = {"base_url": self.base_url, "order": [], "pokemon": {}, "species": {}, "moves": {}, "failed": {}}
+
+    def get_json(self, url):
+        if not url.startswith(("http://", "https://")):
+            url = f"{self.base_url}/{url.lstrip('/')}"
+        for attempt in range(self.retries + 1):
+            try:
+                self.requests += 1
+                response = self.session.get(url, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUS:
+                    response.raise_for_status()
+                    return response.json()
+                error = f"HTTP {response.status_code}"
+                retry_after = response.headers.get("Retry-After", "")
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = str(e)
+                retry_after = ""
+            except requests.RequestException as e:
+                raise IngestError(f"{url}: {e}") from e
+            if attempt == self.retries:
+                raise IngestError(f"{url}: {error} after {attempt + 1} attempts")
+            self.retried += 1
+            # Exponential backoff with jitter, or the server's Retry-After when it gives one
+            delay = float(retry_after) if retry_after.isdigit() else self.backoff * (2 ** attempt)
+            time.sleep(delay * random.uniform(0.8, 1.2))
+
+    # Checkpoints
+
+    def load_checkpoint(self):
+        path = self.checkpoint_path
+        if path is None or not path.exists():
+            return False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except Exception as e:
+            print(f"Ignoring unreadable checkpoint '{path}': {e}")
+            return False
+        if state.get("base_url") != self.base_url:
+            print(f"Ignoring checkpoint for {state.get('base_url')} (now ingesting {self.base_url})")
+            return False
+        for key in self.state:
+            state.setdefault(key, self.state[key])
+        # Failures get another chance on resume
+        state["failed"] = {}
+        self.state = state
+        print(
+            f"Resuming from checkpoint: {len(state['pokemon'])} pokemon, "
+            f"{len(state['species'])} species, {len(state['moves'])} moves already fetched"
+        )
+        return True
+
+    def save_checkpoint(self):
+        path = self.checkpoint_path
+        if path is None:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp, path)
+
+    def discard_checkpoint(self):
+        if self.checkpoint_path is not None and self.checkpoint_path.exists():
+            self.checkpoint_path.unlink()
+
+    # Fetch jobs (run on worker threads; they only return data)
+
+    def _fetch_pokemon(self, name):
+        data = self.get_json(f"pokemon/{name}")
+        moves = [{"name": m["move"]["name"], "url": m["move"]["url"]} for m in data.get("moves", [])[:MOVES_PER_POKEMON]]
+        return {
+            "id": data.get("id"),
+            "stats": {s["stat"]["name"]: s["base_stat"] for s in data.get("stats", [])},
+            "types": [t["type"]["name"] for t in sorted(data.get("types", []), key=lambda t: t.get("slot", 0))],
+            "sprite": (data.get("sprites") or {}).get("front_default"),
+            "moves": moves,
+        }
+
+    def _fetch_species(self, name):
+        data = self.get_json(f"pokemon-species/{name}")
+        return {"capture_rate": data.get("capture_rate")}
+
+    def _fetch_move(self, url):
+        data = self.get_json(url)
+        return {"power": data.get("power", 0), "type": (data.get("type") or {}).get("name", "normal")}
+
+    def run(self, limit=SPECIES_LIMIT, pokemon=True, moves=True, species=True, resume=True):
+        # Fetches the pokemon list, then per name (optionally) the pokemon, its species entry and
+        # its first moves. Moves shared by many species are fetched once.
+        t0 = time.perf_counter()
+        if resume:
+            self.load_checkpoint()
+        state = self.state
+        if not state["order"]:
+            listing = self.get_json(f"pokemon?limit={int(limit)}")
+            state["order"] = [p["name"] for p in listing.get("results", [])]
+            self.save_checkpoint()
+
+        jobs = {}
+        queued = set()
+        finished = queue.Queue()
+        done = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ingest") as pool:
+            def submit(kind, key):
+                if (kind, key) in queued or key in state[kind]:
+                    return
+                queued.add((kind, key))
+                fetch = {"pokemon": self._fetch_pokemon, "species": self._fetch_species, "moves": self._fetch_move}[kind]
+                future = pool.submit(fetch, key)
+                jobs[future] = (kind, key)
+                future.add_done_callback(finished.put)
+
+            def follow_up(entry):
+                if pokemon and moves:
+                    for move in entry["moves"]:
+                        submit("moves", move["url"])
+
+            for name in state["order"]:
+                if name in state["pokemon"]:
+                    follow_up(state["pokemon"][name])
+                elif pokemon:
+                    submit("pokemon", name)
+                if species:
+                    submit("species", name)
+
+            # Results are merged here on the calling thread only, so state needs no lock
+            while jobs:
+                future = finished.get()
+                kind, key = jobs.pop(future)
+                try:
+                    state[kind][key] = future.result()
+                    if kind == "pokemon":
+                        follow_up(state[kind][key])
+                except Exception as e:
+                    state["failed"][f"{kind}:{key}"] = str(e)
+                done += 1
+                if done % CHECKPOINT_EVERY == 0:
+                    self.save_checkpoint()
+                    print(f"Ingested {done} responses ({len(jobs)} in flight or queued)...")
+
+        self.save_checkpoint()
+        print(
+            f"Ingest finished in {time.perf_counter() - t0:.1f} s: {len(state['pokemon'])} pokemon, "
+            f"{len(state['species'])} species, {len(state['moves'])} distinct moves, "
+            f"{len(state['failed'])} failed, {self.requests} requests ({self.retried} retries)"
+        )
+        return state
+
+
+# Turning a finished ingest into the game's files
+
+def moves_table(state):
+    # moves.json layout: species -> up to four {name, power, type}, Tackle when the pokemon failed
+    table = {}
+    for name in state["order"]:
+        entry = state["pokemon"].get(name)
+        if entry is None:
+            table[name] = [dict(DEFAULT_MOVE)]
+            continue
+        moves = []
+        for move in entry["moves"]:
+            details = state["moves"].get(move["url"]) or {"power": 0, "type": "normal"}
+            moves.append({"name": move["name"].replace("-", " ").title(), "power": details["power"], "type": details["type"]})
+        table[name] = moves
+    return table
+
+
+def capture_rates(state):
+    return {name: s["capture_rate"] for name, s in state["species"].items() if s.get("capture_rate") is not None}
+
+
+def ingest(base_url=API_BASE, limit=SPECIES_LIMIT, pokemon=True, moves=True, species=True,
+           max_workers=MAX_WORKERS, checkpoint_path=DEFAULT_CHECKPOINT):
+    # Runs (or resumes) an ingest; the checkpoint is dropped once nothing is left to retry
+    ingestor = Ingestor(base_url, max_workers=max_workers, checkpoint_path=checkpoint_path)
+    state = ingestor.run(limit=limit, pokemon=pokemon, moves=moves, species=species)
+    if not state["failed"]:
+        ingestor.discard_checkpoint()
+    return state
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    base_url = API_BASE
+    limit = SPECIES_LIMIT
+    if "--base-url" in args:
+        base_url = args[args.index("--base-url") + 1]
+    if "--limit" in args:
+        limit = int(args[args.index("--limit") + 1])
+    result = ingest(base_url, limit)
+    with open("moves.json", "w", encoding="utf-8") as f:
+        json.dump(moves_table(result), f, indent=2)
+    print("Moves data saved to moves.json")
@@ -0,0 +1,130 @@
+import gzip
+import json
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from Characters.pokedata import build_pack
+
+# Builds a data pack against a local stub of PokéAPI serving two species and checks what
+# ended up in it. No network access needed.
+# Usage (from the Script directory): python -m Characters.ingest_check
+API_PREFIX = "/api/v2"
+
+# Two species in PokéAPI's response shape; the values differ from the seed data on purpose
+FIXTURES = {
+    "bulbasaur": {
+        "id": 1,
+        "stats": {"hp": 45, "attack": 49, "defense": 49},
+        "types": ["grass", "poison"],
+        "capture_rate": 123,
+    },
+    "pikachu": {
+        "id": 25,
+        "stats": {"hp": 35, "attack": 55, "defense": 40},
+        "types": ["electric"],
+        "capture_rate": 190,
+    },
+}
+
+
+def _pokemon_json(base_url, name, fixture):
+    return {
+        "id": fixture["id"],
+        "name": name,
+        "stats": [{"base_stat": value, "stat": {"name": stat}} for stat, value in fixture["stats"].items()],
+        "types": [{"slot": i, "type": {"name": t}} for i, t in enumerate(fixture["types"], start=1)],
+        "sprites": {"front_default": f"{base_url}/sprites/{fixture['id']}.png"},
+        "moves": [{"move": {"name": "tackle", "url": f"{base_url}/move/33/"}}],
+    }
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        path = urlsplit(self.path).path.rstrip("/")
+        with server.lock:
+            server.requests.append(path)
+        body = None
+        if path == f"{API_PREFIX}/pokemon":
+            body = {"count": len(FIXTURES), "results": [{"name": n, "url": f"{server.base_url}/pokemon/{n}/"} for n in FIXTURES]}
+        elif path.startswith(f"{API_PREFIX}/pokemon/"):
+            name = path.rsplit("/", 1)[1]
+            if name in FIXTURES:
+                body = _pokemon_json(server.base_url, name, FIXTURES[name])
+        elif path.startswith(f"{API_PREFIX}/pokemon-species/"):
+            name = path.rsplit("/", 1)[1]
+            if name in FIXTURES:
+                body = {"name": name, "capture_rate": FIXTURES[name]["capture_rate"]}
+        elif path == f"{API_PREFIX}/move/33":
+            body = {"name": "tackle", "power": 40, "type": {"name": "normal"}}
+
+        data = json.dumps(body).encode("utf-8") if body is not None else b"{}"
+        self.send_response(200 if body is not None else 404)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}{API_PREFIX}"
+    threading.Thread(target=server.serve_forever, name="pokeapi-stub", daemon=True).start()
+    return server
+
+
+def _expect(condition, what):
+    if not condition:
+        raise AssertionError(what)
+
+
+def check_pack(pack, base_url):
+    _expect(pack["source"] == base_url, f"source is {pack['source']!r}, expected the stub")
+    _expect(pack["fetched"] == len(FIXTURES), f"fetched {pack['fetched']} species, expected {len(FIXTURES)}")
+    by_name = {s["name"]: s for s in pack["species"]}
+    for name, fixture in FIXTURES.items():
+        entry = by_name.get(name)
+        _expect(entry is not None, f"{name} missing from the pack")
+        _expect(entry["id"] == fixture["id"], f"{name} id {entry['id']}")
+        _expect(entry["stats"] == fixture["stats"], f"{name} stats {entry['stats']}")
+        _expect(entry["types"] == fixture["types"], f"{name} types {entry['types']}")
+        _expect(entry["capture_rate"] == fixture["capture_rate"], f"{name} capture rate {entry['capture_rate']}")
+        _expect(entry["sprite"] == f"{base_url}/sprites/{fixture['id']}.png", f"{name} sprite {entry['sprite']}")
+        _expect(entry["moves"], f"{name} has no moves")
+    # Species the stub does not serve keep their seed data
+    unfetched = [s for s in pack["species"] if s["name"] not in FIXTURES]
+    _expect(all(not s["stats"] for s in unfetched), "a species the stub never served has stats")
+
+
+def run():
+    server = start_stub()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            out_path = Path(tmp) / "pack.json.gz"
+            build_pack(out_path, base_url=server.base_url, checkpoint=False)
+            with gzip.open(out_path, "rt", encoding="utf-8") as f:
+                pack = json.load(f)
+        check_pack(pack, server.base_url)
+        expected = {f"{API_PREFIX}/pokemon"} | {f"{API_PREFIX}/{kind}/{n}" for n in FIXTURES for kind in ("pokemon", "pokemon-species")}
+        _expect(set(server.requests) == expected, f"unexpected requests {sorted(set(server.requests) ^ expected)}")
+    finally:
+        server.shutdown()
+        server.server_close()
+    print(f"Ingest check passed: {len(server.requests)} stub requests, {len(FIXTURES)} species with stats")
+
+
+if __name__ == "__main__":
+    try:
+        run()
+    except AssertionError as e:
+        print(f"Ingest check failed: {e}")
+        sys.exit(1)
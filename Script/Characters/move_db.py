@@ -0,0 +1,117 @@
+import json
+import os
+import threading
+import time
+
+from Characters import pokedata
+
+# Moves per species, loaded from moves.json once on first use.
+# Usage (from the Script directory): python -m Characters.move_db  -- per-turn lookup benchmark
+MOVES_FILE = "moves.json"  # relative to the working directory, like fetch_and_store_all_moves
+DEFAULT_MOVE = {"name": "Tackle", "power": 40, "type": "normal"}
+
+_LOCK = threading.Lock()
+_moves = None     # species -> tuple of move records
+_records = {}     # (name, power, type) -> the one shared record
+_source = None
+
+
+def _intern(move):
+    # ~4000 species moves are only ~120 distinct records; share one dict per distinct move.
+    # Records are shared, so callers must treat them as read-only.
+    key = (move.get("name"), move.get("power"), move.get("type"))
+    record = _records.get(key)
+    if record is None:
+        record = {"name": key[0], "power": key[1], "type": key[2]}
+        _records[key] = record
+    return record
+
+
+def _read_moves(path):
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data:
+                return data, path
+        except Exception as e:
+            print(f"Error reading moves data: {e}")
+    # No usable moves.json: the offline data pack carries the same default movesets
+    pack = pokedata.load_pack()
+    if pack is not None:
+        return {s["name"]: s.get("moves") or [] for s in pack["species"]}, "data pack"
+    return {}, None
+
+
+def load(path=MOVES_FILE):
+    global _moves, _source
+    if _moves is not None:
+        return _moves
+    with _LOCK:
+        if _moves is None:
+            t0 = time.perf_counter()
+            data, source = _read_moves(path)
+            moves = {}
+            for species, species_moves in data.items():
+                records = tuple(_intern(m) for m in species_moves if isinstance(m, dict))
+                if records:
+                    moves[species.lower()] = records
+            _source = source
+            _moves = moves
+            if source:
+                print(
+                    f"Indexed moves for {len(moves)} species ({len(_records)} distinct moves) "
+                    f"from {source} in {(time.perf_counter() - t0) * 1000:.1f} ms"
+                )
+    return _moves
+
+
+def get_moves(pokemon_name):
+    # A fresh list each call, so callers can reorder or trim it without touching the index
+    records = load().get(str(pokemon_name).lower())
+    if records:
+        return list(records)
+    return [dict(DEFAULT_MOVE)]
+
+
+def clear():
+    # Call after moves.json changes on disk
+    global _moves, _source
+    with _LOCK:
+        _moves = None
+        _source = None
+        _records.clear()
+
+
+def stats():
+    moves = _moves or {}
+    return {"species": len(moves), "distinct_moves": len(_records), "source": _source}
+
+
+def _bench(names, turns=2000):
+    # Old path: open and parse moves.json for every lookup, as get_moves_for_pokemon did
+    def old_lookup(name):
+        with open(MOVES_FILE, "r") as f:
+            data = json.load(f)
+        return data.get(name.lower(), [DEFAULT_MOVE])
+
+    old_turns = max(1, turns // 100)
+    t0 = time.perf_counter()
+    for i in range(old_turns):
+        old_lookup(names[i % len(names)])
+        old_lookup(names[(i + 1) % len(names)])
+    old_us = (time.perf_counter() - t0) * 1e6 / old_turns
+
+    load()
+    t0 = time.perf_counter()
+    for i in range(turns):
+        get_moves(names[i % len(names)])
+        get_moves(names[(i + 1) % len(names)])
+    new_us = (time.perf_counter() - t0) * 1e6 / turns
+
+    print(f"moves.json per lookup: {old_us:.1f} us/turn over {old_turns} turns")
+    print(f"move_db:               {new_us:.2f} us/turn over {turns} turns ({old_us / max(new_us, 1e-9):.0f}x faster)")
+
+
+if __name__ == "__main__":
+    _bench(["pikachu", "bulbasaur", "charmander", "squirtle", "eevee", "mewtwo"])
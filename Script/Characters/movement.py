@@ -35,4 +35,57 @@ def handle_keyup(event: pygame.event.Event, player):
         player.show_idle = True
     if event.key in (pygame.K_a, pygame.K_d):
         player.dir_x = 0
-        player.show_idle = True
\ No newline at end of file
+        player.show_idle = True
+
+
+def _column_blocked(grid, col, row0, row1):
+    cols = grid["cols"]
+    if not 0 <= col < cols:
+        return False
+    cells = grid["cells"]
+    for row in range(max(0, row0), min(grid["rows"] - 1, row1) + 1):
+        if cells[row * cols + col]:
+            return True
+    return False
+
+
+def _row_blocked(grid, row, col0, col1):
+    cols = grid["cols"]
+    if not 0 <= row < grid["rows"]:
+        return False
+    cells = grid["cells"]
+    start = row * cols
+    for col in range(max(0, col0), min(cols - 1, col1) + 1):
+        if cells[start + col]:
+            return True
+    return False
+
+
+def sweep_x(rect, new_x, grid, tile_w, tile_h):
+    # Walks the tile columns the leading edge crosses and stops at the first solid one,
+    # so a large step can never skip over a wall. Tiles already overlapped are ignored.
+    row0 = rect.top // tile_h
+    row1 = (rect.bottom - 1) // tile_h
+    if new_x > rect.x:
+        for col in range((rect.right - 1) // tile_w + 1, (new_x + rect.width - 1) // tile_w + 1):
+            if _column_blocked(grid, col, row0, row1):
+                return col * tile_w - rect.width
+    elif new_x < rect.x:
+        for col in range(rect.left // tile_w - 1, new_x // tile_w - 1, -1):
+            if _column_blocked(grid, col, row0, row1):
+                return (col + 1) * tile_w
+    return new_x
+
+
+def sweep_y(rect, new_y, grid, tile_w, tile_h):
+    col0 = rect.left // tile_w
+    col1 = (rect.right - 1) // tile_w
+    if new_y > rect.y:
+        for row in range((rect.bottom - 1) // tile_h + 1, (new_y + rect.height - 1) // tile_h + 1):
+            if _row_blocked(grid, row, col0, col1):
+                return row * tile_h - rect.height
+    elif new_y < rect.y:
+        for row in range(rect.top // tile_h - 1, new_y // tile_h - 1, -1):
+            if _row_blocked(grid, row, col0, col1):
+                return (row + 1) * tile_h
+    return new_y
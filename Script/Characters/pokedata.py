@@ -0,0 +1,177 @@
+import datetime
+import gzip
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+
+# Offline PokéAPI data pack: one gzipped JSON file with every species the game can meet.
+# Usage (from the Script directory): python -m Characters.pokedata [--seed-only] [--base-url URL] [out.json.gz]
+PACK_PATH = Path(__file__).resolve().parent.parent.parent / "data" / "pokeapi_pack.json.gz"
+FORMAT_VERSION = 1
+SPRITE_URL = "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/{id}.png"
+# Forms fetch_random_pokemon has always left out of wild encounters
+EXCLUDED_FORMS = ("mega", "gmax", "-totem", "-hisui", "-alola", "-galar")
+DEFAULT_CAPTURE_RATE = 45
+
+_LOCK = threading.Lock()
+_pack = None
+_by_name = {}
+_pool = None
+
+
+def _read_pack(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        pack = json.load(f)
+    if pack.get("format") != FORMAT_VERSION:
+        raise ValueError(f"format {pack.get('format')}, expected {FORMAT_VERSION}")
+    return pack
+
+
+def load_pack(path=PACK_PATH):
+    # Loads the pack once; every later call is a dict lookup. None when there is no usable pack.
+    global _pack, _by_name, _pool
+    if _pack is not None:
+        return _pack or None
+    with _LOCK:
+        if _pack is None:
+            try:
+                pack = _read_pack(path)
+                _by_name = {s["name"]: s for s in pack["species"]}
+                print(f"Loaded {len(_by_name)} species from data pack '{Path(path).name}' ({pack.get('built', '?')})")
+            except FileNotFoundError:
+                pack = False
+            except Exception as e:
+                print(f"Data pack '{path}' unusable: {e}")
+                pack = False
+            _pack = pack
+            _pool = None
+    return _pack or None
+
+
+def get_species(name):
+    if load_pack() is None:
+        return None
+    return _by_name.get(str(name).lower())
+
+
+def encounter_pool():
+    # (names, weights) for random.choices; rarer species (low capture rate) weigh less
+    global _pool
+    if _pool is None:
+        pack = load_pack()
+        if pack is None:
+            return None
+        names = []
+        weights = []
+        for species in pack["species"]:
+            if any(term in species["name"] for term in EXCLUDED_FORMS):
+                continue
+            names.append(species["name"])
+            weights.append(max(1, species.get("capture_rate", DEFAULT_CAPTURE_RATE) / 255 * 10))
+        _pool = (tuple(names), tuple(weights))
+    return _pool
+
+
+# Builder
+
+def _seed_species(root):
+    # What the repo already has on disk: moves.json (species in dex order with their moves)
+    # and pokemon_cache.json (encounter weights, i.e. capture_rate / 255 * 10)
+    moves = {}
+    weights = {}
+    try:
+        with open(root / "moves.json", "r", encoding="utf-8") as f:
+            moves = json.load(f)
+    except Exception as e:
+        print(f"No local moves.json to seed from: {e}")
+    try:
+        with open(root / "pokemon_cache.json", "r", encoding="utf-8") as f:
+            weights = {p["name"]: p.get("weight", 1) for p in json.load(f)}
+    except Exception as e:
+        print(f"No local pokemon_cache.json to seed from: {e}")
+
+    species = []
+    for dex_id, name in enumerate(moves, start=1):
+        weight = weights.get(name)
+        species.append({
+            "id": dex_id,
+            "name": name,
+            "capture_rate": round(weight * 25.5) if weight else DEFAULT_CAPTURE_RATE,
+            "types": [],
+            "stats": {},
+            "sprite": SPRITE_URL.format(id=dex_id),
+            "moves": moves[name],
+        })
+    return species
+
+
+def _apply_ingest(species, state, moves_table):
+    # Fills stats, types, sprites and capture rates from an ingest; seed data stays where it failed
+    if not species:
+        table = moves_table(state)
+        species = [
+            {"id": i, "name": name, "capture_rate": DEFAULT_CAPTURE_RATE, "types": [], "stats": {},
+             "sprite": SPRITE_URL.format(id=i), "moves": table[name]}
+            for i, name in enumerate(state["order"], start=1)
+        ]
+    fetched = 0
+    for entry in species:
+        data = state["pokemon"].get(entry["name"])
+        if data is not None:
+            entry["id"] = data.get("id") or entry["id"]
+            entry["stats"] = data["stats"]
+            entry["types"] = data["types"]
+            entry["sprite"] = data.get("sprite") or entry["sprite"]
+            fetched += 1
+        rate = (state["species"].get(entry["name"]) or {}).get("capture_rate")
+        if rate is not None:
+            entry["capture_rate"] = rate
+    return species, fetched
+
+
+def build_pack(out_path=PACK_PATH, seed_only=False, base_url=None, checkpoint=True):
+    root = Path(__file__).resolve().parent.parent.parent
+    species = _seed_species(root)
+    fetched = 0
+    source = "seed"
+    if not seed_only:
+        # Only the builder talks to the network; the game just reads the pack
+        from Characters.ingest import API_BASE, DEFAULT_CHECKPOINT, ingest, moves_table
+
+        source = base_url or API_BASE
+        # moves.json already holds the default movesets; fetch moves only without it
+        state = ingest(source, moves=not species, checkpoint_path=DEFAULT_CHECKPOINT if checkpoint else None)
+        species, fetched = _apply_ingest(species, state, moves_table)
+        if not fetched:
+            # Nothing came back (e.g. offline): the pack holds seed data only, say so
+            source = "seed"
+
+    pack = {
+        "format": FORMAT_VERSION,
+        "source": source,
+        "built": datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "fetched": fetched,
+        "species": species,
+    }
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_name(f"{out_path.name}.{os.getpid()}.tmp")
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        json.dump(pack, f, separators=(",", ":"), ensure_ascii=False)
+    os.replace(tmp, out_path)
+    print(f"Wrote {len(species)} species ({fetched} fetched from PokéAPI) to {out_path} ({out_path.stat().st_size // 1024} KB)")
+    return out_path
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    seed_only = "--seed-only" in args
+    base_url = None
+    if "--base-url" in args:
+        i = args.index("--base-url")
+        base_url = args[i + 1]
+        del args[i:i + 2]
+    paths = [a for a in args if a != "--seed-only"]
+    build_pack(paths[0] if paths else PACK_PATH, seed_only=seed_only, base_url=base_url)
@@ -1,8 +1,7 @@
 import pygame
-from io import BytesIO
-import requests
 import sys
 from pathlib import Path
+from sprite_store import SPRITE_LOADED, request as request_sprite, sprites
 
 # Import your constants
 from constants import (
@@ -94,6 +93,13 @@ def get_status_text(status):
     }
     return status_texts.get(status, "")
 
+def _sprite_url(pokemon):
+    if not pokemon:
+        return None
+    if isinstance(pokemon, dict):
+        return pokemon.get("sprite")
+    return getattr(pokemon, "sprite", None)
+
 def show_move_menu(
     screen, moves, menu_font, small_font, colors, clock, bg_img, sprite_surface,
     player_sprite_surface, sprite_x, sprite_y, p_x, p_y, pokemon, player_pokemon, type_icons
@@ -109,6 +115,10 @@ def show_move_menu(
     option_colors = [get_type_color(move["type"]) for move in moves]
     selected = 0
 
+    # Callers pass request_sprite() results, which may still be placeholders
+    sprite_url = _sprite_url(pokemon)
+    player_sprite_url = _sprite_url(player_pokemon)
+
     fps = 60
     running = True
     while running:
@@ -119,6 +129,13 @@ def show_move_menu(
                 pygame.quit()
                 sys.exit()
 
+            if event.type == SPRITE_LOADED:
+                # Same size and flip the caller asked for, so the layout does not change
+                if event.url == sprite_url and sprites.is_placeholder(sprite_surface):
+                    sprite_surface = request_sprite(event.url, event.size, event.flip)
+                if event.url == player_sprite_url and sprites.is_placeholder(player_sprite_surface):
+                    player_sprite_surface = request_sprite(event.url, event.size, event.flip)
+
             if event.type == pygame.KEYDOWN:
                 if event.key in (pygame.K_RETURN, pygame.K_SPACE, pygame.K_z, pygame.K_x):
                     return moves[selected]
@@ -456,27 +473,12 @@ def battle_menu(screen, pokemon, menu_font, small_font, colors, clock=None, play
     except Exception:
         bg_img = None
 
-    sprite_surface = None
-    try:
-        if pokemon.get("sprite"):
-            sprite_data = requests.get(pokemon["sprite"], timeout=5)
-            sprite_surface = pygame.image.load(BytesIO(sprite_data.content)).convert_alpha()
-    except Exception:
-        sprite_surface = None
+    # Sprites load in the background; placeholders show until SPRITE_LOADED arrives
+    sprite_url = pokemon.get("sprite")
+    sprite_surface = request_sprite(sprite_url)
 
-    player_sprite_surface = None
-    try:
-        player_sprite_url = None
-        if player_pokemon:
-            if isinstance(player_pokemon, dict):
-                player_sprite_url = player_pokemon.get("sprite")
-            else:
-                player_sprite_url = getattr(player_pokemon, "sprite", None)
-        if player_sprite_url:
-            sprite_data = requests.get(player_sprite_url, timeout=5)
-            player_sprite_surface = pygame.image.load(BytesIO(sprite_data.content)).convert_alpha()
-    except Exception:
-        player_sprite_surface = None
+    player_sprite_url = _sprite_url(player_pokemon)
+    player_sprite_surface = request_sprite(player_sprite_url)
 
     if initial_message:
         state = "message"
@@ -498,6 +500,10 @@ def battle_menu(screen, pokemon, menu_font, small_font, colors, clock=None, play
                 pygame.quit()
                 return "run"
 
+            if event.type == SPRITE_LOADED:
+                sprite_surface = request_sprite(sprite_url)
+                player_sprite_surface = request_sprite(player_sprite_url)
+
             if event.type == pygame.KEYDOWN:
                 if state == "message":
                     if event.key in (pygame.K_RETURN, pygame.K_SPACE, pygame.K_z, pygame.K_x):
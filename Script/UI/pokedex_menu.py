@@ -1,29 +1,15 @@
 import pygame
-from io import BytesIO
-import requests
-
-_SPRITE_CACHE = {}
+from sprite_store import request as request_sprite
 
 
 def _load_pokemon_sprite(sprite_url, size=64):
+    # Called every frame: a placeholder until the background load finishes, then the sprite
     if not sprite_url:
         return None
-    
-    cache_key = (sprite_url, size)
-    if cache_key in _SPRITE_CACHE:
-        return _SPRITE_CACHE[cache_key]
-    
     try:
-        response = requests.get(sprite_url, timeout=3)
-        if response.ok:
-            sprite = pygame.image.load(BytesIO(response.content)).convert_alpha()
-            sprite = pygame.transform.scale(sprite, (size, size))
-            _SPRITE_CACHE[cache_key] = sprite
-            return sprite
+        return request_sprite(sprite_url, (size, size))
     except Exception:
-        pass
-    
-    return None
+        return None
 
 
 def pokedex_menu(screen, pokedex, menu_font, small_font, colors, clock=None, is_battle_context=False, current_player=None, bag=None, pokedex_obj=None):
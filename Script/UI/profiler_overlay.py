@@ -0,0 +1,60 @@
+import pygame
+
+from profiling import ROLLING_FRAMES, percentile
+
+PANEL_WIDTH = 340
+GRAPH_HEIGHT = 80
+# Frames shown in the graph, one pixel column each
+GRAPH_FRAMES = PANEL_WIDTH - 20
+# Guide lines for 60 and 30 fps
+BUDGET_LINES = ((1000.0 / 60, (90, 200, 90)), (1000.0 / 30, (220, 180, 60)))
+
+
+def draw_profiler_overlay(screen, profiler, font, colors):
+    WHITE = colors.get("WHITE", (255, 255, 255))
+    RED = colors.get("RED", (200, 50, 50))
+
+    frames = profiler.recent_frames(max(ROLLING_FRAMES, GRAPH_FRAMES))
+    if not frames:
+        return
+
+    rolling = frames[-ROLLING_FRAMES:]
+    times = sorted(f["ms"] for f in rolling)
+    avg = sum(times) / len(times)
+    p95 = percentile(times, 95)
+    sections = profiler.rolling_sections(ROLLING_FRAMES)
+
+    line_h = font.get_linesize()
+    panel_h = 10 + line_h * (len(sections) + 1) + 10 + GRAPH_HEIGHT + 10
+    sw, _ = screen.get_size()
+    px = sw - PANEL_WIDTH - 8
+    py = 8
+
+    panel = pygame.Surface((PANEL_WIDTH, panel_h), pygame.SRCALPHA)
+    panel.fill((0, 0, 0, 190))
+    screen.blit(panel, (px, py))
+
+    y = py + 10
+    header = f"frame {avg:.2f} ms avg  {p95:.2f} ms p95  max {times[-1]:.1f}"
+    screen.blit(font.render(header, True, WHITE), (px + 10, y))
+    y += line_h
+    for name, ms in sections:
+        color = RED if ms > avg * 0.5 and ms > 4.0 else WHITE
+        screen.blit(font.render(f"{name:<14} {ms:6.2f} ms", True, color), (px + 10, y))
+        y += line_h
+
+    # Frame-time graph, newest on the right; the scale fits 30 fps or the worst frame shown
+    y += 10
+    graph = frames[-GRAPH_FRAMES:]
+    scale_ms = max(BUDGET_LINES[-1][0] * 1.25, max(f["ms"] for f in graph))
+    gx = px + 10
+    gy = y + GRAPH_HEIGHT
+    pygame.draw.rect(screen, (60, 60, 60), (gx, y, GRAPH_FRAMES, GRAPH_HEIGHT), 1)
+    for ms, color in BUDGET_LINES:
+        ly = gy - int(GRAPH_HEIGHT * ms / scale_ms)
+        pygame.draw.line(screen, color, (gx, ly), (gx + GRAPH_FRAMES - 1, ly))
+    x0 = gx + GRAPH_FRAMES - len(graph)
+    for i, frame in enumerate(graph):
+        h = max(1, int(GRAPH_HEIGHT * frame["ms"] / scale_ms))
+        color = RED if frame["ms"] > BUDGET_LINES[-1][0] else WHITE
+        pygame.draw.line(screen, color, (x0 + i, gy - 1), (x0 + i, gy - h))
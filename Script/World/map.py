@@ -1,13 +1,164 @@
 import pygame
 import pytmx
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from World.map_compiler import load_compiled_map
+from World.tileset_cache import SURFACE_LOCK, is_shared, load_tmx_lazy
+
+# Number of tiles per side of a pre-rendered ground chunk
+CHUNK_SIZE = 16
+# Baked chunk pixels one map keeps; the chunks drawn longest ago are dropped first
+CHUNK_MEMORY_BUDGET = 64 * 1024 * 1024
+# Number of tiles per side of a cell in the solid rect grid
+SOLID_CELL_TILES = 4
+# Tile draw paths: one blit per tile, or one Surface.blits per layer from packed atlas pages
+RENDER_BACKENDS = ("blit", "atlas")
+ATLAS_PAGE_SIZE = 2048
+
+SPLIT_LAYER_KEYWORDS = ("build", "building", "object", "objects", "tree", "trees", "house", "roof", "bush", "top", "nature")
+
+def _is_collision_layer(layer_name, layer_props):
+    return layer_name == "collision" or layer_props.get("collision") is True
+
+# Object name or type -> TileMap handler. An object runs every handler whose key matches
+# its name, its type or its layer's kind, each at most once.
+OBJECT_HANDLERS = {
+    "bush": "_parse_bush",
+    "nature": "_parse_nature",
+    "player": "_parse_player",
+    "professor": "_parse_professor",
+    "multiplayergym": "_parse_multiplayer_gym",
+    "hospital": "_parse_hospital",
+    "nurse_joy": "_parse_nurse_joy",
+    "shopkeeper": "_parse_shopkeeper",
+    "house": "_parse_house",
+    "grassgym": "_parse_grass_gym",
+    "icegym": "_parse_ice_gym",
+    "firegym": "_parse_fire_gym",
+    "trainer": "_parse_trainer",
+    "counter": "_parse_counter",
+    "roof": "_parse_roof",
+    "exit": "_parse_exit",
+}
+
+# Object layer name -> the handler key every object on it gets
+OBJECT_LAYER_KINDS = {
+    "bushes": "bush",
+    "nature": "nature",
+    "hospitals": "hospital",
+    "houses": "house",
+    "exits": "exit",
+}
+
+BUSH_TYPES = {"ice_bush": "ice", "sand_bush": "sand"}
+
+def merge_tile_rects(rects, tilewidth, tileheight):
+    # Greedy meshing: grow each free tile right as far as possible, then down while the
+    # whole run below is free. Rects that are not single grid-aligned tiles pass through.
+    tiles = set()
+    others = []
+    for r in rects:
+        if r.width == tilewidth and r.height == tileheight and r.x % tilewidth == 0 and r.y % tileheight == 0:
+            tiles.add((r.x // tilewidth, r.y // tileheight))
+        else:
+            others.append(r)
+
+    merged = []
+    used = set()
+    for x, y in sorted(tiles, key=lambda t: (t[1], t[0])):
+        if (x, y) in used:
+            continue
+        w = 1
+        while (x + w, y) in tiles and (x + w, y) not in used:
+            w += 1
+        h = 1
+        while all((x + i, y + h) in tiles and (x + i, y + h) not in used for i in range(w)):
+            h += 1
+        for j in range(h):
+            for i in range(w):
+                used.add((x + i, y + j))
+        merged.append(pygame.Rect(x * tilewidth, y * tileheight, w * tilewidth, h * tileheight))
+    return merged + others
+
+def pack_atlas(tiles, page_size=ATLAS_PAGE_SIZE):
+    # Shelf-packs tile surfaces into atlas pages; returns {id(tile): (page, area)}.
+    # Tiles bigger than a page get a page of their own. Every page is a new surface, so
+    # drawing from the atlas never reads the (shared) tiles again.
+    areas = {}
+    pages = []
+    placements = []
+    x = y = shelf_h = 0
+    for tile in sorted(tiles, key=lambda t: (-t.get_height(), -t.get_width())):
+        w, h = tile.get_size()
+        if w > page_size or h > page_size:
+            areas[id(tile)] = (tile.copy(), tile.get_rect())
+            continue
+        if x + w > page_size:
+            x = 0
+            y += shelf_h
+            shelf_h = 0
+        if y + h > page_size:
+            pages.append(placements)
+            placements = []
+            x = y = shelf_h = 0
+        placements.append((tile, x, y))
+        x += w
+        shelf_h = max(shelf_h, h)
+    if placements:
+        pages.append(placements)
+
+    for placements in pages:
+        width = max(px + tile.get_width() for tile, px, py in placements)
+        height = max(py + tile.get_height() for tile, px, py in placements)
+        page = pygame.Surface((width, height), pygame.SRCALPHA)
+        page.fill((0, 0, 0, 0))
+        for tile, px, py in placements:
+            # MAX onto the cleared page copies the pixels as-is, alpha included
+            page.blit(tile, (px, py), special_flags=pygame.BLEND_RGBA_MAX)
+            areas[id(tile)] = (page, pygame.Rect(px, py, tile.get_width(), tile.get_height()))
+    return areas
+
+def _is_split_layer(layer_name, layer_props):
+    if layer_props.get("split") is True:
+        return True
+    ln = (layer_name or "").lower()
+    for k in SPLIT_LAYER_KEYWORDS:
+        if k in ln:
+            return True
+    return False
 
 class TileMap:
-    def __init__(self, tmx_path, tile_size=64):
-        self.tmx = pytmx.load_pygame(tmx_path)
+    # Attributes derived from the TMX objects; the map compiler stores these as-is
+    SHAPE_ATTRS = ("bush_shapes", "nature_shapes", "hospital_shapes", "house_shapes", "GrassGym_shapes", "IceGym_shapes", "FireGym_shapes", "exit_shapes")
+    POINT_ATTRS = ("player_start", "professor_start", "nurse_joy_start", "shopkeeper_start")
+    RECT_ATTRS = ("multiplayer_gym_rect", "counter_rect")
+
+    def __init__(self, tmx_path, tile_size=64, chunk_size=CHUNK_SIZE, use_compiled=True, merge_collisions=True, compiled=None, lazy_tilesets=True, render_backend="blit", scroll_camera=True):
+        self.tmx = None
+        # Keep the static layers in a backbuffer and only redraw the strips a camera move exposes
+        self.scroll_camera = scroll_camera
+        self._backbuffer = None
+        self._backbuffer_offset = None
+        self.scroll_stats = {"full": 0, "scrolled": 0, "reused": 0}
+        self.lazy_tilesets = lazy_tilesets
+        self.set_render_backend(render_backend)
         self.tmx_path = tmx_path
         self.tilewidth = tile_size
         self.tileheight = tile_size
         self.tile_size = tile_size
+        self.chunk_size = max(1, int(chunk_size))
+        self._layer_index = []
+        self._draw_passes = []
+        self.chunk_memory_budget = CHUNK_MEMORY_BUDGET
+        self._chunk_lru = OrderedDict()
+        self._chunk_bytes = 0
+        self.chunk_evictions = 0
+        self._atlas = None
+        self._solid_grid = None
+        self._solid_grid_rects = None
+        self._collision_grid = None
+        self._collision_grid_rects = None
         self.width = 0
         self.height = 0
         self.collision_rects = []
@@ -31,12 +182,24 @@ class TileMap:
         self.nature_shapes = []
 
         if tmx_path:
-            self.load_tmx(tmx_path)
-
-        for obj_group in self.tmx.objectgroups:
-            for obj in obj_group:
-                self.objects.append(obj)
-        print("Loaded TMX objects:", self.objects)
+            t0 = time.perf_counter()
+            if compiled is None and use_compiled:
+                compiled = load_compiled_map(tmx_path)
+            if compiled is not None:
+                self.load_compiled(compiled)
+                source = "compiled"
+            else:
+                self.load_tmx(tmx_path)
+                source = "tmx"
+            if merge_collisions:
+                self.merge_collision_rects()
+            print(f"Loaded map '{tmx_path}' from {source} in {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+        if self.tmx is not None:
+            for obj_group in self.tmx.objectgroups:
+                for obj in obj_group:
+                    self.objects.append(obj)
+        print(f"Loaded {len(self.objects)} TMX objects")
 
     def get_counter_rect(self):
         return self.counter_rect
@@ -46,10 +209,31 @@ class TileMap:
 
     def load_tmx(self, tmx_path):
         try:
-            self.tmx = pytmx.load_pygame(tmx_path)
+            if self.lazy_tilesets:
+                self.tmx = load_tmx_lazy(tmx_path)
+            else:
+                self.tmx = pytmx.load_pygame(tmx_path)
         except Exception as e:
             raise RuntimeError(f"Failed to load TMX '{tmx_path}': {e}") from e
 
+        self._parse_map_data(tmx_path)
+        self._build_tile_index()
+
+    def load_compiled(self, compiled):
+        self.tmx = compiled.build_tmx()
+        self.tilewidth = self.tmx.tilewidth
+        self.tileheight = self.tmx.tileheight
+        self.tile_size = self.tilewidth
+        self.width = self.tmx.width * self.tilewidth
+        self.height = self.tmx.height * self.tileheight
+        for name, value in compiled.map_data().items():
+            setattr(self, name, value)
+        self._draw_passes = []
+        self._build_tile_index()
+
+    def _parse_map_data(self, tmx_path):
+        # Derives collision rects, trigger shapes and spawn points from self.tmx.
+        # Only needs tile layers and objects, so it also runs on an image-less pytmx.TiledMap.
         self.tilewidth = getattr(self.tmx, "tilewidth", self.tile_size)
         self.tileheight = getattr(self.tmx, "tileheight", self.tile_size)
         self.tile_size = self.tilewidth
@@ -67,6 +251,10 @@ class TileMap:
         self.exit_shapes = []
         self.multiplayer_gym_rect = None
         self.roof_rects = []
+        self.trainer_starts = []
+        # Chunks are baked lazily on the first draw after a (re)load
+        self._draw_passes = []
+        t0 = time.perf_counter()
 
         def _gid_to_int(gid):
             try:
@@ -74,199 +262,292 @@ class TileMap:
             except Exception:
                 return None
 
-        def _safe_lower(val):
-            return (val or "").lower()
-
-        print(f"Layers found: {[getattr(layer, 'name', None) for layer in self.tmx.visible_layers]}")
+        for layer in self.tmx.visible_layers:
+            if not hasattr(layer, "tiles"):
+                continue
+            layer_name = (getattr(layer, "name", "") or "").lower()
+            layer_props = getattr(layer, "properties", {}) or {}
+            is_collision_layer = _is_collision_layer(layer_name, layer_props)
+
+            for x, y, gid in layer.tiles():
+                gid_int = _gid_to_int(gid)
+                if gid_int is None:
+                    if is_collision_layer:
+                        self.collision_rects.append(self._tile_rect(x, y))
+                    continue
+                if gid_int == 0:
+                    continue
+
+                props = self.tmx.get_tile_properties_by_gid(gid_int) or {}
+                if props.get("collide") or props.get("blocked") or is_collision_layer:
+                    self.collision_rects.append(self._tile_rect(x, y))
+
+        object_count = 0
+        for layer_obj in self._object_groups():
+            layer_name = (getattr(layer_obj, "name", None) or "").lower()
+            layer_kind = OBJECT_LAYER_KINDS.get(layer_name)
+            for obj in layer_obj:
+                object_count += 1
+                name = (getattr(obj, "name", None) or "").lower()
+                otype = (getattr(obj, "type", None) or "").lower()
+                handled = set()
+                for kind in (name, otype, layer_kind):
+                    handler = OBJECT_HANDLERS.get(kind)
+                    if handler and handler not in handled:
+                        handled.add(handler)
+                        getattr(self, handler)(obj, name)
+
+        print(
+            f"Parsed '{tmx_path}' in {(time.perf_counter() - t0) * 1000:.1f} ms: {object_count} objects, "
+            f"{len(self.collision_rects)} collision rects, {len(self.bush_shapes)} bush, "
+            f"{len(self.nature_shapes)} nature, {len(self.hospital_shapes)} hospital, {len(self.house_shapes)} house, "
+            f"{len(self.GrassGym_shapes) + len(self.IceGym_shapes) + len(self.FireGym_shapes)} gym, "
+            f"{len(self.exit_shapes)} exit shapes, {len(self.trainer_starts)} trainers, player start {self.player_start}"
+        )
+
+    def _tile_rect(self, x, y):
+        return pygame.Rect(x * self.tilewidth, y * self.tileheight, self.tilewidth, self.tileheight)
+
+    def _object_groups(self):
+        # Object groups can show up in objectgroups, layers and visible_layers; visit each once
+        seen = set()
+        sources = [getattr(self.tmx, "objectgroups", ())]
+        sources.append(l for l in getattr(self.tmx, "layers", ()) if hasattr(l, "objects"))
+        sources.append(l for l in getattr(self.tmx, "visible_layers", ()) if hasattr(l, "objects"))
+        for source in sources:
+            for group in source:
+                if id(group) not in seen:
+                    seen.add(id(group))
+                    yield group
+
+    @staticmethod
+    def _object_shape(obj):
+        if getattr(obj, "points", None):
+            return list(obj.points)
+        return pygame.Rect(int(obj.x), int(obj.y), int(obj.width), int(obj.height))
+
+    @staticmethod
+    def _object_rect(obj):
+        return pygame.Rect(int(obj.x), int(obj.y), int(obj.width), int(obj.height))
+
+    def _parse_bush(self, obj, name):
+        bush_type = BUSH_TYPES.get(name, "forest")
+        self.bush_shapes.append({'rect': self._object_shape(obj), 'type': bush_type})
+
+    def _parse_nature(self, obj, name):
+        self.nature_shapes.append(self._object_shape(obj))
+
+    def _parse_player(self, obj, name):
+        self.player_start = (int(obj.x), int(obj.y))
+
+    def _parse_professor(self, obj, name):
+        self.professor_start = (int(obj.x), int(obj.y))
+
+    def _parse_multiplayer_gym(self, obj, name):
+        self.multiplayer_gym_rect = self._object_rect(obj)
+
+    def _parse_hospital(self, obj, name):
+        self.hospital_shapes.append(self._object_shape(obj))
+
+    def _parse_nurse_joy(self, obj, name):
+        if getattr(obj, "points", None):
+            self.nurse_joy_start = (int(obj.x), int(obj.y))
+
+    def _parse_shopkeeper(self, obj, name):
+        if getattr(obj, "points", None):
+            self.shopkeeper_start = (int(obj.x), int(obj.y))
+
+    def _parse_house(self, obj, name):
+        self.house_shapes.append(self._object_shape(obj))
+
+    def _parse_grass_gym(self, obj, name):
+        self.GrassGym_shapes.append(self._object_shape(obj))
+
+    def _parse_ice_gym(self, obj, name):
+        self.IceGym_shapes.append(self._object_shape(obj))
+
+    def _parse_fire_gym(self, obj, name):
+        self.FireGym_shapes.append(self._object_shape(obj))
+
+    def _parse_trainer(self, obj, name):
+        props = getattr(obj, "properties", {}) or {}
+        self.trainer_starts.append((int(obj.x), int(obj.y), props.get("type", "grass")))
+
+    def _parse_counter(self, obj, name):
+        self.counter_rect = self._object_rect(obj)
+
+    def _parse_roof(self, obj, name):
+        self.roof_rects.append(self._object_rect(obj))
+
+    def _parse_exit(self, obj, name):
+        self.exit_shapes.append(self._object_shape(obj))
+
+    def _build_tile_index(self):
+        # Per visible layer: row y -> [(x, surface, extra_h), ...] sorted by x
+        self._layer_index = []
+        self._atlas = None
+        rows = int(getattr(self.tmx, "height", 0) or 0)
 
         for layer in self.tmx.visible_layers:
+            if not hasattr(layer, "tiles"):
+                continue
             layer_name = (getattr(layer, "name", "") or "").lower()
             layer_props = getattr(layer, "properties", {}) or {}
+            if _is_collision_layer(layer_name, layer_props):
+                continue
 
-            if hasattr(layer, "tiles"):
-                is_collision_layer = layer_name == "collision" or layer_props.get("collision") is True
-
-                for x, y, gid in layer.tiles():
-                    gid_int = _gid_to_int(gid)
-                    if gid_int is None:
-                        if is_collision_layer:
-                            r = pygame.Rect(
-                                x * self.tilewidth, y * self.tileheight,
-                                self.tilewidth, self.tileheight
-                            )
-                            self.collision_rects.append(r)
-                        continue
-
-                    if gid_int == 0:
-                        continue
-
-                    props = self.tmx.get_tile_properties_by_gid(gid_int) or {}
-                    if props.get("collide") or props.get("blocked") or is_collision_layer:
-                        r = pygame.Rect(
-                            x * self.tilewidth, y * self.tileheight,
-                            self.tilewidth, self.tileheight
-                        )
-                        self.collision_rects.append(r)
-                        continue
-
-                    if gid_int == 0:
-                        continue
-
-                    props = self.tmx.get_tile_properties_by_gid(gid_int) or {}
-                    if props.get("collide") or props.get("blocked") or is_collision_layer:
-                        r = pygame.Rect(
-                            x * self.tilewidth, y * self.tileheight,
-                            self.tilewidth, self.tileheight
-                        )
-                        self.collision_rects.append(r)
-
-            object_layers = []
-            if hasattr(self.tmx, "objectgroups"):
-                object_layers.extend(self.tmx.objectgroups)
-            if hasattr(self.tmx, "layers"):
-                object_layers.extend([l for l in self.tmx.layers if hasattr(l, "objects")])
-            if hasattr(self.tmx, "visible_layers"):
-                object_layers.extend([l for l in self.tmx.visible_layers if hasattr(l, "objects")])
-
-            for layer_obj in object_layers:
-                layer_name = _safe_lower(getattr(layer_obj, "name", None))
-                for obj in layer_obj:
-                    name = _safe_lower(getattr(obj, "name", None))
-                    otype = _safe_lower(getattr(obj, "type", None))
-
-                    # Bush detection
-                    if name == "bush" or otype == "bush" or layer_name == "bushes":
-                        bush_type = "forest"  # Default type
-                        if name == "ice_bush":
-                            bush_type = "ice"
-                        elif name == "sand_bush":
-                            bush_type = "sand"
-
-                        if hasattr(obj, "points") and obj.points:
-                            polygon = list(obj.points)
-                            self.bush_shapes.append({'rect': polygon, 'type': bush_type})
-                        else:
-                            r = pygame.Rect(int(obj.x), int(obj.y), int(obj.width), int(obj.height))
-                            self.bush_shapes.append({'rect': r, 'type': bush_type})
-
-                    # Nature detection
-                    if name == "nature" or otype == "nature" or layer_name == "nature":
-                        if hasattr(obj, "points") and obj.points:
-                            polygon = list(obj.points)
-                            self.nature_shapes.append(polygon)
-                        else:
-                            r = pygame.Rect(int(obj.x), int(obj.y), int(obj.width), int(obj.height))
-                            self.nature_shapes.append(r)
-
-                    # Player start detection
-                    if name == "player" or otype == "player":
-                        self.player_start = (int(obj.x), int(obj.y))
-                        print(f"Player start position set to: {self.player_start}")
-
-                    # Professor npc detection
-                    if name == "professor" or otype == "professor":
-                        self.professor_start = (int(obj.x), int(obj.y))
-                        print(f"Professor start position set to: {self.professor_start}")
-
-                    # Multiplayer gym detection
-                    if name == "multiplayergym" or otype == "multiplayergym":
-                        self.multiplayer_gym_rect = pygame.Rect(int(obj.x), int(obj.y), int(obj.width), int(obj.height))
-                        print(f"Multiplayer gym rect set to: {self.multiplayer_gym_rect}")
-
-                    # Hospital detection
-                    if name == "hospital" or otype == "hospital" or layer_name == "hospitals":
-                        if hasattr(obj, "points") and obj.points:
-                            polygon = list(obj.points)
-                            self.hospital_shapes.append(polygon)
-                            print(f"Added hospital polygon (object layer): {polygon}")
-                        else:
-                            r = pygame.Rect(int(obj.x), int(obj.y), int(obj.width), int(obj.height))
-                            self.hospital_shapes.append(r)
-                            print(f"Added hospital rect (object layer): {r}")
-
-                    # Hospital NPC detection
-                    if name == "nurse_joy" or otype == "nurse_joy":
-                        if hasattr(obj, "points") and obj.points:
-                            self.nurse_joy_start = (int(obj.x), int(obj.y))
-                            print(f"Nurse Joy start position set to: {self.nurse_joy_start}")
-
-                    if name == "shopkeeper" or otype == "shopkeeper":
-                        if hasattr(obj, "points") and obj.points:
-                            self.shopkeeper_start = (int(obj.x), int(obj.y))
-                            print(f"Shopkeeper start position set to: {self.shopkeeper_start}")
-
-                    # House detection
-                    if name == "house" or otype == "house" or layer_name == "houses":
-                        if hasattr(obj, "points") and obj.points:
-                            polygon = list(obj.points)
-                            self.house_shapes.append(polygon)
-                            print(f"Added house polygon (object layer): {polygon}")
-                        else:
-                            r = pygame.Rect(int(obj.x), int(obj.y), int(obj.width), int(obj.height))
-                            self.house_shapes.append(r)
-                            print(f"Added house rect (object layer): {r}")
-
-                    if name == "grassgym" or otype == "grassgym" or layer_name == "Gym":
-                        if hasattr(obj, "points") and obj.points:
-                            polygon = list(obj.points)
-                            self.GrassGym_shapes.append(polygon)
-                            print(f"Added Grass Gym polygon (object layer): {polygon}")
-                        else:
-                            r = pygame.Rect(int(obj.x), int(obj.y), int(obj.width), int(obj.height))
-                            self.GrassGym_shapes.append(r)
-                            print(f"Added Grass Gym rect (object layer): {r}")
-
-                    if name == "icegym" or otype == "icegym" or layer_name == "Gym":
-                        if hasattr(obj, "points") and obj.points:
-                            polygon = list(obj.points)
-                            self.IceGym_shapes.append(polygon)
-                            print(f"Added Ice Gym polygon (object layer): {polygon}")
-                        else:
-                            r = pygame.Rect(int(obj.x), int(obj.y), int(obj.width), int(obj.height))
-                            self.IceGym_shapes.append(r)
-                            print(f"Added Ice Gym rect (object layer): {r}")
-
-                    if name == "firegym" or otype == "firegym" or layer_name == "Gym":
-                        if hasattr(obj, "points") and obj.points:
-                            polygon = list(obj.points)
-                            self.FireGym_shapes.append(polygon)
-                            print(f"Added Fire Gym polygon (object layer): {polygon}")
-                        else:
-                            r = pygame.Rect(int(obj.x), int(obj.y), int(obj.width), int(obj.height))
-                            self.FireGym_shapes.append(r)
-                            print(f"Added Fire Gym rect (object layer): {r}")
-
-                    if name == "trainer" or otype == "trainer":
-                        self.trainer_starts.append((int(obj.x), int(obj.y), obj.properties.get("type", "grass")))
-                        print(f"Trainer start position set to: {(int(obj.x), int(obj.y))} with type {obj.properties.get('type', 'grass')}")
-
-                    # Counter detection
-                    if name == "counter" or otype == "counter":
-                        self.counter_rect = pygame.Rect(int(obj.x), int(obj.y), int(obj.width), int(obj.height))
-                        print(f"Counter rect set to: {self.counter_rect}")
-
-                    # Roof detection
-                    if name == "roof" or otype == "roof":
-                        r = pygame.Rect(int(obj.x), int(obj.y), int(obj.width), int(obj.height))
-                        self.roof_rects.append(r)
-                        print(f"Added roof rect: {r}")
-
-                    # Exit detection
-                    if name == "exit" or otype == "exit" or layer_name == "exits":
-                        if hasattr(obj, "points") and obj.points:
-                            polygon = list(obj.points)
-                            self.exit_shapes.append(polygon)
-                            print(f"Added exit polygon (object layer): {polygon}")
-                        else:
-                            r = pygame.Rect(int(obj.x), int(obj.y), int(obj.width), int(obj.height))
-                            self.exit_shapes.append(r)
-                            print(f"Added exit rect (object layer): {r}")
-
-        print(f"TileMap built {len(self.collision_rects)} collision rects, {len(self.bush_shapes)} bush shapes, {len(self.hospital_shapes)} hospital shapes, {len(self.house_shapes)} house shapes, and {len(self.exit_shapes)} exit shapes from '{tmx_path}'")
-        print(f"Player start position: {self.player_start}")
+            layer_rows = [[] for _ in range(rows)]
+            max_extra_h = 0
+            max_extra_w = 0
+            for x, y, gid in layer.tiles():
+                tile = None
+                if isinstance(gid, pygame.Surface):
+                    tile = gid
+                else:
+                    try:
+                        tile = self.tmx.get_tile_image_by_gid(gid)
+                    except Exception:
+                        tile = None
+                if not tile or not 0 <= y < rows:
+                    continue
+                extra_h = max(0, tile.get_height() - self.tileheight)
+                max_extra_h = max(max_extra_h, extra_h)
+                max_extra_w = max(max_extra_w, tile.get_width() - self.tilewidth)
+                layer_rows[y].append((x, tile, extra_h))
+
+            for row in layer_rows:
+                row.sort(key=lambda entry: entry[0])
+
+            self._layer_index.append({
+                "layer": layer,
+                "name": layer_name,
+                "props": layer_props,
+                "split": _is_split_layer(layer_name, layer_props),
+                "top": "top" in layer_name,
+                "rows": layer_rows,
+                # Tall tiles reach into the rows above, wide tiles into the columns to the right
+                "extra_rows": -(-max_extra_h // self.tileheight),
+                "extra_cols": -(-max(0, max_extra_w) // self.tilewidth),
+            })
+
+        self._build_draw_passes()
+
+    def _build_draw_passes(self):
+        # The layers in order as passes: consecutive static layers share one chunk run, and the
+        # split layers between two runs form one band, so a static layer above a split layer
+        # still draws over it. A band's tiles are sorted by (tile_bottom, layer order, x), so one
+        # bisect on the player's bottom separates what is behind from what is in front.
+        # "top" layers always cover the player and are drawn by draw_upper only.
+        passes = []
+        for order, record in enumerate(self._layer_index):
+            if record["top"] and record["split"]:
+                continue
+            kind = "split" if record["split"] else "chunks"
+            if not passes or passes[-1][0] != kind:
+                if kind == "split":
+                    passes.append((kind, {"tiles": [], "bottoms": [], "reach": 0}))
+                else:
+                    passes.append((kind, {"records": [], "chunks": {}}))
+            item = passes[-1][1]
+            if kind == "chunks":
+                item["records"].append(record)
+                continue
+            for y, row in enumerate(record["rows"]):
+                tile_bottom = y * self.tileheight + self.tileheight
+                for x, tile, extra_h in row:
+                    item["tiles"].append((
+                        tile_bottom, order, x, tile,
+                        x * self.tilewidth, y * self.tileheight - extra_h, tile.get_width(),
+                    ))
+                    item["reach"] = max(item["reach"], self.tileheight + extra_h)
+
+        for kind, item in passes:
+            if kind == "split":
+                item["tiles"].sort(key=lambda entry: entry[:3])
+                item["bottoms"] = [entry[0] for entry in item["tiles"]]
+        self._draw_passes = passes
+        self._chunk_lru = OrderedDict()
+        self._chunk_bytes = 0
+        self._backbuffer_offset = None
+
+    def _visible_tile_range(self, surface, record, offset_x, offset_y):
+        view_w, view_h = surface.get_size()
+        left = -int(offset_x)
+        top = -int(offset_y)
+        x0 = left // self.tilewidth - record["extra_cols"]
+        x1 = (left + view_w - 1) // self.tilewidth
+        y0 = max(0, top // self.tileheight)
+        y1 = min(len(record["rows"]) - 1, (top + view_h - 1) // self.tileheight + record["extra_rows"])
+        return x0, x1, y0, y1
 
     def get_solid_rects(self):
         return self.collision_rects
+
+    def merge_collision_rects(self):
+        before = len(self.collision_rects)
+        self.collision_rects = merge_tile_rects(self.collision_rects, self.tilewidth, self.tileheight)
+        after = len(self.collision_rects)
+        saved = 100.0 * (before - after) / before if before else 0.0
+        print(f"Merged {before} collision rects into {after} ({saved:.0f}% fewer)")
+
+    def _get_solid_grid(self):
+        # Built lazily and rebuilt whenever collision_rects is replaced
+        if self._solid_grid is not None and self._solid_grid_rects is self.collision_rects:
+            return self._solid_grid
+
+        cell = max(1, self.tilewidth * SOLID_CELL_TILES)
+        cells = {}
+        for i, r in enumerate(self.collision_rects):
+            for cy in range(r.top // cell, (r.bottom - 1) // cell + 1):
+                for cx in range(r.left // cell, (r.right - 1) // cell + 1):
+                    cells.setdefault((cx, cy), []).append(i)
+        self._solid_grid = {"cell": cell, "cells": cells}
+        self._solid_grid_rects = self.collision_rects
+        return self._solid_grid
+
+    def get_collision_grid(self):
+        # One byte per tile, 1 where any collision rect covers the tile; row-major
+        if self._collision_grid is not None and self._collision_grid_rects is self.collision_rects:
+            return self._collision_grid
+
+        tw = self.tilewidth
+        th = self.tileheight
+        cols = -(-max(0, self.width) // tw)
+        rows = -(-max(0, self.height) // th)
+        cells = bytearray(cols * rows)
+        for r in self.collision_rects:
+            x0 = max(0, r.left // tw)
+            x1 = min(cols - 1, (r.right - 1) // tw)
+            for ty in range(max(0, r.top // th), min(rows - 1, (r.bottom - 1) // th) + 1):
+                row = ty * cols
+                for tx in range(x0, x1 + 1):
+                    cells[row + tx] = 1
+        self._collision_grid = {"cols": cols, "rows": rows, "cells": cells}
+        self._collision_grid_rects = self.collision_rects
+        return self._collision_grid
+
+    def is_solid_tile(self, tx, ty):
+        grid = self.get_collision_grid()
+        if 0 <= tx < grid["cols"] and 0 <= ty < grid["rows"]:
+            return grid["cells"][ty * grid["cols"] + tx] == 1
+        return False
+
+    def is_solid_at(self, x, y):
+        return self.is_solid_tile(int(x) // self.tilewidth, int(y) // self.tileheight)
+
+    def get_solid_rects_near(self, rect):
+        # Solid rects whose grid cells overlap rect, in the same order as get_solid_rects()
+        grid = self._get_solid_grid()
+        cell = grid["cell"]
+        cells = grid["cells"]
+        found = set()
+        for cy in range(rect.top // cell, (rect.bottom - 1) // cell + 1):
+            for cx in range(rect.left // cell, (rect.right - 1) // cell + 1):
+                hits = cells.get((cx, cy))
+                if hits:
+                    found.update(hits)
+        rects = self.collision_rects
+        return [rects[i] for i in sorted(found)]
     
     def get_bush_type(self, bush):
         if isinstance(bush, dict):
@@ -306,134 +587,321 @@ class TileMap:
         if not self.tmx:
             return
 
-        self._draw_tiles(surface, offset_x, offset_y, predicate=None)
+        self._draw_tiles(surface, offset_x, offset_y)
 
-    def _draw_tiles(self, surface, offset_x=0, offset_y=0, predicate=None):
+    def _draw_tiles(self, surface, offset_x=0, offset_y=0):
         if not self.tmx:
             return
 
-        for layer in self.tmx.visible_layers:
-            layer_name = (getattr(layer, "name", "") or "").lower()
-            layer_props = getattr(layer, "properties", {}) or {}
-
-            if layer_name == "collision" or layer_props.get("collision") is True:
+        for record in self._layer_index:
+            self._draw_layer(surface, record, offset_x, offset_y)
+
+    def set_render_backend(self, backend):
+        if backend not in RENDER_BACKENDS:
+            raise ValueError(f"Unknown render backend '{backend}', expected one of {RENDER_BACKENDS}")
+        self.render_backend = backend
+        # Baked chunks look the same either way, so they are kept
+
+    def _get_atlas(self):
+        if self._atlas is None:
+            tiles = {}
+            for record in self._layer_index:
+                for row in record["rows"]:
+                    for x, tile, extra_h in row:
+                        tiles[id(tile)] = tile
+            # The tiles belong to tileset_cache; another thread may be reading their sheets
+            with SURFACE_LOCK:
+                self._atlas = pack_atlas(tiles.values())
+        return self._atlas
+
+    def _submit(self, surface, draws):
+        # draws: [(tile, dest), ...] in paint order
+        if not draws:
+            return
+        if self.render_backend == "atlas":
+            atlas = self._get_atlas()
+            batch = []
+            for tile, dest in draws:
+                page, area = atlas[id(tile)]
+                batch.append((page, dest, area))
+            surface.blits(batch, doreturn=False)
+        else:
+            with SURFACE_LOCK:
+                for tile, dest in draws:
+                    surface.blit(tile, dest)
+
+    def _draw_layer(self, surface, record, offset_x=0, offset_y=0):
+        rows = record["rows"]
+        tw = self.tilewidth
+        th = self.tileheight
+        x0, x1, y0, y1 = self._visible_tile_range(surface, record, offset_x, offset_y)
+
+        draws = []
+        for y in range(y0, y1 + 1):
+            row = rows[y]
+            if not row:
                 continue
-
-            if hasattr(layer, "tiles"):
-                for x, y, gid in layer.tiles():
-                    tile = None
-                    if isinstance(gid, pygame.Surface):
-                        tile = gid
-                    else:
-                        try:
-                            tile = self.tmx.get_tile_image_by_gid(gid)
-                        except Exception:
-                            tile = None
-                    tile_bottom = y * self.tileheight + self.tileheight
-                    if predicate is not None:
-                        try:
-                            ok = predicate(tile_bottom, layer_name, layer_props)
-                        except Exception:
-                            ok = False
-                    else:
-                        ok = True
-
-                    if not ok:
-                        continue
-
-                    if tile:
-                        try:
-                            extra_h = tile.get_height() - self.tileheight
-                        except Exception:
-                            extra_h = 0
-                        if extra_h < 0:
-                            extra_h = 0
-
-                        surface.blit(
-                            tile,
-                            (x * self.tilewidth + offset_x,
-                             y * self.tileheight + offset_y - extra_h)
-                        )
+            start = bisect_left(row, (x0,))
+            stop = bisect_left(row, (x1 + 1,))
+            for x, tile, extra_h in row[start:stop]:
+                draws.append((tile, (x * tw + offset_x, y * th + offset_y - extra_h)))
+        self._submit(surface, draws)
+
+    def _draw_split_range(self, surface, band, start, stop, offset_x=0, offset_y=0):
+        left = -int(offset_x)
+        right = left + surface.get_width()
+        entries = band["tiles"]
+        draws = []
+        for i in range(start, stop):
+            entry = entries[i]
+            dx = entry[4]
+            if dx >= right or dx + entry[6] <= left:
+                continue
+            draws.append((entry[3], (dx + offset_x, entry[5] + offset_y)))
+        self._submit(surface, draws)
+
+    def _visible_split_range(self, surface, band, offset_x=0, offset_y=0):
+        top = -int(offset_y)
+        bottom = top + surface.get_height()
+        lo = bisect_right(band["bottoms"], top)
+        hi = bisect_left(band["bottoms"], bottom + band["reach"])
+        return lo, hi
+
+    def _build_chunk(self, run, cx, cy):
+        cs = self.chunk_size
+        tw = self.tilewidth
+        th = self.tileheight
+        x0 = cx * cs
+        y0 = cy * cs
+        chunk = pygame.Surface((cs * tw, cs * th), pygame.SRCALPHA)
+        chunk.fill((0, 0, 0, 0))
+
+        for record in run["records"]:
+            rows = record["rows"]
+            x_start = x0 - record["extra_cols"]
+            draws = []
+            for y in range(y0, min(len(rows), y0 + cs + record["extra_rows"])):
+                row = rows[y]
+                start = bisect_left(row, (x_start,))
+                stop = bisect_left(row, (x0 + cs,))
+                for x, tile, extra_h in row[start:stop]:
+                    draws.append((tile, ((x - x0) * tw, (y - y0) * th - extra_h)))
+            self._submit(chunk, draws)
+
+        if chunk.get_bounding_rect().width == 0:
+            return False
+        return chunk
+
+    def _chunk_range(self, world_rect):
+        # (cx0, cy0, cx1, cy1) of the chunks overlapping world_rect, clamped to the map
+        chunk_w = self.chunk_size * self.tilewidth
+        chunk_h = self.chunk_size * self.tileheight
+        cols = -(-max(1, self.width) // chunk_w)
+        rows = -(-max(1, self.height) // chunk_h)
+        return (
+            max(0, world_rect.left // chunk_w),
+            max(0, world_rect.top // chunk_h),
+            min(cols - 1, (world_rect.right - 1) // chunk_w),
+            min(rows - 1, (world_rect.bottom - 1) // chunk_h),
+        )
+
+    def _bake_chunk(self, run, cx, cy):
+        chunk = self._build_chunk(run, cx, cy)
+        run["chunks"][(cx, cy)] = chunk
+        if chunk:
+            self._chunk_lru[(id(run), cx, cy)] = run
+            self._chunk_bytes += chunk.get_width() * chunk.get_height() * chunk.get_bytesize()
+        return chunk
+
+    def _draw_chunks(self, surface, run, offset_x=0, offset_y=0, area=None):
+        # area limits drawing to part of the surface (in surface coordinates)
+        chunk_w = self.chunk_size * self.tilewidth
+        chunk_h = self.chunk_size * self.tileheight
+        offset_x = int(offset_x)
+        offset_y = int(offset_y)
+        if area is None:
+            area = surface.get_rect()
+        cx0, cy0, cx1, cy1 = self._chunk_range(area.move(-offset_x, -offset_y))
+
+        chunks = run["chunks"]
+        lru = self._chunk_lru
+        built = False
+        previous_clip = surface.get_clip()
+        surface.set_clip(area.clip(previous_clip))
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                chunk = chunks.get((cx, cy))
+                if chunk is None:
+                    chunk = self._bake_chunk(run, cx, cy)
+                    built = True
+                if chunk:
+                    lru.move_to_end((id(run), cx, cy))
+                    surface.blit(chunk, (cx * chunk_w + offset_x, cy * chunk_h + offset_y))
+        surface.set_clip(previous_clip)
+        if built:
+            self._evict_chunks(chunk_w, chunk_h)
+
+    def warm(self, view_size, focus=None, budget_ms=None):
+        # Bakes what a view_size camera centred on focus (default: the player start) draws
+        # first, so the first frame on a freshly adopted map only blits. With budget_ms it
+        # stops once that much time is spent; returns True when nothing is left to bake.
+        if not self.tmx:
+            return True
+        t0 = time.perf_counter()
+        if self.render_backend == "atlas":
+            self._get_atlas()
+        if focus is None:
+            focus = self.player_start or (self.width // 2, self.height // 2)
+        view_w, view_h = view_size
+        # A tile of slack around the view: the camera follows the player's centre, not the spawn point
+        view = pygame.Rect(int(focus[0]) - view_w // 2, int(focus[1]) - view_h // 2, view_w, view_h)
+        cx0, cy0, cx1, cy1 = self._chunk_range(view.inflate(self.tilewidth * 2, self.tileheight * 2))
+        missing = [
+            (run, cx, cy)
+            for kind, run in self._draw_passes if kind == "chunks"
+            for cy in range(cy0, cy1 + 1)
+            for cx in range(cx0, cx1 + 1)
+            if (cx, cy) not in run["chunks"]
+        ]
+        done = True
+        for i, (run, cx, cy) in enumerate(missing):
+            if i and budget_ms is not None and (time.perf_counter() - t0) * 1000 >= budget_ms:
+                done = False
+                break
+            self._bake_chunk(run, cx, cy)
+        if missing:
+            self._evict_chunks(self.chunk_size * self.tilewidth, self.chunk_size * self.tileheight)
+        return done
+
+    def _evict_chunks(self, chunk_w, chunk_h):
+        # Least recently drawn first; never below the chunks of the current view, which are the newest
+        budget = self.chunk_memory_budget
+        lru = self._chunk_lru
+        while budget is not None and self._chunk_bytes > budget and len(lru) > 1:
+            (_, cx, cy), run = lru.popitem(last=False)
+            chunk = run["chunks"].pop((cx, cy), None)
+            if chunk:
+                self._chunk_bytes -= chunk_w * chunk_h * chunk.get_bytesize()
+                self.chunk_evictions += 1
+
+    def _draw_static(self, surface, run, offset_x=0, offset_y=0):
+        if not self.scroll_camera:
+            return self._draw_chunks(surface, run, offset_x, offset_y)
+
+        offset_x = int(offset_x)
+        offset_y = int(offset_y)
+        view_w, view_h = surface.get_size()
+        buf = self._backbuffer
+        if buf is None or buf.get_size() != (view_w, view_h):
+            # Opaque and in the target's pixel format, so the per-frame blit is a plain copy
+            buf = self._backbuffer = pygame.Surface((view_w, view_h), 0, surface)
+            self._backbuffer_offset = None
+
+        last = self._backbuffer_offset
+        if last is None or abs(offset_x - last[0]) >= view_w or abs(offset_y - last[1]) >= view_h:
+            dirty = [buf.get_rect()]
+            self.scroll_stats["full"] += 1
+        else:
+            dx = offset_x - last[0]
+            dy = offset_y - last[1]
+            dirty = []
+            if dx or dy:
+                buf.scroll(dx, dy)
+                if dx > 0:
+                    dirty.append(pygame.Rect(0, 0, dx, view_h))
+                elif dx < 0:
+                    dirty.append(pygame.Rect(view_w + dx, 0, -dx, view_h))
+                if dy > 0:
+                    dirty.append(pygame.Rect(0, 0, view_w, dy))
+                elif dy < 0:
+                    dirty.append(pygame.Rect(0, view_h + dy, view_w, -dy))
+                self.scroll_stats["scrolled"] += 1
+            else:
+                self.scroll_stats["reused"] += 1
+
+        for area in dirty:
+            # The target already holds the frame's background; copy it in where the chunks are transparent
+            buf.blit(surface, area, area)
+            self._draw_chunks(buf, run, offset_x, offset_y, area)
+        self._backbuffer_offset = (offset_x, offset_y)
+        surface.blit(buf, (0, 0))
+
+    def invalidate_backbuffer(self):
+        self._backbuffer_offset = None
 
     def draw_lower(self, surface, player_rect, offset_x=0, offset_y=0):
+        if not self.tmx:
+            return
         if player_rect is None:
-            return self._draw_tiles(surface, offset_x, offset_y, predicate=None)
-
-        player_bottom = player_rect.bottom
-
-        def is_split_layer(layer_name, layer_props):
-            if layer_props.get("split") is True:
-                return True
-            ln = (layer_name or "").lower()
-            keywords = ("build", "building", "object", "objects", "tree", "trees", "house", "roof", "bush", "top", "nature")
-            for k in keywords:
-                if k in ln:
-                    return True
-            return False
-
-        def pred(tile_bottom, layer_name, layer_props):
-            if not is_split_layer(layer_name, layer_props):
-                return True
-            return tile_bottom <= player_bottom
-
-        self._draw_tiles(surface, offset_x, offset_y, predicate=pred)
+            return self._draw_tiles(surface, offset_x, offset_y)
+
+        for i, (kind, item) in enumerate(self._draw_passes):
+            if kind == "split":
+                lo, hi = self._visible_split_range(surface, item, offset_x, offset_y)
+                split = bisect_right(item["bottoms"], player_rect.bottom, lo, max(lo, hi))
+                self._draw_split_range(surface, item, lo, split, offset_x, offset_y)
+            elif i == 0:
+                self._draw_static(surface, item, offset_x, offset_y)
+            else:
+                # The backbuffer only holds the bottom run; runs above a split band draw their chunks directly
+                self._draw_chunks(surface, item, offset_x, offset_y)
 
     def draw_upper(self, surface, player_rect, offset_x=0, offset_y=0):
+        if not self.tmx:
+            return
         if player_rect is None:
-            return self._draw_tiles(surface, offset_x, offset_y, predicate=None)
-
-        player_bottom = player_rect.bottom
-
-        def is_split_layer(layer_name, layer_props):
-            if layer_props.get("split") is True:
-                return True
-            ln = (layer_name or "").lower()
-            keywords = ("build", "building", "object", "objects", "tree", "trees", "house", "roof", "bush", "top", "nature")
-            for k in keywords:
-                if k in ln:
-                    return True
-            return False
+            return self._draw_tiles(surface, offset_x, offset_y)
 
-        def pred(tile_bottom, layer_name, layer_props):
-            if "top" in (layer_name or "").lower():
-                return True
-            if not is_split_layer(layer_name, layer_props):
-                return False
-            return tile_bottom >= player_bottom
+        for kind, item in self._draw_passes:
+            if kind == "split":
+                lo, hi = self._visible_split_range(surface, item, offset_x, offset_y)
+                split = bisect_left(item["bottoms"], player_rect.bottom, lo, max(lo, hi))
+                self._draw_split_range(surface, item, split, hi, offset_x, offset_y)
 
-        self._draw_tiles(surface, offset_x, offset_y, predicate=pred)
+        for record in self._layer_index:
+            if record["top"]:
+                self._draw_layer(surface, record, offset_x, offset_y)
 
     def draw_counters(self, surface, offset_x=0, offset_y=0):
         if not self.counter_rect:
             return
-        
-        for layer in self.tmx.visible_layers:
-            layer_name = (getattr(layer, "name", "") or "").lower()
-            
-            if "counter" not in layer_name:
-                continue
 
-            if hasattr(layer, "tiles"):
-                for x, y, gid in layer.tiles():
-                    tile = None
-                    if isinstance(gid, pygame.Surface):
-                        tile = gid
-                    else:
-                        try:
-                            tile = self.tmx.get_tile_image_by_gid(gid)
-                        except Exception:
-                            tile = None
-
-                    if tile:
-                        try:
-                            extra_h = tile.get_height() - self.tileheight
-                        except Exception:
-                            extra_h = 0
-                        if extra_h < 0:
-                            extra_h = 0
-
-                        surface.blit(
-                            tile,
-                            (x * self.tilewidth + offset_x,
-                             y * self.tileheight + offset_y - extra_h)
-                        )
\ No newline at end of file
+        for record in self._layer_index:
+            if "counter" in record["name"]:
+                self._draw_layer(surface, record, offset_x, offset_y)
+
+    def memory_estimate(self):
+        # Rough pixel bytes held by this map: its own decoded tiles, atlas pages, baked chunks,
+        # the backbuffer, the full map overview and the zoomable map pyramid. Tiles from
+        # tileset_cache are shared with other maps and stay when this one goes, so they are not counted.
+        def _surface_bytes(surf):
+            try:
+                w, h = surf.get_size()
+                return w * h * surf.get_bytesize()
+            except Exception:
+                return 0
+
+        seen = set()
+        total = 0
+        for image in getattr(self.tmx, "images", None) or ():
+            if isinstance(image, pygame.Surface) and id(image) not in seen and not is_shared(image):
+                seen.add(id(image))
+                total += _surface_bytes(image)
+        if self._atlas is not None:
+            for page, area in self._atlas.values():
+                if id(page) not in seen:
+                    seen.add(id(page))
+                    total += _surface_bytes(page)
+        for kind, item in self._draw_passes:
+            if kind == "chunks":
+                for chunk in item["chunks"].values():
+                    if chunk:
+                        total += _surface_bytes(chunk)
+        if self._backbuffer is not None:
+            total += _surface_bytes(self._backbuffer)
+        full_map = getattr(self, "_full_map_surf", None)
+        if full_map:
+            total += _surface_bytes(full_map)
+        for scale, level in getattr(self, "_map_pyramid", None) or ():
+            total += _surface_bytes(level)
+        return total
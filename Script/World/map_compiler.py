@@ -0,0 +1,476 @@
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+from array import array
+from pathlib import Path
+
+import pygame
+
+from World.tileset_cache import tile_image
+
+# Compiled maps live next to their TMX file: World.tmx -> World.tmxc
+COMPILED_SUFFIX = ".tmxc"
+MAGIC = b"PYMAPC\x00\x00"
+FORMAT_VERSION = 2
+# magic, format version, sha1 of the TMX + TSX sources, meta offset, meta length
+HEADER = struct.Struct("<8sI20sQQ")
+
+_TILESET_SOURCE_RE = re.compile(rb"<tileset[^>]*\ssource=\"([^\"]+)\"")
+
+
+def compiled_path_for(tmx_path):
+    return str(Path(tmx_path).with_suffix(COMPILED_SUFFIX))
+
+
+def _source_files(tmx_path):
+    # The TMX itself plus every external tileset it references
+    tmx_path = Path(tmx_path)
+    with open(tmx_path, "rb") as f:
+        text = f.read()
+    files = [tmx_path.name]
+    for match in _TILESET_SOURCE_RE.finditer(text):
+        files.append(match.group(1).decode("utf-8"))
+    return files
+
+
+def _hash_sources(map_dir, sources):
+    digest = hashlib.sha1()
+    for rel in sources:
+        with open(os.path.join(map_dir, rel), "rb") as f:
+            digest.update(f.read())
+    return digest.digest()
+
+
+def source_digest(tmx_path):
+    # Hex sha1 of the TMX and its tilesets; changes whenever the map would look different
+    map_dir = os.path.dirname(os.path.abspath(tmx_path))
+    return _hash_sources(map_dir, _source_files(tmx_path)).hex()
+
+
+def _plain_properties(props):
+    # Only keep values that survive a JSON round trip unchanged
+    out = {}
+    for key, value in (props or {}).items():
+        if isinstance(value, (str, int, float, bool)) or value is None:
+            out[str(key)] = value
+    return out
+
+
+def _encode_shape(shape):
+    if isinstance(shape, dict):
+        return {"shape": _encode_shape(shape.get("rect")), "type": shape.get("type", "forest")}
+    if isinstance(shape, pygame.Rect):
+        return ["rect", shape.x, shape.y, shape.width, shape.height]
+    return ["poly", [[float(p[0]), float(p[1])] for p in shape]]
+
+
+def _decode_shape(data):
+    if isinstance(data, dict):
+        return {"rect": _decode_shape(data["shape"]), "type": data.get("type", "forest")}
+    if data[0] == "rect":
+        return pygame.Rect(data[1], data[2], data[3], data[4])
+    return [(p[0], p[1]) for p in data[1]]
+
+
+def _encode_rect(rect):
+    if rect is None:
+        return None
+    return [rect.x, rect.y, rect.width, rect.height]
+
+
+def _decode_rect(data):
+    if data is None:
+        return None
+    return pygame.Rect(data[0], data[1], data[2], data[3])
+
+
+def _image_table(tmx, map_dir):
+    # pytmx's default image loader leaves (filename, rect, flags) in tmx.images
+    files = []
+    file_ids = {}
+    table = []
+    for image in tmx.images:
+        if not isinstance(image, tuple) or not image or not image[0]:
+            table.append(None)
+            continue
+        filename, rect, flags = (tuple(image) + (None, None))[:3]
+        rel = os.path.relpath(os.path.normpath(filename), map_dir)
+        if rel not in file_ids:
+            file_ids[rel] = len(files)
+            files.append(rel)
+        if rect is None:
+            rect = (0, 0, 0, 0)
+        fh = bool(getattr(flags, "flipped_horizontally", False))
+        fv = bool(getattr(flags, "flipped_vertically", False))
+        fd = bool(getattr(flags, "flipped_diagonally", False))
+        table.append([file_ids[rel], int(rect[0]), int(rect[1]), int(rect[2]), int(rect[3]), fh, fv, fd])
+    return files, table
+
+
+def build_artifact(tmx_path):
+    import pytmx
+    from World.map import TileMap
+
+    tmx_path = Path(tmx_path)
+    map_dir = str(tmx_path.parent)
+    tmx = pytmx.TiledMap(str(tmx_path))
+
+    tilemap = TileMap(None, tile_size=tmx.tilewidth)
+    tilemap.tmx = tmx
+    tilemap.tmx_path = str(tmx_path)
+    tilemap._parse_map_data(str(tmx_path))
+
+    blobs = []
+    offset = HEADER.size
+
+    def add_blob(values, typecode):
+        nonlocal offset
+        packed = array(typecode, values)
+        if sys.byteorder != "little":
+            packed.byteswap()
+        data = packed.tobytes()
+        start = offset
+        blobs.append(data)
+        offset += len(data)
+        return start
+
+    layers = []
+    for layer in tmx.layers:
+        entry = {
+            "name": getattr(layer, "name", None),
+            "visible": bool(getattr(layer, "visible", True)),
+            "properties": _plain_properties(getattr(layer, "properties", {})),
+        }
+        if hasattr(layer, "tiles") and hasattr(layer, "data"):
+            entry["kind"] = "tiles"
+            entry["width"] = int(layer.width)
+            entry["height"] = int(layer.height)
+            entry["offset"] = add_blob((gid for row in layer.data for gid in row), "I")
+        elif hasattr(layer, "objects") or isinstance(layer, pytmx.TiledObjectGroup):
+            entry["kind"] = "objects"
+            entry["objects"] = [
+                {
+                    "id": getattr(obj, "id", 0),
+                    "name": getattr(obj, "name", None),
+                    "type": getattr(obj, "type", None),
+                    "x": obj.x,
+                    "y": obj.y,
+                    "width": obj.width,
+                    "height": obj.height,
+                    "points": [[p[0], p[1]] for p in (getattr(obj, "points", None) or ())],
+                    "properties": _plain_properties(getattr(obj, "properties", {})),
+                }
+                for obj in layer
+            ]
+        else:
+            continue
+        layers.append(entry)
+
+    rect_values = []
+    for r in tilemap.collision_rects:
+        rect_values.extend((r.x, r.y, r.width, r.height))
+    collision_offset = add_blob(rect_values, "i")
+
+    files, images = _image_table(tmx, map_dir)
+    tile_properties = {}
+    for gid, props in (getattr(tmx, "tile_properties", {}) or {}).items():
+        plain = _plain_properties(props)
+        if plain:
+            tile_properties[str(gid)] = plain
+
+    sources = _source_files(tmx_path)
+    meta = {
+        "tmx": tmx_path.name,
+        "sources": sources,
+        "width": int(tmx.width),
+        "height": int(tmx.height),
+        "tilewidth": int(tmx.tilewidth),
+        "tileheight": int(tmx.tileheight),
+        "files": files,
+        "images": images,
+        "tile_properties": tile_properties,
+        "layers": layers,
+        "collision": {"offset": collision_offset, "count": len(tilemap.collision_rects)},
+        "shapes": {name: [_encode_shape(s) for s in getattr(tilemap, name)] for name in TileMap.SHAPE_ATTRS},
+        "points": {name: list(getattr(tilemap, name)) if getattr(tilemap, name) else None for name in TileMap.POINT_ATTRS},
+        "rects": {name: _encode_rect(getattr(tilemap, name)) for name in TileMap.RECT_ATTRS},
+        "roof_rects": [_encode_rect(r) for r in tilemap.roof_rects],
+        "trainer_starts": [list(t) for t in tilemap.trainer_starts],
+    }
+    meta_bytes = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, _hash_sources(map_dir, sources), offset, len(meta_bytes))
+    return header + b"".join(blobs) + meta_bytes
+
+
+def _write_artifact(artifact_path, data):
+    tmp_path = f"{artifact_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, artifact_path)
+
+
+def compile_map(tmx_path, artifact_path=None):
+    artifact_path = artifact_path or compiled_path_for(tmx_path)
+    data = build_artifact(tmx_path)
+    _write_artifact(artifact_path, data)
+    print(f"Compiled '{tmx_path}' -> '{artifact_path}' ({len(data)} bytes)")
+    return artifact_path
+
+
+def _read_meta(tmx_path, buffer, label):
+    # Returns the artifact's meta block, or None if it is from another format or stale sources
+    try:
+        magic, version, digest, meta_offset, meta_length = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            print(f"Compiled map '{label}' has an old format, using TMX")
+            return None
+        meta = json.loads(bytes(buffer[meta_offset:meta_offset + meta_length]).decode("utf-8"))
+        if _hash_sources(os.path.dirname(os.path.abspath(tmx_path)), meta["sources"]) != digest:
+            print(f"Compiled map '{label}' is stale, using TMX")
+            return None
+    except Exception as e:
+        print(f"Failed to read compiled map '{label}': {e}")
+        return None
+    return meta
+
+
+def load_compiled_map(tmx_path, artifact_path=None):
+    # Returns None when there is no usable artifact so the caller can fall back to the TMX
+    artifact_path = artifact_path or compiled_path_for(tmx_path)
+    if not os.path.exists(artifact_path):
+        return None
+    try:
+        with open(artifact_path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        print(f"Could not map compiled map '{artifact_path}': {e}")
+        return None
+
+    meta = _read_meta(tmx_path, mm, artifact_path)
+    if meta is None:
+        mm.close()
+        return None
+    return CompiledMap(tmx_path, mm, meta)
+
+
+def load_compiled_bytes(tmx_path, data):
+    # Same as load_compiled_map for an artifact that is already in memory
+    meta = _read_meta(tmx_path, data, tmx_path)
+    if meta is None:
+        return None
+    return CompiledMap(tmx_path, data, meta)
+
+
+def ensure_compiled(tmx_path):
+    # Returns up-to-date artifact bytes, compiling and saving them first if needed.
+    # Does not touch pygame surfaces, so it is safe to run in a worker process.
+    artifact_path = compiled_path_for(tmx_path)
+    if os.path.exists(artifact_path):
+        with open(artifact_path, "rb") as f:
+            data = f.read()
+        if _read_meta(tmx_path, data, artifact_path) is not None:
+            return data
+    data = build_artifact(tmx_path)
+    try:
+        _write_artifact(artifact_path, data)
+    except OSError as e:
+        print(f"Could not save compiled map '{artifact_path}': {e}")
+    return data
+
+
+class CompiledObject:
+    def __init__(self, data):
+        self.id = data.get("id", 0)
+        self.name = data.get("name")
+        self.type = data.get("type")
+        self.x = data.get("x", 0)
+        self.y = data.get("y", 0)
+        self.width = data.get("width", 0)
+        self.height = data.get("height", 0)
+        self.points = tuple((p[0], p[1]) for p in data.get("points", ()))
+        self.properties = data.get("properties", {})
+
+    def __repr__(self):
+        return f"<CompiledObject[{self.id}]: \"{self.name}\">"
+
+
+class CompiledObjectGroup(list):
+    def __init__(self, data):
+        super().__init__(CompiledObject(o) for o in data.get("objects", ()))
+        self.name = data.get("name")
+        self.visible = data.get("visible", True)
+        self.properties = data.get("properties", {})
+
+
+class CompiledTileLayer:
+    def __init__(self, parent, data, gids):
+        self.parent = parent
+        self.name = data.get("name")
+        self.visible = data.get("visible", True)
+        self.properties = data.get("properties", {})
+        self.width = data["width"]
+        self.height = data["height"]
+        # Flat row-major gid grid, backed by the mmap when possible
+        self.data = gids
+
+    def iter_data(self):
+        w = self.width
+        for i, gid in enumerate(self.data):
+            yield i % w, i // w, gid
+
+    def tiles(self):
+        images = self.parent.images
+        w = self.width
+        for i, gid in enumerate(self.data):
+            if gid:
+                yield i % w, i // w, images[gid] if gid < len(images) else None
+
+
+class CompiledTmx:
+    # Stand-in for the parts of pytmx.TiledMap that TileMap and the full map builder use
+    def __init__(self, meta, layers, images):
+        self.width = meta["width"]
+        self.height = meta["height"]
+        self.tilewidth = meta["tilewidth"]
+        self.tileheight = meta["tileheight"]
+        self.layers = layers
+        self.images = images
+        self.tile_properties = {int(gid): props for gid, props in meta.get("tile_properties", {}).items()}
+
+    @property
+    def visible_layers(self):
+        return (layer for layer in self.layers if layer.visible)
+
+    @property
+    def objectgroups(self):
+        return (layer for layer in self.layers if isinstance(layer, CompiledObjectGroup))
+
+    def get_tile_image_by_gid(self, gid):
+        try:
+            return self.images[int(gid)]
+        except (IndexError, TypeError, ValueError):
+            return None
+
+    def get_tile_properties_by_gid(self, gid):
+        try:
+            return self.tile_properties.get(int(gid))
+        except (TypeError, ValueError):
+            return None
+
+
+class CompiledMap:
+    def __init__(self, tmx_path, mm, meta):
+        self.tmx_path = tmx_path
+        self.map_dir = os.path.dirname(os.path.abspath(tmx_path))
+        self.meta = meta
+        self._mmap = mm
+
+    def _ints(self, offset, count, typecode):
+        if count == 0:
+            return array(typecode)
+        view = memoryview(self._mmap)[offset:offset + count * 4]
+        if sys.byteorder == "little":
+            return view.cast(typecode)
+        values = array(typecode, view.tobytes())
+        values.byteswap()
+        return values
+
+    def _load_images(self, used):
+        # Only tiles some layer places get decoded; tileset_cache shares them across maps
+        images = []
+        for gid, entry in enumerate(self.meta["images"]):
+            if entry is None or gid not in used:
+                images.append(None)
+                continue
+            file_id, x, y, w, h, fh, fv, fd = entry
+            path = os.path.join(self.map_dir, self.meta["files"][file_id])
+            images.append(tile_image(path, (x, y, w, h), fh, fv, fd))
+        return images
+
+    def tileset_paths(self):
+        # Image files holding the tiles some layer places, i.e. what build_tmx() will decode
+        used = set()
+        for entry in self.meta["layers"]:
+            if entry.get("kind") == "tiles":
+                used.update(self._ints(entry["offset"], entry["width"] * entry["height"], "I"))
+        images = self.meta["images"]
+        file_ids = {images[gid][0] for gid in used if 0 < gid < len(images) and images[gid] is not None}
+        return [os.path.join(self.map_dir, self.meta["files"][i]) for i in sorted(file_ids)]
+
+    def build_tmx(self):
+        tmx = CompiledTmx(self.meta, [], [])
+        used = set()
+        for entry in self.meta["layers"]:
+            if entry.get("kind") == "tiles":
+                gids = self._ints(entry["offset"], entry["width"] * entry["height"], "I")
+                used.update(gids)
+                tmx.layers.append(CompiledTileLayer(tmx, entry, gids))
+            else:
+                tmx.layers.append(CompiledObjectGroup(entry))
+        used.discard(0)
+        tmx.images = self._load_images(used)
+        return tmx
+
+    def map_data(self):
+        meta = self.meta
+        data = {}
+        values = self._ints(meta["collision"]["offset"], meta["collision"]["count"] * 4, "i")
+        data["collision_rects"] = [
+            pygame.Rect(values[i], values[i + 1], values[i + 2], values[i + 3])
+            for i in range(0, len(values), 4)
+        ]
+        for name, shapes in meta["shapes"].items():
+            data[name] = [_decode_shape(s) for s in shapes]
+        for name, point in meta["points"].items():
+            data[name] = tuple(point) if point else None
+        for name, rect in meta["rects"].items():
+            data[name] = _decode_rect(rect)
+        data["roof_rects"] = [_decode_rect(r) for r in meta["roof_rects"]]
+        data["trainer_starts"] = [tuple(t) for t in meta["trainer_starts"]]
+        return data
+
+
+def benchmark_load(tmx_path, runs=5):
+    from World.map import TileMap
+
+    results = {}
+    for label, use_compiled in (("tmx", False), ("compiled", True)):
+        if use_compiled and load_compiled_map(tmx_path) is None:
+            print(f"No up-to-date compiled map for '{tmx_path}', skipping compiled benchmark")
+            continue
+        times = []
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            TileMap(tmx_path, use_compiled=use_compiled)
+            times.append((time.perf_counter() - t0) * 1000)
+        results[label] = min(times)
+    for label, best in results.items():
+        print(f"{Path(tmx_path).name}: {label} load best of {runs}: {best:.1f} ms")
+    return results
+
+
+def default_map_paths():
+    maps_dir = Path(__file__).parent / "maps"
+    return sorted(str(p) for p in maps_dir.glob("*.tmx"))
+
+
+if __name__ == "__main__":
+    # Usage (from the Script directory): python -m World.map_compiler [--bench] [map.tmx ...]
+    args = sys.argv[1:]
+    bench = "--bench" in args
+    paths = [a for a in args if a != "--bench"] or default_map_paths()
+
+    for path in paths:
+        compile_map(path)
+
+    if bench:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        pygame.init()
+        pygame.display.set_mode((1, 1))
+        for path in paths:
+            benchmark_load(path)
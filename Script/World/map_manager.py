@@ -0,0 +1,162 @@
+import os
+import time
+from collections import OrderedDict
+
+from profiling import span
+from World import tileset_cache
+from World.map import TileMap
+from World.map_compiler import load_compiled_bytes
+from World.map_preload import MapPreloader
+
+# Maps kept in memory at once, and the rough pixel budget they may use together
+DEFAULT_MAX_MAPS = 8
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+# Main-thread time per frame poll_preload() may spend baking the spawn view of adopted maps
+WARM_BUDGET_MS = 4
+
+
+class MapManager:
+    def __init__(self, max_maps=DEFAULT_MAX_MAPS, memory_budget=DEFAULT_MEMORY_BUDGET, tile_size=64):
+        self.max_maps = max(1, int(max_maps))
+        self.memory_budget = memory_budget
+        self.tile_size = tile_size
+        self._maps = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.preloaded = 0
+        self._preloader = None
+        # Keys of maps adopted in the background whose spawn view is not baked yet
+        self._warming = []
+
+    def _path(self, tmx_path):
+        return os.path.abspath(str(tmx_path))
+
+    def _key(self, tmx_path):
+        # Only the dict key is case-folded; TileMaps keep the path as given
+        return os.path.normcase(self._path(tmx_path))
+
+    def get(self, tmx_path):
+        # Returns the cached TileMap for tmx_path, loading it on a miss
+        key = self._key(tmx_path)
+        tilemap = self._maps.get(key)
+        if tilemap is not None:
+            self._maps.move_to_end(key)
+            self.hits += 1
+            return tilemap
+
+        self.misses += 1
+        tilemap = None
+        path = self._path(tmx_path)
+        with span(f"map load {os.path.basename(path)}"):
+            if self._preloader is not None and self._preloader.is_pending(path):
+                # Parsing is already running in a worker; waiting beats starting over
+                tilemap = self._from_artifact(path, self._preloader.take(path))
+            if tilemap is None:
+                tilemap = TileMap(tmx_path=str(tmx_path), tile_size=self.tile_size)
+        self._maps[key] = tilemap
+        self._evict(keep=key)
+        return tilemap
+
+    def _from_artifact(self, path, data):
+        compiled = load_compiled_bytes(path, data) if data else None
+        if compiled is None:
+            return None
+        self.preloaded += 1
+        return TileMap(tmx_path=path, tile_size=self.tile_size, compiled=compiled)
+
+    def start_preload(self, tmx_paths, max_workers=None):
+        # Parses every map that is not cached yet in worker processes; poll_preload() picks them up
+        paths = [self._path(p) for p in tmx_paths if self._key(p) not in self._maps]
+        if not paths:
+            return
+        if self._preloader is None:
+            self._preloader = MapPreloader(max_workers)
+        self._preloader.start(paths)
+
+    def poll_preload(self, view_size=None):
+        # Main thread, once per frame. Adopts at most one finished preload per frame (building
+        # its TileMap converts its surfaces); frames with nothing to adopt bake the view_size
+        # spawn view of adopted maps instead, so switching to one does not stall the first frame.
+        if self._preloader is not None and self._preloader.pending():
+            for path, data in self._preloader.take_ready(limit=1):
+                key = self._key(path)
+                if key in self._maps:
+                    continue
+                tilemap = self._from_artifact(path, data)
+                if tilemap is not None:
+                    self._maps[key] = tilemap
+                    self._maps.move_to_end(key, last=False)
+                    self._warming.append(key)
+                    self._evict()
+                    return 1
+        if view_size is not None and self._warming:
+            self._warm_adopted(view_size, WARM_BUDGET_MS)
+        return 0
+
+    def _warm_adopted(self, view_size, budget_ms):
+        t0 = time.perf_counter()
+        while self._warming:
+            left = budget_ms - (time.perf_counter() - t0) * 1000
+            if left <= 0:
+                break
+            tilemap = self._maps.get(self._warming[0])
+            if tilemap is not None and not tilemap.warm(view_size, budget_ms=left):
+                break
+            self._warming.pop(0)
+
+    def put(self, tilemap):
+        if not tilemap or not tilemap.tmx_path:
+            return
+        key = self._key(tilemap.tmx_path)
+        self._maps[key] = tilemap
+        self._maps.move_to_end(key)
+        # Put here because the player is about to walk in: its view is baked first
+        if key in self._warming:
+            self._warming.remove(key)
+        self._warming.insert(0, key)
+        self._evict(keep=key)
+
+    def contains(self, tmx_path):
+        return self._key(tmx_path) in self._maps
+
+    def is_loading(self, tmx_path):
+        return self._preloader is not None and self._preloader.is_pending(self._path(tmx_path))
+
+    def discard(self, tmx_path):
+        return self._maps.pop(self._key(tmx_path), None) is not None
+
+    def clear(self):
+        self._maps.clear()
+        self._warming.clear()
+
+    def memory_usage(self):
+        # Only what evicting maps can free; shared tileset memory is reported in stats()
+        return sum(tilemap.memory_estimate() for tilemap in self._maps.values())
+
+    def _evict(self, keep=None):
+        # Drop least recently used maps until both limits hold; the map just requested always stays
+        while len(self._maps) > 1:
+            over_count = len(self._maps) > self.max_maps
+            over_budget = self.memory_budget is not None and self.memory_usage() > self.memory_budget
+            if not over_count and not over_budget:
+                break
+            oldest = next(iter(self._maps))
+            if oldest == keep:
+                break
+            self._maps.pop(oldest)
+            self.evictions += 1
+            print(f"Evicted map '{oldest}' from cache")
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "maps": len(self._maps),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "preloaded": self.preloaded,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "memory": self.memory_usage(),
+            "tileset_memory": tileset_cache.memory_usage(),
+        }
@@ -0,0 +1,140 @@
+import os
+import threading
+import time
+
+from Characters.encounter import get_trigger_index
+from Characters.NPC import SPRITE_DIR, preload_sheets
+from profiling import span
+from World.map import TileMap
+from World.map_compiler import ensure_compiled, load_compiled_bytes
+from World.tileset_cache import decode_sheet
+
+# Door trigger kind -> (target map, NPC sprites spawned there)
+DOOR_TARGETS = {
+    "hospital": ("Hospital.tmx", ("Nurse_Joy.png", "ShopKeeper.png")),
+    "house": ("House.tmx", ()),
+    "GrassGym": ("GrassGym.tmx", ("grass_boss_1.png",)),
+    "IceGym": ("IceGym.tmx", ("water_boss_1.png",)),
+    "FireGym": ("FireGym.tmx", ("fire_boss_1.png",)),
+}
+# How far around the hitbox (px) a door counts as close
+DEFAULT_PREFETCH_RADIUS = 192
+
+
+class DoorPrefetcher:
+    def __init__(self, map_manager, maps_dir, radius=DEFAULT_PREFETCH_RADIUS):
+        self.map_manager = map_manager
+        self.maps_dir = str(maps_dir)
+        self.radius = radius
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self.started = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _target(self, kind):
+        map_name, sprites = DOOR_TARGETS[kind]
+        return os.path.join(self.maps_dir, map_name), [os.path.join(SPRITE_DIR, s) for s in sprites]
+
+    def update(self, game_map, hitbox_rect):
+        # Call once per frame: adopts finished loads, starts new ones and cancels stale ones.
+        # The startup preload normally holds every interior, and then this returns at once;
+        # it only does work for maps the manager evicted or never got from the preload.
+        if not self._jobs and all(self.map_manager.contains(self._target(kind)[0]) for kind in DOOR_TARGETS):
+            return
+        self._adopt_finished()
+
+        area = hitbox_rect.inflate(self.radius * 2, self.radius * 2)
+        near = [kind for kind in get_trigger_index(game_map).query(area) if kind in DOOR_TARGETS]
+        wanted = set()
+        for kind in near:
+            tmx_path, sprites = self._target(kind)
+            wanted.add(tmx_path)
+            job = self._jobs.get(tmx_path)
+            if job is not None:
+                # Came back before a cancelled load noticed; let it keep its result
+                job["cancel"].clear()
+                continue
+            if self.map_manager.contains(tmx_path) or self.map_manager.is_loading(tmx_path):
+                continue
+            self._start(tmx_path, sprites)
+
+        for tmx_path, job in list(self._jobs.items()):
+            if tmx_path not in wanted and not job["cancel"].is_set():
+                # Walked away: let the thread finish its current step and drop the result
+                job["cancel"].set()
+                self.cancelled += 1
+
+    def _start(self, tmx_path, sprites):
+        job = {"cancel": threading.Event(), "result": None, "done": False, "sprites": sprites}
+        self._jobs[tmx_path] = job
+        self.started += 1
+        job["thread"] = threading.Thread(
+            target=self._load, args=(tmx_path, sprites, job), name="map-prefetch", daemon=True
+        )
+        job["thread"].start()
+
+    def _load(self, tmx_path, sprites, job):
+        # File I/O and parsing only: the compiled artifact plus the map's tileset images decoded
+        # into private surfaces. Shared surfaces are only touched when the main thread adopts it.
+        t0 = time.perf_counter()
+        try:
+            with span(f"prefetch {os.path.basename(tmx_path)}"):
+                data = ensure_compiled(tmx_path)
+                compiled = load_compiled_bytes(tmx_path, data)
+                for path in compiled.tileset_paths() if compiled is not None else ():
+                    if job["cancel"].is_set():
+                        break
+                    decode_sheet(path)
+            if compiled is not None and not job["cancel"].is_set():
+                with self._lock:
+                    job["result"] = data
+                print(f"Prefetched '{os.path.basename(tmx_path)}' in {(time.perf_counter() - t0) * 1000:.1f} ms")
+        except Exception as e:
+            print(f"Prefetching '{tmx_path}' failed: {e}")
+        finally:
+            with self._lock:
+                job["done"] = True
+
+    def _adopt_finished(self):
+        with self._lock:
+            finished = [(path, job) for path, job in self._jobs.items() if job["done"]]
+        for tmx_path, job in finished:
+            del self._jobs[tmx_path]
+            if job["result"] is None or job["cancel"].is_set() or self.map_manager.contains(tmx_path):
+                continue
+            # Main thread: converts the decoded sheets and cuts the tiles, a few ms per map
+            try:
+                with span(f"prefetch adopt {os.path.basename(tmx_path)}"):
+                    preload_sheets(job["sprites"])
+                    compiled = load_compiled_bytes(tmx_path, job["result"])
+                    tilemap = TileMap(tmx_path=tmx_path, tile_size=self.map_manager.tile_size, compiled=compiled)
+            except Exception as e:
+                print(f"Prefetching '{tmx_path}' failed: {e}")
+                continue
+            self.map_manager.put(tilemap)
+            self.completed += 1
+
+    def record_switch(self, tmx_path):
+        # Call right before switching maps to count whether the prefetch got there first.
+        # A load still in flight is waited for, which is never slower than starting over.
+        job = self._jobs.get(str(tmx_path))
+        if job is not None and not job["cancel"].is_set():
+            job["thread"].join()
+        self._adopt_finished()
+        if self.map_manager.contains(tmx_path):
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def stats(self):
+        return {
+            "started": self.started,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "in_flight": len(self._jobs),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,180 @@
+import os
+import queue
+import struct
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from World.map_compiler import ensure_compiled
+
+# Workers are long-lived `python -m World.map_preload` processes started from the Script
+# directory, so they never import main.py, which runs the game at import. Each one reads a
+# .tmx path per line on stdin and answers on stdout with a header and the artifact bytes
+# (or the error text), then waits for the next path.
+SCRIPT_DIR = Path(__file__).resolve().parent.parent
+# Reply header: b"A" + artifact or b"E" + error message, and the payload length
+REPLY_HEADER = struct.Struct("<cQ")
+
+
+def _compile_job(tmx_path):
+    # Runs in a worker: XML, gid grids, objects and collisions only, no pygame surfaces
+    return ensure_compiled(tmx_path)
+
+
+def _serve(stdin, stdout):
+    for line in stdin:
+        tmx_path = line.decode("utf-8").rstrip("\r\n")
+        if not tmx_path:
+            continue
+        try:
+            status, payload = b"A", _compile_job(tmx_path)
+        except Exception as e:
+            status, payload = b"E", f"{type(e).__name__}: {e}".encode("utf-8")
+        stdout.write(REPLY_HEADER.pack(status, len(payload)))
+        stdout.write(payload)
+        stdout.flush()
+
+
+def _read_exact(stream, size):
+    chunks = []
+    while size:
+        chunk = stream.read(size)
+        if not chunk:
+            raise EOFError("map preload worker exited")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+class _Worker:
+    def __init__(self):
+        env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+        # stderr is inherited: the compiler's log lines show up in the game's console
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "World.map_preload"],
+            cwd=str(SCRIPT_DIR), env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        )
+
+    def compile(self, tmx_path):
+        # (ok, artifact bytes or error text); raises if the worker itself is gone
+        self.process.stdin.write(tmx_path.encode("utf-8") + b"\n")
+        self.process.stdin.flush()
+        status, size = REPLY_HEADER.unpack(_read_exact(self.process.stdout, REPLY_HEADER.size))
+        payload = _read_exact(self.process.stdout, size)
+        return status == b"A", payload
+
+    def close(self):
+        # EOF on stdin ends the worker once its current map is done
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+
+
+class MapPreloader:
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self._executor = None
+        self._futures = {}
+        self._idle = queue.SimpleQueue()
+        self._workers = []
+        self._lock = threading.Lock()
+
+    def _run_job(self, tmx_path):
+        # Pool thread: borrows an idle worker process (starting one if none is free) for one map.
+        # There are max_workers threads, so never more than max_workers processes.
+        t0 = time.perf_counter()
+        try:
+            worker = self._idle.get_nowait()
+        except queue.Empty:
+            worker = _Worker()
+            with self._lock:
+                self._workers.append(worker)
+        try:
+            ok, payload = worker.compile(tmx_path)
+        except (OSError, EOFError):
+            worker.close()
+            with self._lock:
+                self._workers.remove(worker)
+            raise
+        with self._lock:
+            if worker in self._workers:
+                self._idle.put(worker)
+            else:
+                # shutdown() ran while this map was compiling
+                worker.close()
+        if not ok:
+            raise RuntimeError(payload.decode("utf-8", "replace"))
+        return tmx_path, payload, (time.perf_counter() - t0) * 1000
+
+    def start(self, tmx_paths):
+        paths = [str(p) for p in tmx_paths if str(p) not in self._futures]
+        if not paths:
+            return
+        try:
+            if self._executor is None:
+                # Threads only wait on the worker processes, which do the parsing
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="map-preload")
+            for path in paths:
+                self._futures[path] = self._executor.submit(self._run_job, os.path.abspath(path))
+        except Exception as e:
+            print(f"Map preload unavailable, maps will load on demand: {e}")
+            self._futures = {p: f for p, f in self._futures.items() if p not in paths}
+        else:
+            print(f"Preloading {len(paths)} maps in up to {self.max_workers} worker processes")
+
+    def pending(self):
+        return list(self._futures)
+
+    def is_pending(self, tmx_path):
+        return str(tmx_path) in self._futures
+
+    def _take(self, tmx_path, wait):
+        future = self._futures.get(str(tmx_path))
+        if future is None or (not wait and not future.done()):
+            return None
+        del self._futures[str(tmx_path)]
+        try:
+            path, data, elapsed = future.result()
+        except Exception as e:
+            print(f"Preloading '{tmx_path}' failed: {e}")
+            return None
+        print(f"Preloaded '{path}' in {elapsed:.1f} ms (worker)")
+        if not self._futures:
+            self.shutdown()
+        return data
+
+    def take(self, tmx_path, wait=True):
+        # Artifact bytes for tmx_path, or None if it was never queued or failed
+        return self._take(tmx_path, wait)
+
+    def take_ready(self, limit=None):
+        # (path, bytes) for jobs that have finished, at most limit of them, without blocking
+        ready = []
+        for path in [p for p, f in self._futures.items() if f.done()]:
+            if limit is not None and len(ready) >= limit:
+                break
+            data = self._take(path, wait=False)
+            if data is not None:
+                ready.append((path, data))
+        return ready
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.close()
+        self._idle = queue.SimpleQueue()
+
+
+if __name__ == "__main__":
+    # Worker entry. Anything the compiler prints goes to stderr so it cannot end up in a reply.
+    out = sys.stdout.buffer
+    sys.stdout = sys.stderr
+    _serve(sys.stdin.buffer, out)
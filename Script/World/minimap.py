@@ -0,0 +1,314 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+import pygame
+
+from World.map import _is_collision_layer
+from World.map_compiler import source_digest
+from World.tileset_cache import SURFACE_LOCK
+
+# Rendered full-map overviews, one PNG per map version and screen size
+CACHE_DIR = Path(__file__).parent / "maps" / "overview_cache"
+# Share of the screen the overview may cover
+OVERVIEW_FILL = 0.88
+# Below this many pixels per tile a tile is drawn as its average colour
+MIN_SCALED_TILE_PX = 4
+
+
+def overview_layout(tilemap, screen_size):
+    sw, sh = screen_size
+    tw = getattr(tilemap, "tilewidth", getattr(tilemap, "tile_size", 64))
+    th = getattr(tilemap, "tileheight", tw)
+    world_w = getattr(tilemap, "width", 0)
+    world_h = getattr(tilemap, "height", 0)
+    scale = min((sw * OVERVIEW_FILL) / world_w, (sh * OVERVIEW_FILL) / world_h, 1.0)
+    tile_px = max(1, int(tw * scale))
+    return tile_px, int(world_w // tw), int(world_h // th)
+
+
+def cache_path(tilemap, screen_size):
+    tmx_path = str(tilemap.tmx_path)
+    digest = source_digest(tmx_path)
+    sw, sh = screen_size
+    return CACHE_DIR / f"{Path(tmx_path).stem}-{digest[:16]}-{sw}x{sh}.png"
+
+
+def snapshot_tiles(tilemap):
+    # Main thread: private copies of the map's tile images, keyed by id() of the original.
+    # The originals are tileset_cache subsurfaces, and scaling one off the main thread locks
+    # a sheet the renderer may be blitting from at that moment.
+    with SURFACE_LOCK:
+        return {id(image): image.copy() for image in tilemap.tmx.images if isinstance(image, pygame.Surface)}
+
+
+def render_overview(tilemap, tile_px, cols, rows, progress=None, images=None):
+    # Pure pixel work on a private surface. Off the main thread, pass images=snapshot_tiles()
+    # so only the copies are read.
+    full_surf = pygame.Surface((tile_px * cols, tile_px * rows), pygame.SRCALPHA)
+    full_surf.fill((0, 0, 0, 0))
+
+    tiles = []
+    for layer in tilemap.tmx.visible_layers:
+        if not hasattr(layer, "tiles"):
+            continue
+        layer_name = (getattr(layer, "name", "") or "").lower()
+        if _is_collision_layer(layer_name, getattr(layer, "properties", {}) or {}):
+            continue
+        tiles.extend(t for t in layer.tiles() if isinstance(t[2], pygame.Surface))
+
+    scale = tile_px / float(getattr(tilemap, "tilewidth", tilemap.tile_size))
+    scaled = {}
+    total = max(1, len(tiles))
+    for i, (x, y, image) in enumerate(tiles):
+        key = id(image)
+        small = scaled.get(key)
+        if small is None:
+            if images is not None:
+                image = images.get(key)
+                if image is None:
+                    continue
+            new_w = max(1, int(round(image.get_width() * scale)))
+            new_h = max(1, int(round(image.get_height() * scale)))
+            if new_w <= MIN_SCALED_TILE_PX or new_h <= MIN_SCALED_TILE_PX:
+                small = pygame.transform.average_color(image)
+            else:
+                small = pygame.transform.smoothscale(image, (new_w, new_h))
+            scaled[key] = small
+
+        if isinstance(small, pygame.Surface):
+            extra_h = max(0, small.get_height() - tile_px)
+            full_surf.blit(small, (x * tile_px, y * tile_px - extra_h))
+        elif len(small) < 4 or small[3] >= 128:
+            full_surf.fill(small[:3], (x * tile_px, y * tile_px, tile_px, tile_px))
+
+        if progress is not None and i % 256 == 0:
+            progress(i / total)
+    return full_surf
+
+
+def _build(tilemap, screen_size, job, path, images):
+    t0 = time.perf_counter()
+    try:
+        if images is None:
+            # start_overview found the PNG, so no tile snapshot was taken
+            job["surface"] = pygame.image.load(str(path))
+            source = "disk cache"
+        else:
+            tile_px, cols, rows = overview_layout(tilemap, screen_size)
+
+            def _progress(value):
+                tilemap._full_map_progress = value
+
+            surface = render_overview(tilemap, tile_px, cols, rows, _progress, images)
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.png")
+                pygame.image.save(surface, str(tmp))
+                os.replace(tmp, path)
+            except Exception as e:
+                print(f"Could not cache full map '{path}': {e}")
+            job["surface"] = surface
+            source = "tiles"
+        print(f"Full map for '{Path(str(tilemap.tmx_path)).name}' ready from {source} in {(time.perf_counter() - t0) * 1000:.1f} ms")
+    except Exception as e:
+        print(f"Full map build failed: {e}")
+    finally:
+        job["done"] = True
+
+
+def start_overview(tilemap, screen_size):
+    # Starts the worker unless this map already has (or is building) an overview for screen_size
+    screen_size = tuple(screen_size)
+    if getattr(tilemap, "tmx", None) is None or getattr(tilemap, "width", 0) <= 0 or getattr(tilemap, "height", 0) <= 0:
+        return
+    if getattr(tilemap, "_full_map_built", False) and getattr(tilemap, "_full_map_size", None) == screen_size:
+        tilemap._full_map_progress = 1.0
+        return
+    job = getattr(tilemap, "_full_map_job", None)
+    if job is not None and not job["done"] and job["size"] == screen_size:
+        return
+    # A build that already failed for this size is not retried on every frame
+    if getattr(tilemap, "_full_map_failed", None) == screen_size:
+        return
+
+    job = {"size": screen_size, "surface": None, "done": False}
+    tilemap._full_map_job = job
+    tilemap._full_map_building = True
+    tilemap._full_map_built = False
+    tilemap._full_map_progress = 0.0
+    path = cache_path(tilemap, screen_size)
+    # Copying every tile costs the main thread ~12 ms on World; skip it when the PNG is already on disk
+    images = None if path.exists() else snapshot_tiles(tilemap)
+    threading.Thread(target=_build, args=(tilemap, screen_size, job, path, images), name="full-map", daemon=True).start()
+
+
+def finish_overview(tilemap):
+    # Main-thread half: adopts a finished worker result; cheap when nothing is pending
+    job = getattr(tilemap, "_full_map_job", None)
+    if job is None or not job["done"]:
+        return False
+    tilemap._full_map_job = None
+    tilemap._full_map_building = False
+    surface = job["surface"]
+    if surface is None:
+        tilemap._full_map_failed = job["size"]
+        return False
+    try:
+        surface = surface.convert_alpha()
+    except pygame.error:
+        pass
+    tilemap._full_map_surf = surface
+    tilemap._full_map_size = job["size"]
+    tilemap._full_map_built = True
+    tilemap._full_map_progress = 1.0
+    return True
+
+
+# Zoomable map pyramid: the base level is at most this many px on its long side,
+# and halving stops once a level fits in PYRAMID_MIN_SIZE
+PYRAMID_MAX_BASE = 4096
+PYRAMID_MIN_SIZE = 256
+
+
+def build_pyramid(tilemap, images=None):
+    # [(scale, surface), ...] from the sharpest level down; scale is level px per world px
+    tw = getattr(tilemap, "tilewidth", tilemap.tile_size)
+    base_scale = min(0.5, PYRAMID_MAX_BASE / float(max(tilemap.width, tilemap.height)))
+    tile_px = max(1, int(tw * base_scale))
+    cols = int(tilemap.width // tw)
+    rows = int(tilemap.height // getattr(tilemap, "tileheight", tw))
+    level = render_overview(tilemap, tile_px, cols, rows, images=images)
+    levels = [(tile_px / float(tw), level)]
+    while max(level.get_size()) > PYRAMID_MIN_SIZE:
+        w, h = level.get_size()
+        level = pygame.transform.smoothscale(level, (max(1, w // 2), max(1, h // 2)))
+        levels.append((level.get_width() / float(tilemap.width), level))
+    return levels
+
+
+def _build_pyramid_job(tilemap, job, images):
+    t0 = time.perf_counter()
+    try:
+        job["levels"] = build_pyramid(tilemap, images)
+        sizes = ", ".join(f"{s.get_width()}x{s.get_height()}" for _, s in job["levels"])
+        print(f"Map pyramid built in {(time.perf_counter() - t0) * 1000:.1f} ms: {sizes}")
+    except Exception as e:
+        print(f"Map pyramid build failed: {e}")
+    finally:
+        job["done"] = True
+
+
+def start_pyramid(tilemap):
+    if getattr(tilemap, "tmx", None) is None or getattr(tilemap, "width", 0) <= 0:
+        return
+    if getattr(tilemap, "_map_pyramid", None) or getattr(tilemap, "_map_pyramid_job", None):
+        return
+    job = {"levels": None, "done": False}
+    tilemap._map_pyramid_job = job
+    images = snapshot_tiles(tilemap)
+    threading.Thread(target=_build_pyramid_job, args=(tilemap, job, images), name="map-pyramid", daemon=True).start()
+
+
+def finish_pyramid(tilemap):
+    job = getattr(tilemap, "_map_pyramid_job", None)
+    if job is None or not job["done"]:
+        return False
+    tilemap._map_pyramid_job = None
+    if not job["levels"]:
+        return False
+    levels = []
+    for scale, surface in job["levels"]:
+        try:
+            surface = surface.convert_alpha()
+        except pygame.error:
+            pass
+        levels.append((scale, surface))
+    tilemap._map_pyramid = levels
+    return True
+
+
+class ZoomableMap:
+    ZOOM_STEP = 1.25
+    PAN_SPEED = 900  # screen px per second
+
+    def __init__(self):
+        self.zoom = 1.0
+        self.center = (0.0, 0.0)
+        self.fit_zoom = 1.0
+
+    def reset(self, tilemap, screen_size, focus):
+        sw, sh = screen_size
+        self.fit_zoom = min((sw * OVERVIEW_FILL) / max(1, tilemap.width), (sh * OVERVIEW_FILL) / max(1, tilemap.height))
+        self.zoom = self.fit_zoom
+        self.center = (float(focus[0]), float(focus[1]))
+
+    def _set_zoom(self, zoom):
+        self.zoom = max(self.fit_zoom * 0.5, min(1.0, zoom))
+
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEWHEEL:
+            self._set_zoom(self.zoom * (self.ZOOM_STEP ** event.y))
+        elif event.type == pygame.KEYDOWN:
+            if event.key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
+                self._set_zoom(self.zoom * self.ZOOM_STEP)
+            elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                self._set_zoom(self.zoom / self.ZOOM_STEP)
+            elif event.key == pygame.K_0:
+                self.zoom = self.fit_zoom
+
+    def update(self, keys, dt):
+        step = self.PAN_SPEED * dt / self.zoom
+        cx, cy = self.center
+        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+            cx -= step
+        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+            cx += step
+        if keys[pygame.K_UP] or keys[pygame.K_w]:
+            cy -= step
+        if keys[pygame.K_DOWN] or keys[pygame.K_s]:
+            cy += step
+        self.center = (cx, cy)
+
+    def draw(self, screen, tilemap, player_rect):
+        # Returns False until the pyramid exists, so the caller can show progress instead
+        levels = getattr(tilemap, "_map_pyramid", None)
+        if not levels:
+            return False
+
+        # Sharpest level not finer than needed; past the base level, scale the base up
+        scale, level = levels[0]
+        for level_scale, surface in levels:
+            if level_scale >= self.zoom:
+                scale, level = level_scale, surface
+
+        sw, sh = screen.get_size()
+        view_w = sw / self.zoom
+        view_h = sh / self.zoom
+        cx = min(max(self.center[0], min(view_w / 2, tilemap.width / 2)), max(tilemap.width - view_w / 2, tilemap.width / 2))
+        cy = min(max(self.center[1], min(view_h / 2, tilemap.height / 2)), max(tilemap.height - view_h / 2, tilemap.height / 2))
+        self.center = (cx, cy)
+        left = cx - view_w / 2
+        top = cy - view_h / 2
+
+        overlay = pygame.Surface((sw, sh), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 160))
+        screen.blit(overlay, (0, 0))
+
+        # Only the visible part of the chosen level is cut out and scaled to the screen
+        src = pygame.Rect(int(left * scale), int(top * scale), int(view_w * scale) + 2, int(view_h * scale) + 2)
+        src = src.clip(level.get_rect())
+        if src.width > 0 and src.height > 0:
+            factor = self.zoom / scale
+            dest_size = (max(1, int(src.width * factor)), max(1, int(src.height * factor)))
+            part = level.subsurface(src)
+            if dest_size != src.size:
+                part = pygame.transform.scale(part, dest_size)
+            screen.blit(part, (int((src.x / scale - left) * self.zoom), int((src.y / scale - top) * self.zoom)))
+
+        px = int((player_rect.centerx - left) * self.zoom)
+        py = int((player_rect.centery - top) * self.zoom)
+        pygame.draw.circle(screen, (255, 255, 255), (px, py), 6)
+        pygame.draw.circle(screen, (255, 0, 0), (px, py), 4)
+        return True
@@ -0,0 +1,62 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+import pygame
+
+from World.map import RENDER_BACKENDS, TileMap
+
+# Usage (from the Script directory): python -m World.render_bench [map.tmx] [frames]
+# Pans a 1280x720 view across the map and times draw_lower/draw_upper per backend,
+# with and without the scrolling backbuffer.
+VIEW_SIZE = (1280, 720)
+
+
+def _camera_path(tilemap, frames):
+    view_w, view_h = VIEW_SIZE
+    max_x = max(0, tilemap.width - view_w)
+    max_y = max(0, tilemap.height - view_h)
+    for i in range(frames):
+        t = i / max(1, frames - 1)
+        # Diagonal sweep with a slower vertical component so rows and columns both change
+        yield -int(max_x * t), -int(max_y * (0.5 - 0.5 * abs(1 - 2 * t)))
+
+
+def bench_backend(tilemap, backend, frames):
+    tilemap.set_render_backend(backend)
+    view = pygame.Surface(VIEW_SIZE)
+    player_rect = pygame.Rect(0, 0, 32, 48)
+
+    # Bake the chunks and the atlas once so both backends time steady-state drawing
+    for offset_x, offset_y in _camera_path(tilemap, frames):
+        tilemap.draw_lower(view, player_rect, offset_x, offset_y)
+
+    t0 = time.perf_counter()
+    for offset_x, offset_y in _camera_path(tilemap, frames):
+        player_rect.center = (VIEW_SIZE[0] // 2 - offset_x, VIEW_SIZE[1] // 2 - offset_y)
+        view.fill((0, 0, 0))
+        tilemap.draw_lower(view, player_rect, offset_x, offset_y)
+        tilemap.draw_upper(view, player_rect, offset_x, offset_y)
+    return (time.perf_counter() - t0) * 1000 / frames
+
+
+def run(tmx_path, frames=300):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    tilemap = TileMap(str(tmx_path))
+    results = {}
+    for backend in RENDER_BACKENDS:
+        for scroll in (False, True):
+            tilemap.scroll_camera = scroll
+            tilemap.invalidate_backbuffer()
+            name = f"{backend}+scroll" if scroll else backend
+            results[name] = bench_backend(tilemap, backend, frames)
+            print(f"{Path(tmx_path).name} [{name}]: {results[name]:.3f} ms/frame over {frames} frames")
+    return results
+
+
+if __name__ == "__main__":
+    default_map = Path(__file__).parent / "maps" / "World.tmx"
+    run(sys.argv[1] if len(sys.argv) > 1 else default_map, int(sys.argv[2]) if len(sys.argv) > 2 else 300)
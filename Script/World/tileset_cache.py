@@ -0,0 +1,163 @@
+import os
+import threading
+import time
+
+import pygame
+import pytmx
+
+# Decoded tileset images and the tile surfaces cut from them, shared by every map
+_SHEETS = {}
+_TILES = {}
+# id() of every surface in _TILES, so maps can tell shared tiles from their own surfaces
+_TILE_IDS = set()
+# Sheets decode_sheet() read off the main thread, not yet converted by load_sheet()
+_RAW = {}
+_stats = {"sheets": 0, "tiles": 0, "tile_hits": 0, "predecoded": 0}
+
+# Held for any read of the shared sheet and tile surfaces that could overlap another thread
+# (cutting tiles, packing atlases, copying tiles for a worker). Tiles are subsurfaces, so
+# reading one locks its whole sheet, and a blit from a locked surface fails.
+SURFACE_LOCK = threading.RLock()
+
+
+def _norm(path):
+    return os.path.normpath(os.path.abspath(path))
+
+
+def decode_sheet(path):
+    # File read and PNG decode only, safe on any thread: the new surface stays private
+    # until load_sheet() converts it on the main thread. False if nothing was decoded.
+    path = _norm(path)
+    with SURFACE_LOCK:
+        if path in _SHEETS or path in _RAW:
+            return False
+    try:
+        raw = pygame.image.load(path)
+    except Exception as e:
+        print(f"Failed to decode tileset image '{path}': {e}")
+        return False
+    with SURFACE_LOCK:
+        if path in _SHEETS or path in _RAW:
+            return False
+        _RAW[path] = raw
+        _stats["predecoded"] += 1
+    return True
+
+
+def load_sheet(path):
+    path = _norm(path)
+    with SURFACE_LOCK:
+        sheet = _SHEETS.get(path)
+        if sheet is None:
+            try:
+                sheet = _RAW.pop(path, None)
+                if sheet is None:
+                    sheet = pygame.image.load(path)
+                try:
+                    sheet = sheet.convert_alpha()
+                except pygame.error:
+                    pass
+                _stats["sheets"] += 1
+            except Exception as e:
+                print(f"Failed to load tileset image '{path}': {e}")
+                sheet = False
+            _SHEETS[path] = sheet
+    return sheet or None
+
+
+def tile_image(path, rect=None, flipped_h=False, flipped_v=False, flipped_d=False):
+    # Same cut and flips as pytmx's pygame loader, decoded once per tile across maps
+    key = (_norm(path), tuple(rect) if rect else None, flipped_h, flipped_v, flipped_d)
+    with SURFACE_LOCK:
+        tile = _TILES.get(key)
+        if tile is not None:
+            _stats["tile_hits"] += 1
+            return tile
+
+        sheet = load_sheet(path)
+        if sheet is None:
+            return None
+        tile = sheet.subsurface(rect) if rect and rect[2] and rect[3] else sheet
+        if flipped_d:
+            tile = pygame.transform.flip(pygame.transform.rotate(tile, 270), True, False)
+        if flipped_h or flipped_v:
+            tile = pygame.transform.flip(tile, flipped_h, flipped_v)
+        _TILES[key] = tile
+        _TILE_IDS.add(id(tile))
+        _stats["tiles"] += 1
+        return tile
+
+
+def used_gids(tmx):
+    # Every gid placed on a tile layer or used by a tile object
+    used = set()
+    for layer in tmx.layers:
+        data = getattr(layer, "data", None)
+        if data is not None and hasattr(layer, "tiles"):
+            for row in data:
+                used.update(row)
+        elif hasattr(layer, "__iter__") and not hasattr(layer, "tiles"):
+            for obj in layer:
+                gid = getattr(obj, "gid", 0)
+                if gid:
+                    used.add(gid)
+    used.discard(0)
+    return used
+
+
+def load_tmx_lazy(tmx_path):
+    # Like pytmx.load_pygame, but only decodes the tile images the map actually uses.
+    # Parsing without an image loader leaves (filename, rect, flags) refs in tmx.images.
+    t0 = time.perf_counter()
+    tmx = pytmx.TiledMap(tmx_path)
+    used = used_gids(tmx)
+    decoded = 0
+    for gid, ref in enumerate(tmx.images):
+        if not ref:
+            continue
+        if gid not in used or not isinstance(ref, tuple):
+            tmx.images[gid] = None
+            continue
+        filename, rect, flags = (tuple(ref) + (None, None))[:3]
+        tmx.images[gid] = tile_image(
+            filename, rect,
+            bool(getattr(flags, "flipped_horizontally", False)),
+            bool(getattr(flags, "flipped_vertically", False)),
+            bool(getattr(flags, "flipped_diagonally", False)),
+        )
+        decoded += 1
+    print(
+        f"Decoded {decoded} of {len(tmx.images) - 1} tile images for '{os.path.basename(tmx_path)}' "
+        f"in {(time.perf_counter() - t0) * 1000:.1f} ms"
+    )
+    return tmx
+
+
+def is_shared(surface):
+    return id(surface) in _TILE_IDS
+
+
+def memory_usage():
+    # Pixel bytes held here once for every map: sheets, pending decodes and the flipped tiles
+    # (plain tiles are subsurfaces of their sheet and own no pixels)
+    def _bytes(surface):
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    with SURFACE_LOCK:
+        sheets = {id(sheet): sheet for sheet in _SHEETS.values() if sheet}
+        total = sum(_bytes(sheet) for sheet in sheets.values())
+        total += sum(_bytes(raw) for raw in _RAW.values())
+        total += sum(_bytes(tile) for tile in _TILES.values() if tile.get_parent() is None and id(tile) not in sheets)
+    return total
+
+
+def stats():
+    return dict(_stats, cached_tiles=len(_TILES), cached_sheets=len(_SHEETS), pending_sheets=len(_RAW))
+
+
+def clear():
+    with SURFACE_LOCK:
+        _SHEETS.clear()
+        _TILES.clear()
+        _TILE_IDS.clear()
+        _RAW.clear()
@@ -0,0 +1,590 @@
+import json
+import os
+import random
+import sys
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+# Must be set before headless (imported by main) decides on the SDL drivers
+os.environ.setdefault("GAME_HEADLESS", "1")
+
+import pygame
+
+from Characters.encounter import get_trigger_index
+from profiling import summarize
+from World.map_prefetch import DOOR_TARGETS
+
+# Usage (from the repo root): python Script/benchmark.py [--out results.json] [scenario ...]
+# Plays main.py headlessly with scripted input and prints frame-time stats as JSON.
+# The clock is fixed at FRAME_MS per tick and never sleeps, so frame times are pure work
+# and every run walks the same route.
+FRAME_MS = 16
+SEED = 1234
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+# Tile waypoints on World.tmx, a loop from the spawn through every corner of the map
+WORLD_ROUTE = ((66, 55), (40, 75), (10, 45), (20, 25), (35, 10), (55, 12), (66, 55))
+DOOR_KINDS = ("GrassGym", "IceGym", "FireGym", "hospital")
+# Frames a UI loop is left open before the script closes it
+UI_FRAMES = 120
+# A UI loop nobody scripted gets Return/Escape after this many calls
+STUCK_UI_CALLS = 600
+# Frames without movement before a walk gives up
+STUCK_FRAMES = 90
+# Frames to wait on a door for the map switch cooldown (main.map_switch_cooldown is 120)
+SWITCH_WAIT_FRAMES = 180
+ENCOUNTER_WAIT_FRAMES = 600
+MAP_BUILD_FRAMES = 1800
+
+# Files the game writes during a run; restored afterwards so a benchmark never touches saves
+TOUCHED_FILES = (
+    SCRIPT_DIR / "save_1.json",
+    SCRIPT_DIR / "save_position.json",
+    REPO_ROOT / "pokedex_save.json",
+    REPO_ROOT / "pokemon_cache.json",
+)
+
+
+class _Keys:
+    # Stand-in for pygame.key.get_pressed()
+    def __init__(self, held=()):
+        self.held = frozenset(held)
+
+    def __getitem__(self, key):
+        return key in self.held
+
+
+def _key_event(key):
+    return pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode="", scancode=0)
+
+
+def _click_event(pos):
+    return pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=pos)
+
+
+class _FixedClock:
+    # pygame.time.Clock with a fixed step and no frame cap
+    def __init__(self):
+        self._ticks = 0
+
+    def tick(self, framerate=0):
+        self._ticks += 1
+        return FRAME_MS
+
+    tick_busy_loop = tick
+
+    def get_time(self):
+        return FRAME_MS
+
+    def get_rawtime(self):
+        return FRAME_MS
+
+    def get_fps(self):
+        return 1000.0 / FRAME_MS
+
+
+# Path finding on the collision grid
+
+def _mark(blocked, cols, rows, rect, tw, th):
+    for ty in range(max(0, rect.top // th), min(rows - 1, (rect.bottom - 1) // th) + 1):
+        for tx in range(max(0, rect.left // tw), min(cols - 1, (rect.right - 1) // tw) + 1):
+            blocked[ty * cols + tx] = 1
+
+
+def _cells(rect, tw, th):
+    return [
+        (tx, ty)
+        for ty in range(rect.top // th, (rect.bottom - 1) // th + 1)
+        for tx in range(rect.left // tw, (rect.right - 1) // tw + 1)
+    ]
+
+
+def _blocked_cells(game_map, goal_kind=None, avoid_bushes=True):
+    # Walls, plus every trigger zone except the goal so a walk never switches maps by accident
+    grid = game_map.get_collision_grid()
+    cols, rows = grid["cols"], grid["rows"]
+    tw, th = game_map.tilewidth, game_map.tileheight
+    blocked = bytearray(grid["cells"])
+    for kind, _, _, bbox in get_trigger_index(game_map).zones:
+        if kind == goal_kind or (kind == "bush" and not avoid_bushes):
+            continue
+        _mark(blocked, cols, rows, bbox, tw, th)
+    gym_rect = game_map.get_multiplayer_gym_rect()
+    if gym_rect:
+        _mark(blocked, cols, rows, gym_rect.inflate(tw * 2, th * 2), tw, th)
+    return blocked, cols, rows
+
+
+def find_path(blocked, cols, rows, start, goals):
+    # Breadth-first tile path from start to the nearest goal cell, or None
+    goals = set(goals)
+    prev = {start: None}
+    queue = deque([start])
+    while queue:
+        cell = queue.popleft()
+        if cell in goals:
+            path = []
+            while cell is not None:
+                path.append(cell)
+                cell = prev[cell]
+            return path[::-1]
+        x, y = cell
+        for nxt in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            nx, ny = nxt
+            if 0 <= nx < cols and 0 <= ny < rows and nxt not in prev and not blocked[ny * cols + nx]:
+                prev[nxt] = cell
+                queue.append(nxt)
+    return None
+
+
+def _player_cell(game):
+    hitbox = game.player.hitbox_rect
+    return hitbox.centerx // game.game_map.tilewidth, hitbox.centery // game.game_map.tileheight
+
+
+def _player_start_cell(game):
+    game_map = game.game_map
+    x, y = game_map.player_start
+    return int(x) // game_map.tilewidth, int(y) // game_map.tileheight
+
+
+def _plan(game, goal_cells, goal_kind=None):
+    game_map = game.game_map
+    for avoid_bushes in (True, False):
+        blocked, cols, rows = _blocked_cells(game_map, goal_kind, avoid_bushes)
+        goals = [(x, y) for x, y in goal_cells if 0 <= x < cols and 0 <= y < rows and not blocked[y * cols + x]]
+        path = find_path(blocked, cols, rows, _player_cell(game), goals)
+        if path is not None:
+            return path
+    return None
+
+
+def _steer(hitbox, cell, tw, th):
+    # Keys that bring the hitbox centre onto the cell centre
+    held = []
+    dx = cell[0] * tw + tw // 2 - hitbox.centerx
+    dy = cell[1] * th + th // 2 - hitbox.centery
+    if dx > 0:
+        held.append(pygame.K_d)
+    elif dx < 0:
+        held.append(pygame.K_a)
+    if dy > 0:
+        held.append(pygame.K_s)
+    elif dy < 0:
+        held.append(pygame.K_w)
+    return held
+
+
+# Scenario building blocks. Each yields (events, held keys) once per main-loop frame
+# and returns whether it got where it was going.
+
+def idle(frames, held=()):
+    for _ in range(frames):
+        yield [], held
+
+
+def walk_path(game, path, until=None):
+    tw, th = game.game_map.tilewidth, game.game_map.tileheight
+    for cell in path:
+        last = None
+        still = 0
+        while True:
+            if until is not None and until():
+                return True
+            if game.encounter_active or game.game_state != "game":
+                # A battle or the multiplayer lobby has the player; movement resumes after
+                yield [], ()
+                continue
+            hitbox = game.player.hitbox_rect
+            held = _steer(hitbox, cell, tw, th)
+            if not held:
+                break
+            still = still + 1 if hitbox.topleft == last else 0
+            last = hitbox.topleft
+            if still > STUCK_FRAMES:
+                print(f"Benchmark walk stuck at {hitbox.topleft} heading for tile {cell}")
+                return False
+            yield [], held
+    return True
+
+
+def walk_to_cell(game, cell):
+    path = _plan(game, [cell])
+    if path is None:
+        print(f"Benchmark: no path to tile {cell}")
+        return False
+    return (yield from walk_path(game, path))
+
+
+def _trigger_cells(game, kind):
+    # Tiles where the player's hitbox, centred on the tile, actually hits a zone of kind
+    # (a zone's bounding box also covers tiles outside its polygon)
+    game_map = game.game_map
+    tw, th = game_map.tilewidth, game_map.tileheight
+    index = get_trigger_index(game_map)
+    probe = game.player.hitbox_rect.copy()
+    cells = []
+    for k, _, _, bbox in index.zones:
+        if k != kind:
+            continue
+        for tx, ty in _cells(bbox, tw, th):
+            probe.center = (tx * tw + tw // 2, ty * th + th // 2)
+            if kind in index.query(probe):
+                cells.append((tx, ty))
+    return cells
+
+
+def teleport(game, cell):
+    # Puts the hitbox centre on the tile centre, the way main.py places the player on a map switch
+    game_map = game.game_map
+    player = game.player
+    tw, th = game_map.tilewidth, game_map.tileheight
+    player.rect.midbottom = (cell[0] * tw + tw // 2, cell[1] * th + th // 2 + player.hitbox_rect.height // 2)
+    player.hitbox_rect.midbottom = player.rect.midbottom
+    player._fx = float(player.hitbox_rect.x)
+    player._fy = float(player.hitbox_rect.y)
+
+
+def _wait_for_switch(game, game_map):
+    # The map switch cooldown may still be running after the last door
+    for _ in range(SWITCH_WAIT_FRAMES):
+        if game.game_map is not game_map:
+            return True
+        yield [], ()
+    return game.game_map is not game_map
+
+
+def walk_to_trigger(game, kind):
+    # Walks onto the nearest zone of kind and waits for the map switch it causes
+    game_map = game.game_map
+    path = _plan(game, _trigger_cells(game, kind), goal_kind=kind)
+    if path is None:
+        print(f"Benchmark: no path to a '{kind}' trigger on {Path(str(game_map.tmx_path)).name}")
+        return False
+    yield from walk_path(game, path, until=lambda: game.game_map is not game_map)
+    return (yield from _wait_for_switch(game, game_map))
+
+
+def go_through(game, kind):
+    # "walked" if the player can walk onto a kind trigger, "teleported" if it had to be
+    # put on one (e.g. FireGym's exit sits behind solid tiles), "failed" if neither switched maps
+    game_map = game.game_map
+    if (yield from walk_to_trigger(game, kind)):
+        return "walked"
+    cells = _trigger_cells(game, kind)
+    if not cells:
+        return "failed"
+    teleport(game, cells[0])
+    if (yield from _wait_for_switch(game, game_map)):
+        print(f"Benchmark: teleported onto the '{kind}' trigger on {Path(str(game_map.tmx_path)).name}")
+        return "teleported"
+    return "failed"
+
+
+# Scenarios
+
+def scenario_walk_route(game):
+    ok = True
+    for cell in WORLD_ROUTE:
+        ok = (yield from walk_to_cell(game, cell)) and ok
+    return ok
+
+
+def _on_world(game):
+    return Path(str(game.game_map.tmx_path)).name == "World.tmx"
+
+
+def _doors(game):
+    # Every door starts from the World spawn, so a door that goes wrong cannot strand the next one
+    results = {}
+    for kind in DOOR_KINDS:
+        if not _on_world(game):
+            results[kind] = {"enter": "failed", "exit": "skipped"}
+            continue
+        teleport(game, _player_start_cell(game))
+        yield from idle(10)
+        enter = yield from go_through(game, kind)
+        leave = "skipped"
+        if enter != "failed":
+            yield from idle(30)
+            leave = yield from go_through(game, "exit")
+        if _on_world(game):
+            # Leaving puts the player back on the door, which would re-enter it once the cooldown ends
+            teleport(game, _player_start_cell(game))
+        yield from idle(30)
+        results[kind] = {"enter": enter, "exit": leave}
+    return results
+
+
+def scenario_doors(game):
+    return (yield from _doors(game))
+
+
+def scenario_doors_evicted(game):
+    # The doors again with every interior dropped from the map cache, as after evictions,
+    # so the door prefetcher has to load each one while the player walks up to it
+    for map_name, _ in DOOR_TARGETS.values():
+        game.map_manager.discard(os.path.join(game.door_prefetcher.maps_dir, map_name))
+    before = game.door_prefetcher.stats()
+    results = yield from _doors(game)
+    after = game.door_prefetcher.stats()
+    prefetch = {key: after[key] - before[key] for key in ("started", "completed", "hits", "misses")}
+    prefetch["result"] = "done" if prefetch["hits"] else "failed"
+    results["prefetch"] = prefetch
+    return results
+
+
+def scenario_map_overlay(game):
+    yield [_key_event(pygame.K_m)], ()
+    for _ in range(MAP_BUILD_FRAMES):
+        if getattr(game.game_map, "_map_pyramid", None):
+            break
+        yield [], ()
+    for key in (pygame.K_EQUALS, pygame.K_EQUALS, pygame.K_EQUALS, pygame.K_MINUS):
+        yield [_key_event(key)], ()
+        yield from idle(20)
+    yield from idle(90, (pygame.K_d, pygame.K_s))
+    yield [_key_event(pygame.K_0)], ()
+    yield from idle(30)
+    yield [_key_event(pygame.K_m)], ()
+    yield from idle(10)
+    return bool(getattr(game.game_map, "_map_pyramid", None)) and not game.show_map
+
+
+def scenario_pokedex(game):
+    # pokedex_menu runs its own loop inside this frame; the UI script closes it
+    yield [_key_event(pygame.K_v)], ()
+    yield from idle(10)
+    return not game.show_pokedex
+
+
+def scenario_wild_battle(game):
+    path = _plan(game, _trigger_cells(game, "bush"), goal_kind="bush")
+    if path is None:
+        print("Benchmark: no reachable bush")
+        return False
+
+    # A battle can start and end (e.g. by running away) inside one main-loop frame, so the
+    # encounter is noticed through fetch_random_pokemon rather than encounter_active
+    encounters = []
+    fetch = game.fetch_random_pokemon
+
+    def counted_fetch():
+        pokemon = fetch()
+        encounters.append(pokemon)
+        return pokemon
+
+    # The 10% roll is forced so the battle starts on the first bush frame in every run
+    roll = game.trigger_encounter
+    game.trigger_encounter = lambda: True
+    game.fetch_random_pokemon = counted_fetch
+    try:
+        yield from walk_path(game, path, until=lambda: bool(encounters))
+        for _ in range(ENCOUNTER_WAIT_FRAMES):
+            if encounters:
+                break
+            yield [], ()
+    finally:
+        game.trigger_encounter = roll
+        game.fetch_random_pokemon = fetch
+    if not encounters:
+        return False
+    while game.encounter_active:
+        yield [], ()
+    yield from idle(30)
+    return True
+
+
+SCENARIOS = {
+    "walk_route": scenario_walk_route,
+    "doors": scenario_doors,
+    "doors_evicted": scenario_doors_evicted,
+    "map_overlay": scenario_map_overlay,
+    "pokedex": scenario_pokedex,
+    "wild_battle": scenario_wild_battle,
+}
+# Names the JSON uses for the loops that call display.flip
+LOOP_NAMES = {"<module>": "overworld"}
+
+
+class ScriptedRun:
+    def __init__(self, scenarios):
+        self.scenarios = list(scenarios)
+        self.game = None
+        self.current = "startup"
+        self.completed = {}
+        self.durations = {}
+        self.details = {}
+        self.flips = []   # (scenario, loop, ms between flips)
+        self.frames = []  # (scenario, {section: ms}) per main-loop frame
+        self._script = self._play()
+        self._held = frozenset()
+        self._ui_calls = {}
+        self._last_flip = None
+        self._real_flip = pygame.display.flip
+        self._real_get = pygame.event.get
+
+    def _play(self):
+        yield from idle(60)
+        for name in self.scenarios:
+            self.current = name
+            t0 = time.perf_counter()
+            result = yield from SCENARIOS[name](self.game)
+            if isinstance(result, dict):
+                # Per-step outcomes, e.g. {door: {"enter": ..., "exit": ...}}
+                self.details[name] = result
+                result = not any(v == "failed" for step in result.values() for v in step.values())
+            self.completed[name] = bool(result)
+            self.durations[name] = time.perf_counter() - t0
+            print(f"Benchmark scenario '{name}' {'done' if self.completed[name] else 'incomplete'} in {self.durations[name]:.1f} s")
+        self.current = "shutdown"
+
+    # Patched pygame functions
+
+    def event_get(self, *args, **kwargs):
+        if args or kwargs:
+            # Filtered reads (e.g. SPRITE_LOADED in the encounter animation) see the real queue
+            return self._real_get(*args, **kwargs)
+        caller = sys._getframe(1)
+        if caller.f_code.co_name == "<module>" and caller.f_globals.get("__name__") == "main":
+            if self.game is None:
+                self.game = sys.modules["main"]
+                self.game.profiler.on_frame = self._record_frame
+            self._ui_calls.clear()
+            try:
+                events, held = next(self._script)
+            except StopIteration:
+                events, held = [pygame.event.Event(pygame.QUIT)], ()
+            self._held = frozenset(held)
+            return events
+        self._held = frozenset()
+        return self._ui_events(caller.f_code.co_name, caller.f_locals)
+
+    def get_pressed(self):
+        return _Keys(self._held)
+
+    def flip(self):
+        now = time.perf_counter()
+        if self._last_flip is not None:
+            loop = sys._getframe(1).f_code.co_name
+            self.flips.append((self.current, LOOP_NAMES.get(loop, loop), (now - self._last_flip) * 1000))
+        self._last_flip = now
+        self._real_flip()
+
+    def _record_frame(self, frame):
+        self.frames.append((self.current, self.game.profiler.section_totals(frame)))
+
+    def _ui_events(self, name, local_vars):
+        # Scripted answers for the game's own UI loops, keyed by the function running them
+        calls = self._ui_calls[name] = self._ui_calls.get(name, 0) + 1
+        if name == "main_menu":
+            rect = local_vars.get("start_rect")
+            return [_click_event(rect.center)] if rect else []
+        if name in ("ask_player_name", "show_dialogue", "show_tutorial_choice"):
+            return [_key_event(pygame.K_RETURN)]
+        if name == "battle_menu":
+            state = local_vars.get("state")
+            if state == "message":
+                return [_key_event(pygame.K_RETURN)]
+            if state == "options" and calls >= UI_FRAMES:
+                return [_key_event(pygame.K_ESCAPE)]
+            return []
+        if name == "pokedex_menu":
+            if calls >= UI_FRAMES:
+                return [_key_event(pygame.K_ESCAPE)]
+            return [_key_event(pygame.K_DOWN)] if calls % 30 == 0 else []
+        if calls >= STUCK_UI_CALLS:
+            return [_key_event(pygame.K_RETURN if calls % 2 else pygame.K_ESCAPE)]
+        return []
+
+    def report(self):
+        names = ["startup"] + self.scenarios
+        out = {"frame_ms": FRAME_MS, "seed": SEED, "scenarios": {}}
+        for name in names:
+            flips = [ms for scenario, _, ms in self.flips if scenario == name]
+            loops = {}
+            for scenario, loop, ms in self.flips:
+                if scenario == name:
+                    loops.setdefault(loop, []).append(ms)
+            sections = {}
+            for scenario, totals in self.frames:
+                if scenario == name:
+                    for section, ms in totals.items():
+                        sections.setdefault(section, []).append(ms)
+            entry = summarize(flips)
+            entry["completed"] = self.completed.get(name, name == "startup")
+            if name in self.durations:
+                entry["seconds"] = self.durations[name]
+            if name in self.details:
+                entry["details"] = self.details[name]
+            entry["loops"] = {loop: summarize(values) for loop, values in loops.items()}
+            entry["sections"] = {section: summarize(values) for section, values in sections.items()}
+            out["scenarios"][name] = entry
+        return out
+
+
+@contextmanager
+def _preserved(paths):
+    saved = {path: path.read_bytes() if path.exists() else None for path in paths}
+    try:
+        yield
+    finally:
+        for path, data in saved.items():
+            if data is None:
+                if path.exists():
+                    path.unlink()
+            else:
+                path.write_bytes(data)
+
+
+def run(scenarios=None):
+    scenarios = list(scenarios or SCENARIOS)
+    unknown = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        raise ValueError(f"Unknown scenarios {unknown}; choose from {sorted(SCENARIOS)}")
+
+    # main.py resolves graphics/ and moves.json against the working directory
+    os.chdir(REPO_ROOT)
+    random.seed(SEED)
+    driver = ScriptedRun(scenarios)
+    patches = {
+        (pygame.event, "get"): driver.event_get,
+        (pygame.key, "get_pressed"): driver.get_pressed,
+        (pygame.display, "flip"): driver.flip,
+        (pygame.time, "Clock"): _FixedClock,
+    }
+    originals = {target: getattr(*target) for target in patches}
+    with _preserved(TOUCHED_FILES):
+        for (module, attr), value in patches.items():
+            setattr(module, attr, value)
+        try:
+            import main  # noqa: F401  (the game loop runs at import and ends with sys.exit)
+        except SystemExit:
+            pass
+        finally:
+            for (module, attr), value in originals.items():
+                setattr(module, attr, value)
+            game = sys.modules.get("main")
+            server = getattr(game, "server_process", None)
+            if server is not None:
+                server.terminate()
+    return driver.report()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    out_path = None
+    if "--out" in args:
+        i = args.index("--out")
+        out_path = args[i + 1]
+        del args[i:i + 2]
+    results = run(args)
+    text = json.dumps(results, indent=2)
+    if out_path:
+        Path(out_path).write_text(text, encoding="utf-8")
+        print(f"Benchmark results written to {out_path}")
+    else:
+        print(text)
@@ -0,0 +1,30 @@
+import os
+import sys
+
+import pygame
+
+# Run without a window or sound card: `GAME_HEADLESS=1 python main.py` or `python main.py --headless`.
+# SDL's dummy drivers still give a real display surface, so every render path runs offscreen.
+HEADLESS_ENV = "GAME_HEADLESS"
+
+
+def _wants_headless():
+    if "--headless" in sys.argv:
+        return True
+    return os.environ.get(HEADLESS_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+HEADLESS = _wants_headless()
+
+if HEADLESS:
+    # Must be set before pygame.init() reads them
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+
+def setup_display(size, caption="Game"):
+    screen = pygame.display.set_mode(size)
+    pygame.display.set_caption(caption)
+    if not HEADLESS:
+        pygame.display.toggle_fullscreen()
+    return screen
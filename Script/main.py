@@ -1,28 +1,23 @@
 import os
+import headless
 import pygame
 import sys
-from io import BytesIO
-import requests
 import threading
-from collections import deque
 import json
 import random
+import time
 from Characters.character import Character, player_w, player_h
 from Characters.NPC import NPC
 from Characters.encounter import (
-    is_player_in_bush,
+    get_trigger_index,
     trigger_encounter,
     fetch_random_pokemon,
     can_trigger_bush,
     mark_bush_triggered,
-    is_player_in_hospital,
-    is_player_in_house,
-    is_player_in_GrassGym,
-    is_player_in_IceGym,
-    is_player_in_FireGym,
     get_moves_for_pokemon,
     fetch_and_store_all_moves,
 )
+from Characters import pokedata
 from Characters.pokedex import Pokedex, Pokemon
 from Characters.hospital import load_hospital_npcs, heal_pokemon_menu, show_shop_menu, SHOP_ITEMS
 from UI.pause_menu import pause_menu
@@ -31,12 +26,17 @@ from UI.options import options_menu
 from UI.battle_menu import battle_menu, show_move_menu
 from UI.dialogue_box import show_dialogue, show_tutorial, show_tutorial_choice
 from UI.pokedex_menu import quick_pokemon_select, pokedex_menu
-from World.map import TileMap
+from World.map_manager import MapManager
+from World.map_prefetch import DoorPrefetcher
+from World.minimap import start_overview, finish_overview, start_pyramid, finish_pyramid, ZoomableMap
 from constants import BG, BLACK, GOLD, RED, BLUE, GREEN, YELLOW, WHITE
 from pathlib import Path
 from UI.battle_menu import load_type_icons
 from UI.level_up import show_level_up_screen, show_xp_gain
 from multiplayer import start_server, handle_multiplayer_logic, handle_waiting_state, handle_multiplayer_battle
+from profiling import profiler
+from UI.profiler_overlay import draw_profiler_overlay
+from sprite_store import SPRITE_LOADED, request as request_sprite, sprites
 
 pygame.init()
 
@@ -50,7 +50,9 @@ fetch_and_store_all_moves()
 running = True
 game_state = "menu"
 show_coords = False
+show_profiler = False
 show_map = False
+zoom_map = ZoomableMap()
 show_pokedex = False
 encounter_active = False
 encounter_pokemon = None
@@ -91,9 +93,7 @@ show_bag = False
 # Screen
 Screen_Width = 1285
 Screen_Height = 800
-screen = pygame.display.set_mode((Screen_Width, Screen_Height))
-pygame.display.set_caption("Game")
-pygame.display.toggle_fullscreen()
+screen = headless.setup_display((Screen_Width, Screen_Height), "Game")
 
 # Fonts
 menu_font = pygame.font.Font(None, 48)
@@ -105,11 +105,17 @@ run_msg_font = pygame.font.Font(None, 56)
 
 # Map
 base_dir = Path(__file__).parent
+map_manager = MapManager(tile_size=64)
 tmx_path = base_dir / "World" / "maps" / "World.tmx"
-game_map = TileMap(tmx_path=str(tmx_path), tile_size=64)
+game_map = map_manager.get(tmx_path)
 save_position_file = base_dir / "save_position.json"
+# Chrome traces dumped with the 5 key
+trace_dir = base_dir / "traces"
 world_tmx_path = base_dir / "World" / "maps" / "World.tmx"
-world_map = TileMap(tmx_path=str(world_tmx_path), tile_size=64)
+world_map = map_manager.get(world_tmx_path)
+# Parse the interiors in worker processes while the menu is up; poll_preload() adopts them
+map_manager.start_preload(sorted((base_dir / "World" / "maps").glob("*.tmx")))
+door_prefetcher = DoorPrefetcher(map_manager, base_dir / "World" / "maps")
 
 # Load bag icons
 def _scale_icon(surface, size=40):
@@ -219,20 +225,10 @@ clock = pygame.time.Clock()
 offset_x = 0
 offset_y = 0
 
-_IMAGE_BYTES_CACHE = {}
-_SCALED_SURFACE_CACHE = {}
 _BG_SURFACE_CACHE = {}
 
-def _download_bytes(url, timeout=5.0):
-    try:
-        resp = requests.get(url, timeout=timeout)
-        if resp.ok:
-            return resp.content
-    except Exception:
-        return None
-    return None
-
 def _prefetch_assets():
+    # Warms the on-disk sprite cache so the first encounter does not wait on the network
     try:
         root = base_dir.parent
         pfile = root / "pokemon_cache.json"
@@ -244,20 +240,17 @@ def _prefetch_assets():
                 data = None
 
             if isinstance(data, list):
+                urls = []
                 for p in data:
-                    url = p.get("sprite") if isinstance(p, dict) else None
-                    if url and url not in _IMAGE_BYTES_CACHE:
-                        b = _download_bytes(url)
-                        if b:
-                            _IMAGE_BYTES_CACHE[url] = b
-
-        try:
-            bg_path = base_dir.parent / "graphics" / "backgrounds" / "forest.png"
-            if bg_path.exists():
-                with bg_path.open("rb") as f:
-                    _IMAGE_BYTES_CACHE["__bg_forest_local__"] = f.read()
-        except Exception:
-            pass
+                    if not isinstance(p, dict):
+                        continue
+                    # pokemon_cache.json has no sprite URLs of its own; the data pack does
+                    species = pokedata.get_species(p.get("name"))
+                    url = p.get("sprite") or (species or {}).get("sprite")
+                    if url:
+                        urls.append(url)
+                # Only the first run downloads; after that every sprite is already on disk
+                sprites.prefetch(urls)
     except Exception:
         pass
 
@@ -332,7 +325,7 @@ def deserialize_game_state(data, player, pokedex, bag, game_map):
     # Map
     if str(game_map.tmx_path).split('/')[-1].split('\\')[-1] != data["map"]:
         new_map_path = base_dir / "World" / "maps" / data["map"]
-        game_map = TileMap(tmx_path=str(new_map_path), tile_size=64)
+        game_map = map_manager.get(new_map_path)
 
     # Tutorial
     return data["tutorial_shown"], game_map
@@ -361,6 +354,17 @@ def load_game(player, pokedex, bag, game_map, save_slot=1):
         print(f"Failed to load game: {e}")
         return False
 
+def swap_loaded_sprite(sprite, url, size):
+    # For animation loops without an event loop: takes the real sprite once SPRITE_LOADED
+    # arrives for url; other SPRITE_LOADED events go back on the queue for their owners
+    for event in pygame.event.get(SPRITE_LOADED):
+        if event.url == url and event.size == size:
+            if sprite is not None and sprites.is_placeholder(sprite):
+                sprite = request_sprite(url, size)
+        else:
+            pygame.event.post(event)
+    return sprite
+
 def pokemon_encounter_animation(surface, w, h, clock, pokemon, bush_type="forest"):
     actual_w, actual_h = surface.get_size()
 
@@ -397,28 +401,12 @@ def pokemon_encounter_animation(surface, w, h, clock, pokemon, bush_type="forest
         print(f"Error loading background: {e}")
         bg_img = None
 
-    # Load and scale Pokémon sprite
+    # Placeholder until the sprite loads in the background; the animation never waits on it
     sprite = None
+    url = pokemon.get("sprite")
     try:
-        url = pokemon.get("sprite")
         if url:
-            cache_key = (url, (192, 192))
-            if cache_key in _SCALED_SURFACE_CACHE:
-                sprite = _SCALED_SURFACE_CACHE[cache_key]
-            else:
-                if url in _IMAGE_BYTES_CACHE:
-                    surf = pygame.image.load(BytesIO(_IMAGE_BYTES_CACHE[url])).convert_alpha()
-                    surf = pygame.transform.scale(surf, (192, 192))
-                    _SCALED_SURFACE_CACHE[cache_key] = surf
-                    sprite = surf
-                else:
-                    b = _download_bytes(url, timeout=1.5)
-                    if b:
-                        _IMAGE_BYTES_CACHE[url] = b
-                        surf = pygame.image.load(BytesIO(b)).convert_alpha()
-                        surf = pygame.transform.scale(surf, (192, 192))
-                        _SCALED_SURFACE_CACHE[cache_key] = surf
-                        sprite = surf
+            sprite = request_sprite(url, (192, 192))
     except Exception as e:
         print(f"Error loading sprite: {e}")
         sprite = None
@@ -444,6 +432,7 @@ def pokemon_encounter_animation(surface, w, h, clock, pokemon, bush_type="forest
 
             x_pos = int(start_x - (start_x - end_x) * progress)
             y_pos = int(actual_h // 2 - int(100 * (actual_h / h)) - (actual_h // 2 - int(100 * (actual_h / h)) - end_y) * progress)
+            sprite = swap_loaded_sprite(sprite, url, (192, 192))
             surface.blit(sprite, (x_pos, y_pos))
 
             pygame.display.flip()
@@ -467,26 +456,10 @@ def run_away_animation(surface, w, h, clock, pokemon, bush_type="forest"):
         bg_img = None
 
     sprite = None
+    url = pokemon.get("sprite") if pokemon else None
     try:
-        url = pokemon.get("sprite") if pokemon else None
         if url:
-            cache_key = (url, (128, 128))
-            if cache_key in _SCALED_SURFACE_CACHE:
-                sprite = _SCALED_SURFACE_CACHE[cache_key]
-            else:
-                if url in _IMAGE_BYTES_CACHE:
-                    surf = pygame.image.load(BytesIO(_IMAGE_BYTES_CACHE[url])).convert_alpha()
-                    surf = pygame.transform.scale(surf, (128, 128))
-                    _SCALED_SURFACE_CACHE[cache_key] = surf
-                    sprite = surf
-                else:
-                    b = _download_bytes(url, timeout=1.5)
-                    if b:
-                        _IMAGE_BYTES_CACHE[url] = b
-                        surf = pygame.image.load(BytesIO(b)).convert_alpha()
-                        surf = pygame.transform.scale(surf, (128, 128))
-                        _SCALED_SURFACE_CACHE[cache_key] = surf
-                        sprite = surf
+            sprite = request_sprite(url, (128, 128))
     except Exception as e:
         print(f"Error loading sprite: {e}")
         sprite = None
@@ -500,6 +473,7 @@ def run_away_animation(surface, w, h, clock, pokemon, bush_type="forest"):
         else:
             surface.fill((40, 120, 40))
 
+        sprite = swap_loaded_sprite(sprite, url, (128, 128))
         if sprite:
             start_x = sw // 2 - 64
             end_x = sw + 200
@@ -547,26 +521,10 @@ def draw_encounter_ui(surface, pokemon, w, h, bush_type="forest"):
         surface.fill((40, 120, 40))
 
     sprite = None
+    url = pokemon.get("sprite")
     try:
-        url = pokemon.get("sprite")
         if url:
-            cache_key = (url, (128, 128))
-            if cache_key in _SCALED_SURFACE_CACHE:
-                sprite = _SCALED_SURFACE_CACHE[cache_key]
-            else:
-                if url in _IMAGE_BYTES_CACHE:
-                    surf = pygame.image.load(BytesIO(_IMAGE_BYTES_CACHE[url])).convert_alpha()
-                    surf = pygame.transform.scale(surf, (128, 128))
-                    _SCALED_SURFACE_CACHE[cache_key] = surf
-                    sprite = surf
-                else:
-                    b = _download_bytes(url, timeout=1.5)
-                    if b:
-                        _IMAGE_BYTES_CACHE[url] = b
-                        surf = pygame.image.load(BytesIO(b)).convert_alpha()
-                        surf = pygame.transform.scale(surf, (128, 128))
-                        _SCALED_SURFACE_CACHE[cache_key] = surf
-                        sprite = surf
+            sprite = request_sprite(url, (128, 128))
     except Exception:
         sprite = None
 
@@ -575,6 +533,7 @@ def draw_encounter_ui(surface, pokemon, w, h, bush_type="forest"):
         target_x = w // 2 - 64
         for step in range(20):
             surface.fill((40, 120, 40))
+            sprite = swap_loaded_sprite(sprite, url, (128, 128))
             if sprite:
                 surface.blit(sprite, (x_pos, h // 2 - 100))
             pygame.display.flip()
@@ -776,74 +735,7 @@ def show_main_menu():
 def start_build_full_map(tilemap=None):
     if tilemap is None:
         tilemap = game_map
-    if getattr(tilemap, "_full_map_built", False):
-        tilemap._full_map_progress = 1.0
-        return
-    if getattr(tilemap, "_full_map_building", False):
-        return
-
-    tilemap._full_map_building = True
-    tilemap._full_map_progress = 0.0
-    tilemap._full_map_built = False
-    tilemap._full_map_build_queue = deque()
-    tilemap._full_map_build_gid_scaled_cache = {}
-    tilemap._full_map_build_gid_color_cache = {}
-    tilemap._full_map_build_total = 0
-    tilemap._full_map_processed = 0
-    tilemap._full_map_present_count = 0
-    tilemap._full_map_missing_count = 0
-
-    def worker():
-        try:
-            import time
-            t0 = time.perf_counter()
-            tmx = tilemap.tmx
-            world_w = getattr(tilemap, "width", 0)
-            world_h = getattr(tilemap, "height", 0)
-            if world_w <= 0 or world_h <= 0:
-                tilemap._full_map_building = False
-                return
-            sw, sh = screen.get_size()
-            scale = min((sw * 0.88) / world_w, (sh * 0.88) / world_h, 1.0)
-            tile_px = max(1, int(getattr(tilemap, "tilewidth", getattr(tilemap, "tile_size", 64)) * scale))
-
-            cols = int(world_w // getattr(tilemap, "tilewidth", getattr(tilemap, "tile_size", 64)))
-            rows = int(world_h // getattr(tilemap, "tileheight", getattr(tilemap, "tile_size", 64)))
-            full_surf = pygame.Surface((tile_px * cols, tile_px * rows), pygame.SRCALPHA)
-            full_surf.fill((0, 0, 0, 0))
-
-            tiles = []
-            for layer in tmx.visible_layers:
-                layer_name = (getattr(layer, "name", "") or "").lower()
-                layer_props = getattr(layer, "properties", {}) or {}
-                if layer_name == "collision" or layer_props.get("collision") is True:
-                    continue
-                if not hasattr(layer, "tiles"):
-                    continue
-                for x, y, gid in layer.tiles():
-                    if gid == 0:
-                        continue
-                    tiles.append((x, y, gid))
-
-            tilemap._full_map_build_total = len(tiles) if tiles else 1
-            for (x, y, gid) in tiles:
-                tilemap._full_map_build_queue.append((x, y, gid))
-
-            tilemap._full_map_surf = full_surf
-            tilemap._full_map_scale = tile_px / getattr(tilemap, "tilewidth", getattr(tilemap, "tile_size", 64))
-            tilemap._full_map_tile_px = tile_px
-            tilemap._full_map_cols = cols
-            tilemap._full_map_rows = rows
-        except Exception:
-            tilemap._full_map_building = False
-            tilemap._full_map_built = False
-
-    try:
-        th = threading.Thread(target=worker, daemon=True)
-        tilemap._full_map_th = th
-        th.start()
-    except Exception:
-        worker()
+    start_overview(tilemap, screen.get_size())
 
 def show_full_map(tilemap=None):
     if tilemap is None:
@@ -851,114 +743,11 @@ def show_full_map(tilemap=None):
     if not getattr(tilemap, "_full_map_surf", None):
         start_build_full_map(tilemap)
 
-def process_full_map_build(tilemap=None, steps=256):
+def process_full_map_build(tilemap=None):
+    # The overview renders on a worker thread; this only adopts its result on the main thread
     if tilemap is None:
         tilemap = game_map
-    q = getattr(tilemap, "_full_map_build_queue", None)
-    if not q:
-        return
-
-    tmx = tilemap.tmx
-    cols = getattr(tilemap, "_full_map_cols", 0)
-    rows = getattr(tilemap, "_full_map_rows", 0)
-    full_surf = getattr(tilemap, "_full_map_surf", None)
-    tile_px = getattr(tilemap, "_full_map_tile_px", 1)
-    gid_scaled_cache = getattr(tilemap, "_full_map_build_gid_scaled_cache", {})
-    gid_color_cache = getattr(tilemap, "_full_map_build_gid_color_cache", {})
-    total = getattr(tilemap, "_full_map_build_total", max(1, len(q)))
-    processed = getattr(tilemap, "_full_map_processed", 0)
-
-    for _ in range(steps):
-        if not q:
-            break
-        x, y, gid = q.popleft()
-        tile_img = None
-        gid_key = None
-
-        if isinstance(gid, pygame.Surface):
-            tile_img = gid
-            gid_key = ('surf', id(gid))
-        else:
-            try:
-                g = int(gid)
-            except Exception:
-                g = None
-            if g is None or g == 0:
-                continue
-            gid_key = g
-
-        small = gid_scaled_cache.get(gid_key)
-        if small is None:
-            if tile_img is None and isinstance(gid_key, int):
-                try:
-                    tile_img = tmx.get_tile_image_by_gid(gid_key)
-                except Exception:
-                    tile_img = None
-            if tile_img is not None:
-                try:
-                    scale_fact = getattr(tilemap, '_full_map_scale', tile_px / float(getattr(tilemap, 'tilewidth', tilemap.tile_size)))
-                    new_w = max(1, int(round(tile_img.get_width() * scale_fact)))
-                    new_h = max(1, int(round(tile_img.get_height() * scale_fact)))
-                    if new_w <= 4 or new_h <= 4:
-                        small = pygame.transform.scale(tile_img, (new_w, new_h))
-                    else:
-                        small = pygame.transform.smoothscale(tile_img, (new_w, new_h))
-                    try:
-                        tiny = pygame.transform.smoothscale(tile_img, (1, 1))
-                        gid_color_cache[gid_key] = tiny.get_at((0, 0))
-                    except Exception:
-                        gid_color_cache[gid_key] = (120, 120, 120)
-                except Exception:
-                    small = None
-            gid_scaled_cache[gid_key] = small
-
-        if small:
-            try:
-                extra_h_scaled = max(0, small.get_height() - tile_px)
-            except Exception:
-                extra_h_scaled = 0
-            full_surf.blit(small, (x * tile_px, y * tile_px - extra_h_scaled))
-            tilemap._full_map_present_count = getattr(tilemap, '_full_map_present_count', 0) + 1
-        else:
-            col = gid_color_cache.get(gid_key)
-            if not col:
-                props = {}
-                try:
-                    if isinstance(gid_key, int):
-                        props = tmx.get_tile_properties_by_gid(gid_key) or {}
-                except Exception:
-                    pass
-                tname = (props.get('name') or props.get('type') or '').lower()
-                if 'water' in tname or props.get('water'):
-                    col = (50, 100, 220)
-                elif 'grass' in tname or props.get('grass'):
-                    col = (60, 160, 60)
-                elif 'road' in tname or props.get('road'):
-                    col = (150, 150, 120)
-                elif 'house' in tname or 'building' in tname or props.get('building'):
-                    col = (140, 100, 50)
-                else:
-                    col = (120, 120, 120)
-                gid_color_cache[gid_key] = col
-                pygame.draw.rect(full_surf, col, (x * tile_px, y * tile_px, tile_px, tile_px))
-                tilemap._full_map_missing_count = getattr(tilemap, '_full_map_missing_count', 0) + 1
-
-        processed += 1
-        tilemap._full_map_processed = processed
-        try:
-            tilemap._full_map_progress = max(0.0, min(1.0, processed / float(total)))
-        except Exception:
-            tilemap._full_map_progress = 0.0
-
-    if not q:
-        tilemap._gid_scaled_cache = gid_scaled_cache
-        tilemap._full_map_build_gid_scaled_cache = gid_scaled_cache
-        tilemap._full_map_build_gid_color_cache = gid_color_cache
-        tilemap._full_map_build_queue = deque()
-        tilemap._full_map_built = True
-        tilemap._full_map_building = False
-        tilemap._full_map_progress = 1.0
-        print(f"Full map incremental build finished; total processed: {processed} present: {getattr(tilemap, '_full_map_present_count', 0)} missing: {getattr(tilemap, '_full_map_missing_count', 0)}")
+    finish_overview(tilemap)
 
 def create_trainer_team(trainer_name):
     teams = {
@@ -1135,11 +924,17 @@ elif menu_start == "quit":
 while running:
     dt_ms = clock.tick(60)
     dt = dt_ms / 1000.0
+    profiler.begin_frame()
 
     try:
-        process_full_map_build(steps=512)
+        process_full_map_build()
+        finish_pyramid(game_map)
     except Exception:
         pass
+    profiler.lap("full_map")
+
+    map_manager.poll_preload(screen.get_size())
+    profiler.lap("map_preload")
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
@@ -1147,16 +942,34 @@ while running:
             pygame.quit()
             sys.exit()
 
+        if event.type == pygame.MOUSEWHEEL and show_map:
+            zoom_map.handle_event(event)
+
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_3:
                 show_coords = not show_coords
+            if event.key == pygame.K_4:
+                show_profiler = not show_profiler
+            if event.key == pygame.K_5:
+                # Chrome trace of the last few seconds; open in chrome://tracing or ui.perfetto.dev
+                try:
+                    trace_dir.mkdir(parents=True, exist_ok=True)
+                    trace_path = trace_dir / f"trace-{time.strftime('%Y%m%d-%H%M%S')}.json"
+                    count = profiler.dump_trace(trace_path)
+                    print(f"Wrote {count} trace events to {trace_path}")
+                except Exception as e:
+                    print(f"Trace dump failed: {e}")
             if event.key == pygame.K_m:
                 show_map = not show_map
                 print("show_map toggled ->", show_map)
                 if show_map:
                     print("Preparing full map cache.")
                     show_full_map()
+                    start_pyramid(game_map)
+                    zoom_map.reset(game_map, screen.get_size(), player.rect.center)
                 continue
+            if show_map:
+                zoom_map.handle_event(event)
             if event.key == pygame.K_TAB:
                 show_bag = not show_bag
                 if show_bag:
@@ -1302,6 +1115,7 @@ while running:
             if pause_result == "save":
                 save_game(player, pokedex, bag, game_map, tutorial_shown)
                 pause_result = "game"
+    profiler.lap("events")
 
     if game_state == "game" and not encounter_active:
         try:
@@ -1316,9 +1130,13 @@ while running:
                 keys = [False] * 512
         if not show_map:
             player.update(keys, game_map, dt=dt)
+        profiler.lap("player.update")
+        door_prefetcher.update(game_map, player.hitbox_rect)
+        profiler.lap("prefetch")
 
-        bush_rects = game_map.get_bush_rects()
-        bush_hit = is_player_in_bush(player.hitbox_rect, bush_rects)
+        # One index query covers every trigger zone the hitbox touches this frame
+        trigger_hits = get_trigger_index(game_map).query(player.hitbox_rect)
+        bush_hit = trigger_hits.get("bush")
 
         if bush_hit and can_trigger_bush(bush_hit):
             bush_type = bush_hit.get('type', 'forest')
@@ -1331,14 +1149,14 @@ while running:
                     mark_bush_triggered(bush_hit)
 
         # Hospital entry
-        hospital_rects = game_map.get_hospital_rects()
-        hospital_hit = is_player_in_hospital(player.hitbox_rect, hospital_rects)
+        hospital_hit = trigger_hits.get("hospital")
 
         if hospital_hit and initial_no_switch_frames == 0:
             save_world_position(player)
 
             hospital_tmx_path = base_dir / "World" / "maps" / "Hospital.tmx"
-            game_map = TileMap(tmx_path=str(hospital_tmx_path), tile_size=64)
+            door_prefetcher.record_switch(hospital_tmx_path)
+            game_map = map_manager.get(hospital_tmx_path)
             if game_map.player_start:
                 player.rect.x = game_map.player_start[0]
                 player.rect.y = game_map.player_start[1]
@@ -1360,14 +1178,14 @@ while running:
             initial_no_switch_frames = map_switch_cooldown
 
         # House entry
-        house_rects = game_map.get_house_rects()
-        house_hit = is_player_in_house(player.hitbox_rect, house_rects)
+        house_hit = trigger_hits.get("house")
 
         if house_hit and initial_no_switch_frames == 0:
             save_world_position(player)
 
             house_tmx_path = base_dir / "World" / "maps" / "House.tmx"
-            game_map = TileMap(tmx_path=str(house_tmx_path), tile_size=64)
+            door_prefetcher.record_switch(house_tmx_path)
+            game_map = map_manager.get(house_tmx_path)
             if game_map.player_start:
                 player.rect.x = game_map.player_start[0]
                 player.rect.y = game_map.player_start[1]
@@ -1380,14 +1198,14 @@ while running:
             initial_no_switch_frames = map_switch_cooldown
 
         # GrassGym entry
-        GrassGym_rects = game_map.get_GrassGym_rects()
-        GrassGym_hit = is_player_in_GrassGym(player.hitbox_rect, GrassGym_rects)
+        GrassGym_hit = trigger_hits.get("GrassGym")
 
         if GrassGym_hit and initial_no_switch_frames == 0:
             save_world_position(player)
 
             GrassGym_tmx_path = base_dir / "World" / "maps" / "GrassGym.tmx"
-            game_map = TileMap(tmx_path=str(GrassGym_tmx_path), tile_size=64)
+            door_prefetcher.record_switch(GrassGym_tmx_path)
+            game_map = map_manager.get(GrassGym_tmx_path)
             if game_map.player_start:
                 player.rect.x = game_map.player_start[0]
                 player.rect.y = game_map.player_start[1]
@@ -1411,14 +1229,14 @@ while running:
             initial_no_switch_frames = map_switch_cooldown
 
         # IceGym entry
-        IceGym_rects = game_map.get_IceGym_rects()
-        IceGym_hit = is_player_in_IceGym(player.hitbox_rect, IceGym_rects)
+        IceGym_hit = trigger_hits.get("IceGym")
 
         if IceGym_hit and initial_no_switch_frames == 0:
             save_world_position(player)
 
             IceGym_tmx_path = base_dir / "World" / "maps" / "IceGym.tmx"
-            game_map = TileMap(tmx_path=str(IceGym_tmx_path), tile_size=64)
+            door_prefetcher.record_switch(IceGym_tmx_path)
+            game_map = map_manager.get(IceGym_tmx_path)
             if game_map.player_start:
                 player.rect.x = game_map.player_start[0]
                 player.rect.y = game_map.player_start[1]
@@ -1442,14 +1260,14 @@ while running:
             initial_no_switch_frames = map_switch_cooldown
 
         # FireGym entry
-        FireGym_rects = game_map.get_FireGym_rects()
-        FireGym_hit = is_player_in_FireGym(player.hitbox_rect, FireGym_rects)
+        FireGym_hit = trigger_hits.get("FireGym")
 
         if FireGym_hit and initial_no_switch_frames == 0:
             save_world_position(player)
 
             FireGym_tmx_path = base_dir / "World" / "maps" / "FireGym.tmx"
-            game_map = TileMap(tmx_path=str(FireGym_tmx_path), tile_size=64)
+            door_prefetcher.record_switch(FireGym_tmx_path)
+            game_map = map_manager.get(FireGym_tmx_path)
             if game_map.player_start:
                 player.rect.x = game_map.player_start[0]
                 player.rect.y = game_map.player_start[1]
@@ -1481,12 +1299,11 @@ while running:
             initial_no_switch_frames = map_switch_cooldown
 
         # Exit back to World
-        exit_rects = game_map.get_exit_rects()
-        exit_hit = is_player_in_hospital(player.hitbox_rect, exit_rects) or is_player_in_house(player.hitbox_rect, exit_rects) or is_player_in_GrassGym(player.hitbox_rect, exit_rects) or is_player_in_IceGym(player.hitbox_rect, exit_rects) or is_player_in_FireGym(player.hitbox_rect, exit_rects)
+        exit_hit = trigger_hits.get("exit")
 
         if exit_hit and initial_no_switch_frames == 0:
             world_tmx_path = base_dir / "World" / "maps" / "World.tmx"
-            game_map = TileMap(tmx_path=str(world_tmx_path), tile_size=64)
+            game_map = map_manager.get(world_tmx_path)
 
             restore_world_position(player, game_map)
 
@@ -1500,6 +1317,7 @@ while running:
                 )
             start_build_full_map()
             print("Exited to world map")
+            print(f"Map cache: {map_manager.stats()}, door prefetch: {door_prefetcher.stats()}")
             initial_no_switch_frames = map_switch_cooldown
 
         game_state, initial_no_switch_frames = handle_multiplayer_logic(game_state, player, game_map, initial_no_switch_frames)
@@ -1528,6 +1346,7 @@ while running:
     else:
         offset_x = 0
         offset_y = 0
+    profiler.lap("triggers")
 
     screen.fill(BG)
 
@@ -1542,6 +1361,7 @@ while running:
 
     # Draw lower layers (ground, walls, etc.)
     game_map.draw_lower(screen, player.rect, offset_x=offset_x, offset_y=offset_y)
+    profiler.lap("draw_lower")
 
     if professor:
         professor.draw(screen, offset_x=offset_x, offset_y=offset_y)
@@ -1557,14 +1377,15 @@ while running:
 
     if inside_hospital:
         game_map.draw_counters(screen, offset_x=offset_x, offset_y=offset_y)
+    profiler.lap("npcs")
 
     player.draw(screen, offset_x=offset_x, offset_y=offset_y)
+    profiler.lap("player.draw")
     try:
         game_map.draw_upper(screen, player.rect, offset_x=offset_x, offset_y=offset_y)
     except Exception:
         pass
-    if not inside_hospital:
-        game_map.draw_upper(screen, player.rect, offset_x=offset_x, offset_y=offset_y)
+    profiler.lap("draw_upper")
 
     if show_coords:
         world_x = player.rect.x
@@ -1609,7 +1430,8 @@ while running:
                 if len(offset_points) > 1:
                     pygame.draw.polygon(screen, (BLUE), offset_points, 2)
 
-        for wall in game_map.get_solid_rects():
+        view_rect = pygame.Rect(-offset_x, -offset_y, *screen.get_size())
+        for wall in game_map.get_solid_rects_near(view_rect):
             pygame.draw.rect(
                 screen,
                 (GREEN),
@@ -1638,10 +1460,10 @@ while running:
                 show_intro=False,
                 return_after_message=True,
             )
-            faint_message = None
+            message, faint_message = faint_message, None
 
             # End battle if all player's Pokémon are fainted
-            if "All your Pokémon fainted!" in faint_message:
+            if "All your Pokémon fainted!" in message:
                 encounter_active = False
                 encounter_pokemon = None
                 encounter_animation_done = False
@@ -1653,14 +1475,14 @@ while running:
                 continue
 
             # End battle if wild Pokémon fainted
-            if "Wild" in faint_message and "fainted" in faint_message:
+            if "Wild" in message and "fainted" in message:
                 encounter_active = False
                 encounter_pokemon = None
                 encounter_animation_done = False
                 continue
 
             # If trainer's last Pokémon fainted, end battle
-            if trainer_battle_active and "You defeated" in faint_message:
+            if trainer_battle_active and "You defeated" in message:
                 encounter_active = False
                 encounter_pokemon = None
                 encounter_animation_done = False
@@ -1703,9 +1525,7 @@ while running:
 
                 sprite_surface = None
                 try:
-                    if encounter_pokemon.get("sprite"):
-                        sprite_data = requests.get(encounter_pokemon["sprite"], timeout=5)
-                        sprite_surface = pygame.image.load(BytesIO(sprite_data.content)).convert_alpha()
+                    sprite_surface = request_sprite(encounter_pokemon.get("sprite"))
                 except Exception:
                     sprite_surface = None
 
@@ -1717,9 +1537,7 @@ while running:
                             player_sprite_url = current_player_pokemon.get("sprite")
                         else:
                             player_sprite_url = getattr(current_player_pokemon, "sprite", None)
-                    if player_sprite_url:
-                        sprite_data = requests.get(player_sprite_url, timeout=5)
-                        player_sprite_surface = pygame.image.load(BytesIO(sprite_data.content)).convert_alpha()
+                    player_sprite_surface = request_sprite(player_sprite_url)
                 except Exception:
                     player_sprite_surface = None
 
@@ -1901,15 +1719,22 @@ while running:
                     print(f"Run-away animation failed: {e}")
                 faint_message = "You ran away!"
 
+    profiler.lap("battle")
+
     if game_state == "waiting":
         game_state = handle_waiting_state(game_state, screen, menu_font, WHITE)
 
     if game_state == "multiplayer_battle":
         game_state = handle_multiplayer_battle(game_state, screen, menu_font, coords_font, {"WHITE": WHITE, "BLACK": BLACK, "RED": RED, "GREEN": GREEN, "YELLOW": YELLOW, "BLUE": BLUE, "BG": BG}, clock, pokedex, current_player_pokemon, bag, TYPE_ICONS)
 
+    profiler.lap("multiplayer")
+
     if show_map and getattr(game_map, "tmx", None):
         try:
-            if getattr(game_map, "_full_map_building", False) and not getattr(game_map, "_full_map_built", False):
+            if getattr(game_map, "_map_pyramid", None):
+                zoom_map.update(pygame.key.get_pressed(), dt)
+                zoom_map.draw(screen, game_map, player.rect)
+            elif getattr(game_map, "_full_map_building", False) and not getattr(game_map, "_full_map_built", False):
                 sw, sh = screen.get_size()
                 overlay_bg = pygame.Surface((sw, sh), pygame.SRCALPHA)
                 overlay_bg.fill((0, 0, 0, 180))
@@ -1945,9 +1770,13 @@ while running:
                 pygame.draw.circle(screen, (255, 255, 255), (screen_px, screen_py), 6)
                 pygame.draw.circle(screen, (255, 0, 0), (screen_px, screen_py), 4)
             else:
+                # No-op once a build has failed for this screen size
                 start_build_full_map()
-        except Exception:
-            pass
+        except Exception as e:
+            print(f"Map overlay failed: {e}")
+            show_map = False
+
+    profiler.lap("minimap")
 
     if show_pokedex:
         pokedex_menu(
@@ -1956,7 +1785,14 @@ while running:
             clock, is_battle_context=False, current_player=current_player_pokemon, bag=bag, pokedex_obj=pokedex
         )
         show_pokedex = False
+    profiler.lap("pokedex")
+
+    if show_profiler:
+        draw_profiler_overlay(screen, profiler, coords_font, {"WHITE": WHITE, "RED": RED})
+        profiler.lap("profiler")
 
     pygame.display.flip()
+    profiler.lap("flip")
+    profiler.end_frame()
 
 pygame.quit()
\ No newline at end of file
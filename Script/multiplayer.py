@@ -5,8 +5,7 @@ from client import client
 from UI.pokedex_menu import quick_pokemon_select
 from Characters.encounter import get_moves_for_pokemon
 from UI.battle_menu import battle_menu, show_move_menu
-from io import BytesIO
-import requests
+from sprite_store import request as request_sprite
 
 def start_server():
     # Starts the multiplayer server process.
@@ -109,9 +108,8 @@ def handle_multiplayer_battle(game_state, screen, menu_font, coords_font, colors
     opponent_sprite = None
     try:
         if client.opponent_pokemon and client.opponent_pokemon.get("sprite"):
-            sprite_data = requests.get(client.opponent_pokemon["sprite"], timeout=5)
-            opponent_sprite = pygame.image.load(BytesIO(sprite_data.content)).convert_alpha()
-            opponent_sprite = pygame.transform.scale(opponent_sprite, (269, 269))
+            # Called every frame: a placeholder until the background load finishes, then the sprite
+            opponent_sprite = request_sprite(client.opponent_pokemon["sprite"], (269, 269))
     except Exception as e:
         print(f"Error loading opponent sprite: {e}")
         opponent_sprite = None
@@ -125,10 +123,7 @@ def handle_multiplayer_battle(game_state, screen, menu_font, coords_font, colors
             else:
                 sprite_url = getattr(client.selected_pokemon, "sprite", None)
             if sprite_url:
-                sprite_data = requests.get(sprite_url, timeout=5)
-                player_sprite = pygame.image.load(BytesIO(sprite_data.content)).convert_alpha()
-                player_sprite = pygame.transform.scale(player_sprite, (308, 308))
-                player_sprite = pygame.transform.flip(player_sprite, True, False)
+                player_sprite = request_sprite(sprite_url, (308, 308), flip=True)
     except Exception as e:
         print(f"Error loading player sprite: {e}")
         player_sprite = None
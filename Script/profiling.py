@@ -0,0 +1,150 @@
+import json
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Frames kept for stats and traces; at 60 fps this is thirty seconds
+DEFAULT_HISTORY = 1800
+# Spans (map loads, downloads, worker jobs) kept for traces, from any thread
+DEFAULT_SPAN_HISTORY = 4096
+# Length of a trace dump and of the rolling averages in the overlay
+TRACE_SECONDS = 10.0
+ROLLING_FRAMES = 120
+
+
+# Per-frame section timings for the main loop. Sections are laps: lap(name) charges the
+# time since the previous lap (or begin_frame) to name, so each stage needs one call.
+class FrameProfiler:
+    def __init__(self, history=DEFAULT_HISTORY, span_history=DEFAULT_SPAN_HISTORY):
+        self.frames = deque(maxlen=history)
+        self.spans = deque(maxlen=span_history)
+        self.on_frame = None  # optional callback(frame) when a frame closes
+        self._frame = None
+        self._last = 0.0
+
+    def begin_frame(self):
+        now = time.perf_counter()
+        if self._frame is not None:
+            # The previous frame took a `continue` before end_frame
+            self._close(now)
+        self._frame = {"start": now, "ms": 0.0, "sections": []}
+        self._last = now
+
+    def lap(self, name):
+        frame = self._frame
+        if frame is None:
+            return
+        now = time.perf_counter()
+        frame["sections"].append((name, self._last, (now - self._last) * 1000))
+        self._last = now
+
+    def end_frame(self):
+        if self._frame is not None:
+            self._close(time.perf_counter())
+
+    def _close(self, now):
+        frame = self._frame
+        self._frame = None
+        frame["ms"] = (now - frame["start"]) * 1000
+        self.frames.append(frame)
+        if self.on_frame is not None:
+            self.on_frame(frame)
+
+    @contextmanager
+    def span(self, name):
+        # Times a block on any thread; shows up as its own bar in the trace
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            thread = threading.current_thread()
+            self.spans.append((name, start, (time.perf_counter() - start) * 1000, thread.ident, thread.name))
+
+    def section_totals(self, frame):
+        totals = {}
+        for name, _, ms in frame["sections"]:
+            totals[name] = totals.get(name, 0.0) + ms
+        return totals
+
+    def recent_frames(self, count=ROLLING_FRAMES):
+        frames = self.frames
+        return list(frames)[-count:] if len(frames) > count else list(frames)
+
+    def rolling_sections(self, count=ROLLING_FRAMES):
+        # [(section, mean ms per frame)] over the last count frames, slowest first
+        frames = self.recent_frames(count)
+        totals = {}
+        for frame in frames:
+            for name, _, ms in frame["sections"]:
+                totals[name] = totals.get(name, 0.0) + ms
+        n = max(1, len(frames))
+        return sorted(((name, total / n) for name, total in totals.items()), key=lambda item: -item[1])
+
+    def chrome_trace(self, seconds=TRACE_SECONDS):
+        # Trace Event Format (chrome://tracing, Perfetto) for the last `seconds`
+        cutoff = time.perf_counter() - seconds
+        frames = [f for f in list(self.frames) if f["start"] >= cutoff]
+        spans = [s for s in list(self.spans) if s[1] >= cutoff]
+        starts = [f["start"] for f in frames] + [s[1] for s in spans]
+        origin = min(starts) if starts else 0.0
+        main_thread = threading.main_thread()
+        threads = {main_thread.ident: main_thread.name}
+
+        def event(name, cat, start, ms, tid, args=None):
+            ev = {
+                "name": name, "cat": cat, "ph": "X", "pid": 1, "tid": tid,
+                "ts": round((start - origin) * 1e6, 1), "dur": round(ms * 1000, 1),
+            }
+            if args:
+                ev["args"] = args
+            return ev
+
+        events = []
+        for frame in frames:
+            events.append(event("frame", "frame", frame["start"], frame["ms"], main_thread.ident, {"ms": round(frame["ms"], 3)}))
+            for name, start, ms in frame["sections"]:
+                events.append(event(name, "section", start, ms, main_thread.ident))
+        for name, start, ms, tid, thread_name in spans:
+            threads.setdefault(tid, thread_name)
+            events.append(event(name, "span", start, ms, tid))
+        for tid, thread_name in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": thread_name}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump_trace(self, path, seconds=TRACE_SECONDS):
+        trace = self.chrome_trace(seconds)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace, f)
+        return len(trace["traceEvents"])
+
+
+# Shared by the main loop and anything it calls, so spans land in the same trace
+profiler = FrameProfiler()
+
+
+def span(name):
+    return profiler.span(name)
+
+
+def percentile(sorted_values, pct):
+    # Nearest-rank percentile of an already sorted list
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(values):
+    values = sorted(values)
+    if not values:
+        return {"frames": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "frames": len(values),
+        "mean": sum(values) / len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": values[-1],
+    }
@@ -0,0 +1,303 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+
+import pygame
+import requests
+
+from profiling import span
+
+# Downloaded sprites, one file per URL (named by the URL's hash), shared by every run on this machine
+CACHE_DIR = Path(__file__).resolve().parent.parent / "sprite_cache"
+# Decoded surfaces kept in memory, by rough pixel size
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+TIMEOUT_SECONDS = 5
+# A URL that just failed is not retried (and waited on) again before this
+FAILURE_RETRY_SECONDS = 30
+PREFETCH_GIVE_UP = 3
+# Background loads for request(); a few at once is plenty for one screen of sprites
+LOADER_WORKERS = 4
+PLACEHOLDER_SIZE = (96, 96)
+# Posted when a requested sprite is ready (attributes: url, size, flip, ok)
+SPRITE_LOADED = pygame.USEREVENT + 7
+
+
+def _surface_bytes(surface):
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+class SpriteStore:
+    def __init__(self, cache_dir=CACHE_DIR, memory_budget=DEFAULT_MEMORY_BUDGET):
+        self.cache_dir = Path(cache_dir)
+        self.memory_budget = memory_budget
+        self._surfaces = OrderedDict()  # (url, size, flip) -> Surface, least recently used first
+        self._memory = 0
+        self._failed = {}               # url -> time of the last failed download
+        self._lock = threading.Lock()
+        self._url_locks = {}
+        self._pending = set()           # (url, size, flip) queued on the loader
+        self._missing = {}              # (url, size, flip) -> time its background load failed
+        self._ready = {}                # (url, size, flip) -> decoded by a loader, not converted yet
+        self._placeholders = {}
+        self._loader = None
+        self.session = requests.Session()
+        self.hits = 0
+        self.misses = 0
+        self.downloads = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+    def path_for(self, url):
+        suffix = os.path.splitext(url.split("?", 1)[0])[1].lower()
+        if not suffix or len(suffix) > 5:
+            suffix = ".img"
+        return self.cache_dir / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}{suffix}"
+
+    def _url_lock(self, url):
+        with self._lock:
+            lock = self._url_locks.get(url)
+            if lock is None:
+                lock = self._url_locks[url] = threading.Lock()
+            return lock
+
+    def get_bytes(self, url, timeout=TIMEOUT_SECONDS):
+        # Encoded image from disk, downloading it the first time; None when unavailable
+        if not url:
+            return None
+        path = self.path_for(url)
+        # One download per URL, even when several threads ask for it at once
+        with self._url_lock(url):
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                self.disk_hits += 1
+                return data
+            except OSError:
+                pass
+            failed_at = self._failed.get(url)
+            if failed_at is not None and time.monotonic() - failed_at < FAILURE_RETRY_SECONDS:
+                return None
+            try:
+                with span("sprite download"):
+                    response = self.session.get(url, timeout=timeout)
+                response.raise_for_status()
+                data = response.content
+            except Exception as e:
+                print(f"Sprite download failed for {url}: {e}")
+                self._failed[url] = time.monotonic()
+                return None
+            self.downloads += 1
+            self._failed.pop(url, None)
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+                with open(tmp, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, path)
+            except OSError as e:
+                print(f"Could not cache sprite '{path}': {e}")
+            return data
+
+    def prefetch(self, urls, timeout=TIMEOUT_SECONDS):
+        # Downloads to disk only; safe on any thread, nothing is decoded.
+        # Gives up after a few failures in a row, which usually means there is no network.
+        fetched = 0
+        failures = 0
+        for url in urls:
+            if self.get_bytes(url, timeout=timeout) is None:
+                failures += 1
+                if failures >= PREFETCH_GIVE_UP:
+                    print(f"Sprite prefetch stopped after {failures} failed downloads ({fetched} cached)")
+                    break
+            else:
+                fetched += 1
+                failures = 0
+        return fetched
+
+    def cached(self, url, size=None, flip=False):
+        # The decoded surface if it is in memory already, without touching disk or network
+        key = (url, tuple(size) if size else None, bool(flip))
+        with self._lock:
+            surface = self._surfaces.get(key)
+            if surface is not None:
+                self._surfaces.move_to_end(key)
+            return surface
+
+    def _decode(self, url, size=None, flip=False, timeout=TIMEOUT_SECONDS):
+        # Safe on any thread: a private, unconverted surface, scaled and flipped; None when unavailable
+        data = self.get_bytes(url, timeout=timeout)
+        if data is None:
+            return None
+        try:
+            surface = pygame.image.load(BytesIO(data), self.path_for(url).name)
+        except Exception as e:
+            print(f"Could not decode sprite {url}: {e}")
+            return None
+        if size:
+            surface = pygame.transform.scale(surface, size)
+        if flip:
+            surface = pygame.transform.flip(surface, True, False)
+        return surface
+
+    def _convert(self, surface):
+        # Main thread only: convert_alpha() works against the display surface
+        try:
+            return surface.convert_alpha()
+        except pygame.error:
+            return surface
+
+    def get_surface(self, url, size=None, flip=False, timeout=TIMEOUT_SECONDS):
+        # Decoded (and optionally scaled / horizontally flipped) sprite; None when unavailable.
+        # Main thread only, and it may wait on a download: loops that must not stall use request().
+        # Surfaces are shared, so callers must not draw onto them.
+        if not url:
+            return None
+        size = tuple(size) if size else None
+        key = (url, size, bool(flip))
+        surface = self.cached(url, size, flip)
+        if surface is not None:
+            self.hits += 1
+            return surface
+        self.misses += 1
+
+        base = self.cached(url) if key != (url, None, False) else None
+        if base is None:
+            base = self._decode(url, timeout=timeout)
+            if base is None:
+                return None
+            base = self._convert(base)
+            self._put((url, None, False), base)
+        surface = base
+        if size:
+            surface = pygame.transform.scale(surface, size)
+        if flip:
+            surface = pygame.transform.flip(surface, True, False)
+        if surface is not base:
+            self._put(key, surface)
+        return surface
+
+    def placeholder(self, size=None):
+        # Stand-in drawn until the real sprite arrives; one shared surface per size
+        size = tuple(size) if size else PLACEHOLDER_SIZE
+        surface = self._placeholders.get(size)
+        if surface is None:
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            w, h = size
+            pygame.draw.rect(surface, (90, 90, 90, 150), surface.get_rect(), border_radius=max(2, min(w, h) // 8))
+            r = max(2, min(w, h) // 4)
+            pygame.draw.circle(surface, (200, 200, 200, 170), (w // 2, h // 2), r, max(1, r // 5))
+            self._placeholders[size] = surface
+        return surface
+
+    def is_placeholder(self, surface):
+        return any(surface is p for p in self._placeholders.values())
+
+    def request(self, url, size=None, flip=False):
+        # Never blocks: the sprite if it is in memory, otherwise a placeholder while a worker
+        # loads it. SPRITE_LOADED is posted when it is ready; request again to get the real one.
+        if not url:
+            return None
+        size = tuple(size) if size else None
+        key = (url, size, bool(flip))
+        surface = self.cached(url, size, flip)
+        if surface is not None:
+            self.hits += 1
+            return surface
+        with self._lock:
+            surface = self._ready.pop(key, None)
+        if surface is not None:
+            # A loader finished it; the conversion is the only part done here
+            surface = self._convert(surface)
+            self._put(key, surface)
+            return surface
+        with self._lock:
+            failed_at = self._missing.get(key)
+            retry = failed_at is None or time.monotonic() - failed_at >= FAILURE_RETRY_SECONDS
+            if key not in self._pending and retry:
+                self._pending.add(key)
+                self.misses += 1
+                if self._loader is None:
+                    self._loader = ThreadPoolExecutor(max_workers=LOADER_WORKERS, thread_name_prefix="sprites")
+                self._loader.submit(self._load_async, key)
+        return self.placeholder(size)
+
+    def _load_async(self, key):
+        # Loader thread: download and decode only; request() converts it on the main thread
+        url, size, flip = key
+        surface = None
+        try:
+            surface = self._decode(url, size=size, flip=flip)
+        except Exception as e:
+            print(f"Background sprite load failed for {url}: {e}")
+        with self._lock:
+            self._pending.discard(key)
+            if surface is None:
+                self._missing[key] = time.monotonic()
+            else:
+                self._missing.pop(key, None)
+                self._ready[key] = surface
+        try:
+            pygame.event.post(pygame.event.Event(SPRITE_LOADED, url=url, size=size, flip=flip, ok=surface is not None))
+        except Exception:
+            # Display already shut down; nobody is waiting for the sprite anymore
+            pass
+
+    def _put(self, key, surface):
+        with self._lock:
+            old = self._surfaces.pop(key, None)
+            if old is not None:
+                self._memory -= _surface_bytes(old)
+            self._surfaces[key] = surface
+            self._memory += _surface_bytes(surface)
+            self._evict(keep=key)
+
+    def _evict(self, keep=None):
+        # Drop least recently used surfaces until the budget holds; the one just added always stays
+        while self.memory_budget is not None and self._memory > self.memory_budget and len(self._surfaces) > 1:
+            oldest = next(iter(self._surfaces))
+            if oldest == keep:
+                break
+            self._memory -= _surface_bytes(self._surfaces.pop(oldest))
+            self.evictions += 1
+
+    def clear(self):
+        # Forgets decoded surfaces (e.g. after the display mode changes); the disk cache stays
+        with self._lock:
+            self._surfaces.clear()
+            self._ready.clear()
+            self._memory = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "surfaces": len(self._surfaces),
+            "memory": self._memory,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "disk_hits": self.disk_hits,
+            "downloads": self.downloads,
+            "evictions": self.evictions,
+            "pending": len(self._pending),
+        }
+
+
+# One store for every screen, so a sprite is decoded once per run and downloaded once per machine
+sprites = SpriteStore()
+
+
+def get_surface(url, size=None, flip=False, timeout=TIMEOUT_SECONDS):
+    return sprites.get_surface(url, size=size, flip=flip, timeout=timeout)
+
+
+def request(url, size=None, flip=False):
+    return sprites.request(url, size=size, flip=flip)
+
+
+def get_bytes(url, timeout=TIMEOUT_SECONDS):
+    return sprites.get_bytes(url, timeout=timeout)